@@ -0,0 +1,37 @@
+"""测试初始化
+
+插件在导入时读取配置并注册命令，需要先初始化NoneBot。
+必填的接口地址、密钥等以占位值填充，数据目录与数据库使用临时目录，
+数据库表在测试中按模型直接创建。
+"""
+
+import tempfile
+from pathlib import Path
+
+import nonebot
+
+TEST_DATA_PATH = Path(tempfile.mkdtemp(prefix="bot-test-"))
+
+# 在收集测试模块（及其conftest）之前完成初始化
+nonebot.init(
+    driver="~fastapi",
+    command_start={"/"},
+    command_start_cn=["/"],
+    remi_service_base_url="http://127.0.0.1:1",
+    diving_fish_developer_token="test",
+    lxns_developer_token="test",
+    lxns_base_url="http://127.0.0.1:1",
+    maimai_arcade_chip_id="test",
+    maimai_arcade_aes_key="test",
+    maimai_arcade_aes_iv="test",
+    maimai_arcade_obfuscate_param="test",
+    proxy_host="127.0.0.1",
+    proxy_port=1,
+    proxy_username="test",
+    proxy_password="test",
+    maicn_data_path=str(TEST_DATA_PATH / "maicn"),
+    b50_render_workers=0,
+    b50_asset_watch=False,
+    sqlalchemy_database_url=f"sqlite+aiosqlite:///{TEST_DATA_PATH / 'test.db'}",
+)
+nonebot.load_plugin("src.plugins.maicn")
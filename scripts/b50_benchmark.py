@@ -0,0 +1,190 @@
+"""B50图片渲染性能测试
+
+不启动bot、不访问网络，使用随机生成的maimai.py成绩渲染B50图片，
+分别统计冷启动（每次重新加载资源、清空缓存）与热启动下各阶段的耗时，
+并以JSON格式输出，便于对比优化前后的结果。
+
+只导入渲染相关模块，不加载maicn插件，不需要 .env 配置。
+生成器与bot中一样按插件配置创建，输出编码、缓存容量等参数可在 .env 或环境变量中调整。
+需要在项目根目录下运行（使用 resources 目录中的图片资源）:
+
+    uv run scripts/b50_benchmark.py --iterations 20 --output bench.json
+    B50_IMAGE_FORMAT=webp B50_IMAGE_QUALITY=80 uv run scripts/b50_benchmark.py
+"""
+
+import argparse
+import dataclasses
+import json
+import random
+import resource
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.utils.helpers.standalone_helper import init_standalone, log_to_stderr
+
+# 标准输出只保留测试结果，日志改为输出到标准错误
+log_to_stderr()
+init_standalone()
+
+from maimai_py import FCType, FSType, LevelIndex, RateType, SongType
+from maimai_py.models import ScoreExtend
+from maimai_py.utils import ScoreCoefficient
+
+from src.plugins.maicn.libraries.b50_image import (
+    B50ImageGenerator,
+    clear_shared_caches,
+    create_b50_generator,
+)
+
+STAGES = ["asset_load", "header", "cards", "footer", "encode", "total"]
+
+
+def build_scores(rng: random.Random, count: int, song_ids: list[int]) -> list:
+    """生成随机的maimai.py成绩列表"""
+    fields = {field.name for field in dataclasses.fields(ScoreExtend)}
+    scores = []
+    for i in range(count):
+        level_value = round(rng.uniform(12.0, 15.0), 1)
+        achievements = round(rng.uniform(97.0, 101.0), 4)
+        values = {
+            "id": rng.choice(song_ids),
+            "title": f"Benchmark Song {i} " + "あ" * rng.randint(0, 20),
+            "level": f"{int(level_value)}{'+' if level_value % 1 >= 0.6 else ''}",
+            "level_value": level_value,
+            "level_index": rng.choice(list(LevelIndex)),
+            "achievements": achievements,
+            "fc": rng.choice([None, *FCType]),
+            "fs": rng.choice([None, *FSType]),
+            "dx_score": rng.randint(1000, 3000),
+            "dx_rating": ScoreCoefficient(achievements).ra(level_value),
+            "play_count": rng.randint(1, 50),
+            "rate": RateType._from_achievement(achievements),
+            "type": rng.choice([SongType.STANDARD, SongType.DX]),
+        }
+        # 不同版本的maimai.py字段略有差异，未知字段置空
+        scores.append(ScoreExtend(**{name: values.get(name) for name in fields}))
+    return scores
+
+
+def available_song_ids() -> list[int]:
+    """优先使用已有封面的歌曲ID，使测试覆盖封面加载"""
+    cover_ids = [
+        int(path.stem)
+        for path in B50ImageGenerator.MAI_COVER_PATH.glob("*.png")
+        if path.stem.isdigit()
+    ]
+    return cover_ids or list(range(1, 1000))
+
+
+def render_once(
+    generator: B50ImageGenerator,
+    player_data: dict,
+    b35_scores: list,
+    b15_scores: list,
+) -> tuple[dict[str, float], int]:
+    b35_data = [generator._convert_score_to_dict(score) for score in b35_scores]
+    b15_data = [generator._convert_score_to_dict(score) for score in b15_scores]
+
+    timings: dict[str, float] = {}
+    image_bytes = generator.render_b50_image(
+        player_data, b35_data, b15_data, timings=timings
+    )
+    return timings, len(image_bytes)
+
+
+def summarize(samples: list[dict[str, float]]) -> dict[str, dict[str, float]]:
+    """统计各阶段耗时（毫秒）"""
+    summary = {}
+    for stage in STAGES:
+        values = [sample[stage] * 1000 for sample in samples if stage in sample]
+        if not values:
+            continue
+        values.sort()
+        summary[stage] = {
+            "mean": statistics.fmean(values),
+            "median": statistics.median(values),
+            "min": values[0],
+            "max": values[-1],
+            "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+        }
+    return summary
+
+
+def run(iterations: int, seed: int, preview: bool = False) -> dict:
+    rng = random.Random(seed)
+    song_ids = available_song_ids()
+    player_data = {"name": "Benchmark", "rating": 15000}
+    datasets = [
+        (build_scores(rng, 35, song_ids), build_scores(rng, 15, song_ids))
+        for _ in range(iterations)
+    ]
+
+    # 冷启动：每次重新加载资源并清空缓存
+    cold_samples = []
+    image_size = 0
+    for b35_scores, b15_scores in datasets:
+        clear_shared_caches()
+        start = time.perf_counter()
+        generator = create_b50_generator(preview)
+        asset_load = time.perf_counter() - start
+        timings, image_size = render_once(
+            generator, player_data, b35_scores, b15_scores
+        )
+        timings["asset_load"] = asset_load
+        timings["total"] = time.perf_counter() - start
+        cold_samples.append(timings)
+
+    # 热启动：复用同一个生成器，先完整渲染一轮预热缓存
+    generator = create_b50_generator(preview)
+    for b35_scores, b15_scores in datasets:
+        render_once(generator, player_data, b35_scores, b15_scores)
+
+    warm_samples = []
+    for b35_scores, b15_scores in datasets:
+        start = time.perf_counter()
+        timings, image_size = render_once(
+            generator, player_data, b35_scores, b15_scores
+        )
+        timings["total"] = time.perf_counter() - start
+        warm_samples.append(timings)
+
+    return {
+        "iterations": iterations,
+        "seed": seed,
+        "preview": preview,
+        "encode_options": dataclasses.asdict(generator.encode_options),
+        "image_bytes": image_size,
+        "cold_ms": summarize(cold_samples),
+        "warm_ms": summarize(warm_samples),
+        "cache_stats": generator.cache_stats(),
+        # Linux下ru_maxrss单位为KB
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="B50图片渲染性能测试")
+    parser.add_argument("-n", "--iterations", type=int, default=10, help="渲染次数")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子")
+    parser.add_argument("--preview", action="store_true", help="测试预览图的渲染")
+    parser.add_argument(
+        "-o", "--output", type=Path, help="结果输出文件，默认输出到标准输出"
+    )
+    args = parser.parse_args()
+
+    result = json.dumps(
+        run(args.iterations, args.seed, args.preview), ensure_ascii=False, indent=2
+    )
+    if args.output:
+        args.output.write_text(result, encoding="utf-8")
+    else:
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""封面打包工具
+
+将 resources/yuzu/static/mai/cover 下的封面预缩放后打包为单个文件，
+B50图片生成时通过mmap直接读取，避免逐个打开和解码PNG。
+
+只导入封面相关模块，不加载maicn插件，不需要 .env 配置。
+需要在项目根目录下运行:
+
+    uv run scripts/pack_covers.py
+
+打包完成后执行 /maicn admin reload（或等待资源目录监视自动重新加载）生效。
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.helpers.standalone_helper import init_standalone
+
+init_standalone()
+
+from src.plugins.maicn.libraries.b50_image import B50ImageGenerator
+from src.plugins.maicn.libraries.cover_archive import pack_cover_archive
+
+
+def main():
+    parser = argparse.ArgumentParser(description="打包B50封面")
+    parser.add_argument(
+        "--source",
+        type=Path,
+        default=B50ImageGenerator.MAI_COVER_PATH,
+        help="原始封面目录",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=B50ImageGenerator.MAI_COVER_ARCHIVE_PATH,
+        help="输出文件",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = pack_cover_archive(args.source, args.output, B50ImageGenerator.COVER_SIZE)
+    elapsed = time.perf_counter() - start
+    print(f"已打包 {count} 张封面到 {args.output}，耗时 {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""街机成绩转换性能测试
+
+不启动bot、不访问网络，使用随机生成的曲目列表与街机成绩，
+对比逐条计算Rating与评级的转换和按列批量转换（convert_maicn_scores）的耗时，
+并校验两者的转换结果一致，以JSON格式输出。
+
+两种转换的Rating都按谱面定数计算。最初的实现误将难度序号当作定数传给
+ScoreCoefficient.ra，结果中的 rating_changed 为Rating与最初实现不同的成绩数。
+
+只导入成绩转换相关模块，不加载maicn插件，不需要 .env 配置。
+需要在项目根目录下运行:
+
+    uv run scripts/score_convert_benchmark.py --scores 2000 --output convert.json
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.helpers.standalone_helper import init_standalone, log_to_stderr
+
+log_to_stderr()
+init_standalone()
+
+from maimai_py import FCType, FSType, LevelIndex, RateType, SongType
+from maimai_py.models import Score as MaimaiPyScore
+from maimai_py.models import Song, SongDifficulties, SongDifficulty
+from maimai_py.utils import ScoreCoefficient
+
+from src.plugins.maicn.libraries.score_convert import convert_maicn_scores
+from src.plugins.maicn.libraries.song_index import song_index
+
+
+def build_songs(rng: random.Random, count: int) -> list[Song]:
+    """生成随机曲目列表，部分歌曲只有DX谱面"""
+    songs = []
+    for song_id in range(1, count + 1):
+        version = rng.choice([20000, 21000, 22000, 23000, 24000, 25000])
+
+        def difficulties(song_type: SongType) -> list[SongDifficulty]:
+            result = []
+            for level_index in LevelIndex:
+                if level_index == LevelIndex.ReMASTER and rng.random() < 0.8:
+                    continue
+                level_value = round(
+                    rng.uniform(1 + level_index.value * 3, 6 + level_index.value * 2.2),
+                    1,
+                )
+                result.append(
+                    SongDifficulty(
+                        type=song_type,
+                        level=f"{int(level_value)}{'+' if level_value % 1 >= 0.6 else ''}",
+                        level_value=level_value,
+                        level_index=level_index,
+                        note_designer="",
+                        version=version,
+                        tap_num=0,
+                        hold_num=0,
+                        slide_num=0,
+                        touch_num=0,
+                        break_num=0,
+                        curve=None,
+                    )
+                )
+            return result
+
+        songs.append(
+            Song(
+                id=song_id,
+                title=f"Benchmark Song {song_id}",
+                artist="",
+                genre=None,
+                bpm=150,
+                map=None,
+                version=version,
+                rights=None,
+                aliases=None,
+                disabled=False,
+                difficulties=SongDifficulties(
+                    standard=(difficulties(SongType.STANDARD) if song_id % 3 else []),
+                    dx=difficulties(SongType.DX),
+                    utage=[],
+                ),
+            )
+        )
+    return songs
+
+
+def build_arcade_scores(rng: random.Random, count: int, songs: list[Song]) -> list:
+    """生成随机的街机成绩，格式与 get_user_full_music_detail 的返回值相同"""
+    scores = []
+    for _ in range(count):
+        song = rng.choice(songs)
+        song_type, difficulties = rng.choice(
+            [
+                (song_type, difficulties)
+                for song_type, difficulties in (
+                    (SongType.STANDARD, song.difficulties.standard),
+                    (SongType.DX, song.difficulties.dx),
+                )
+                if difficulties
+            ]
+        )
+        difficulty = rng.choice(difficulties)
+        scores.append(
+            {
+                "musicId": song.id + (10000 if song_type == SongType.DX else 0),
+                "level": difficulty.level_index.value,
+                "playCount": rng.randint(1, 50),
+                "achievement": rng.randint(500000, 1010000),
+                "comboStatus": rng.randint(0, 4),
+                "syncStatus": rng.randint(0, 5),
+                "deluxscoreMax": rng.randint(500, 3000),
+                "scoreRank": 0,
+                "extNum1": 0,
+            }
+        )
+    return scores
+
+
+def convert_per_score(maicn_scores: list) -> list[MaimaiPyScore]:
+    """逐条构造ScoreCoefficient与评级的转换，即按列转换之前的实现，作为对照"""
+    scores = []
+    for i in maicn_scores:
+        music_id = i["musicId"]
+        level = i["level"]
+        song_id = music_id % 10000 if music_id < 100000 else music_id
+        song_type = (
+            SongType.UTAGE
+            if music_id > 100000
+            else SongType.STANDARD if music_id < 10000 else SongType.DX
+        )
+        level_index_list = list(LevelIndex)
+        if level < 0 or level >= len(level_index_list):
+            continue
+        chart = song_index.get_chart(song_id, song_type, level)
+        if chart is None:
+            continue
+
+        scores.append(
+            MaimaiPyScore(
+                id=song_id,
+                level=chart.level,
+                level_index=level_index_list[level],
+                achievements=i["achievement"] / 10000,
+                fc=[None, FCType.FC, FCType.FCP, FCType.AP, FCType.APP][
+                    i["comboStatus"]
+                ],
+                fs=[None, FSType.FS, FSType.FSP, FSType.FSD, FSType.FSDP, FSType.SYNC][
+                    i["syncStatus"]
+                ],
+                dx_score=i["deluxscoreMax"],
+                dx_rating=ScoreCoefficient(i["achievement"] / 10000).ra(
+                    chart.level_value
+                ),
+                play_count=i["playCount"],
+                rate=RateType._from_achievement(i["achievement"] / 10000),
+                type=song_type,
+            )
+        )
+    return scores
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    """统计耗时（毫秒）"""
+    values = sorted(value * 1000 for value in values)
+    return {
+        "mean": statistics.fmean(values),
+        "median": statistics.median(values),
+        "min": values[0],
+        "max": values[-1],
+    }
+
+
+def run(score_count: int, iterations: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    songs = build_songs(rng, 1500)
+    song_index.update(songs)
+    maicn_scores = build_arcade_scores(rng, score_count, songs)
+
+    expected = convert_per_score(maicn_scores)
+    actual = convert_maicn_scores(maicn_scores)
+    if actual != expected:
+        raise SystemExit("批量转换结果与逐条转换不一致")
+    # 最初的实现以难度序号计算Rating
+    rating_changed = sum(
+        score.dx_rating
+        != ScoreCoefficient(score.achievements).ra(score.level_index.value)
+        for score in actual
+    )
+
+    per_score_samples = []
+    columnar_samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        convert_per_score(maicn_scores)
+        per_score_samples.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        convert_maicn_scores(maicn_scores)
+        columnar_samples.append(time.perf_counter() - start)
+
+    per_score_ms = summarize(per_score_samples)
+    columnar_ms = summarize(columnar_samples)
+    return {
+        "scores": score_count,
+        "converted": len(actual),
+        "rating_changed": rating_changed,
+        "iterations": iterations,
+        "seed": seed,
+        "per_score_ms": per_score_ms,
+        "columnar_ms": columnar_ms,
+        "speedup": per_score_ms["median"] / columnar_ms["median"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="街机成绩转换性能测试")
+    parser.add_argument("--scores", type=int, default=2000, help="成绩数量")
+    parser.add_argument("-n", "--iterations", type=int, default=20, help="测试次数")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子")
+    parser.add_argument(
+        "-o", "--output", type=Path, help="结果输出文件，默认输出到标准输出"
+    )
+    args = parser.parse_args()
+
+    result = run(args.scores, args.iterations, args.seed)
+    result = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.write_text(result, encoding="utf-8")
+    else:
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
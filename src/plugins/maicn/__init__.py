@@ -1 +1,3 @@
 from .commands import *
+from . import lifecycle
+from . import web
@@ -1,2 +1,3 @@
 alias_luoxue = ["lx", "lxns", "luoxue", "落雪"]
 alias_divingfish = ["df", "divingfish", "水鱼"]
+alias_local = ["local", "arcade", "本地"]
@@ -1,8 +1,8 @@
-from arclet.alconna import Alconna, Args, Subcommand
+from arclet.alconna import Alconna, Args, Option, Subcommand
 from nepattern import AnyString
 
 from src.utils.helpers.alconna_helper import alc_header
-from ..alias import alias_divingfish, alias_luoxue
+from ..alias import alias_divingfish, alias_local, alias_luoxue
 
 lx_alc = Alconna(
     f"{alc_header}lxns",
@@ -50,11 +50,27 @@ maicn_alc = Alconna(
     Subcommand(
         "update",
         Args["source?", alias_divingfish + alias_luoxue],
+        Option("-f|--full", help_text="上传全部成绩"),
         help_text="更新查分器",
     ),
+    Subcommand(
+        "autosync",
+        Args["switch", ["on", "off"]],
+        help_text="开启或关闭在低峰时段自动更新查分器",
+    ),
     Subcommand(
         "b50",
-        Args["source", alias_divingfish + alias_luoxue],
+        Args["source", alias_divingfish + alias_luoxue + alias_local],
+        Option("-p|--preview", help_text="输出低分辨率预览图"),
         help_text="输出自己的b50成绩",
     ),
+    Subcommand(
+        "admin",
+        Subcommand("reload", help_text="重新加载B50图片资源"),
+        Subcommand("stats", help_text="查看B50渲染缓存统计"),
+        Subcommand("encoders", help_text="对比B50图片各输出编码的体积与耗时"),
+        Subcommand("songs", help_text="更新歌曲定数索引"),
+        Subcommand("sync", help_text="查看成绩自动同步的运行统计"),
+        help_text="管理员命令",
+    ),
 )
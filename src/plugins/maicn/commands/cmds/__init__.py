@@ -1,2 +1,3 @@
 from .cmd_account import *
 from .cmd_score import *
+from .cmd_admin import *
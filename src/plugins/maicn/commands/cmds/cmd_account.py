@@ -11,6 +11,7 @@ from src.plugins.maicn.alias import alias_luoxue, alias_divingfish
 from src.plugins.maicn.libraries import get_maimai_user_preview_info
 from nonebot.adapters.onebot.v11.event import MessageEvent
 from src.plugins.maicn.libraries import get_maimai_uid
+from src.plugins.maicn.libraries import invalidate_maimai_user_preview_info
 from src.utils.helpers.remi_service_helper import (
     RemiServiceHelper,
     UserBindType,
@@ -65,6 +66,7 @@ async def _(event: MessageEvent, alc_result: AlcQuery = AlcQuery("add", 0)):
     ):
         await maicn_matcher.finish(Messages.ERROR_ADD_FAILED)
 
+    invalidate_maimai_user_preview_info(mai_uid)
     await maicn_matcher.finish(Messages.SUCCESS_MAIMAI_ADDED)
 
 
@@ -0,0 +1,78 @@
+from nonebot import logger
+from nonebot.adapters.onebot.v11.event import MessageEvent
+
+from src.plugins.maicn.libraries import (
+    arcade_client,
+    arcade_governor,
+    b50_render_pool,
+    preview_info_cache,
+    refresh_song_index,
+    reload_b50_assets,
+)
+from src.plugins.maicn.libraries.auto_sync import auto_sync_scheduler
+from src.plugins.maicn.commands.matchers import maicn_matcher
+from src.plugins.maicn.messages import Messages
+from src.plugins.permission_manager import admin_only
+
+
+@maicn_matcher.assign("admin.reload")
+@admin_only
+async def _(event: MessageEvent):
+    """重新扫描并加载B50图片资源"""
+    try:
+        await reload_b50_assets()
+    except Exception as e:
+        logger.exception(f"重新加载B50图片资源失败: {e}")
+        await maicn_matcher.finish(Messages.ERROR_ASSETS_RELOAD_FAILED)
+
+    await maicn_matcher.finish(Messages.SUCCESS_ASSETS_RELOADED)
+
+
+@maicn_matcher.assign("admin.stats")
+@admin_only
+async def _(event: MessageEvent):
+    """查看B50渲染缓存与街机连接统计"""
+    stats = b50_render_pool.cache_stats()
+    stats["preview_info"] = preview_info_cache.stats()
+    await maicn_matcher.finish(
+        Messages.format_cache_stats(stats)
+        + "\n"
+        + Messages.format_connection_stats(arcade_client.stats())
+        + "\n"
+        + Messages.format_governor_stats(arcade_governor.stats())
+    )
+
+
+@maicn_matcher.assign("admin.encoders")
+@admin_only
+async def _(event: MessageEvent):
+    """对比B50图片各输出编码的体积与耗时"""
+    try:
+        report = await b50_render_pool.encoder_report()
+    except Exception as e:
+        logger.exception(f"生成编码对比报告失败: {e}")
+        await maicn_matcher.finish(Messages.ERROR_ENCODER_REPORT_FAILED)
+
+    await maicn_matcher.finish(Messages.format_encoder_report(report))
+
+
+@maicn_matcher.assign("admin.songs")
+@admin_only
+async def _(event: MessageEvent):
+    """从落雪重新获取歌曲定数索引"""
+    try:
+        count = await refresh_song_index()
+    except Exception as e:
+        logger.exception(f"更新歌曲定数索引失败: {e}")
+        await maicn_matcher.finish(Messages.ERROR_SONG_INDEX_REFRESH_FAILED)
+
+    await maicn_matcher.finish(Messages.format_song_index_refreshed(count))
+
+
+@maicn_matcher.assign("admin.sync")
+@admin_only
+async def _(event: MessageEvent):
+    """查看成绩自动同步的运行统计"""
+    await maicn_matcher.finish(
+        Messages.format_auto_sync_stats(auto_sync_scheduler.stats())
+    )
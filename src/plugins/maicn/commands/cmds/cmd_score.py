@@ -1,3 +1,5 @@
+import asyncio
+
 import httpx
 from nonebot import logger
 from maimai_py import PlayerIdentifier
@@ -6,7 +8,7 @@ from arclet.alconna import SubcommandResult
 from nonebot import require
 from nonebot.exception import FinishedException
 
-from src.plugins.maicn.alias import alias_luoxue, alias_divingfish
+from src.plugins.maicn.alias import alias_luoxue, alias_divingfish, alias_local
 from src.plugins.maicn.libraries import (
     maimai_py_client,
     lxns_provider,
@@ -14,8 +16,15 @@ from src.plugins.maicn.libraries import (
     mai_cn_score_to_maimaipy,
     divingfish_provider,
     get_maimai_user_preview_info,
-    B50ImageGenerator,
+    invalidate_maimai_user_preview_info,
+    get_b50_generator,
+    b50_render_pool,
+    b50_image_store,
+    RenderPoolBusy,
 )
+from src.plugins.maicn.libraries.auto_sync import set_auto_sync
+from src.plugins.maicn.libraries.local_bests import compute_local_bests
+from src.plugins.maicn.libraries.score_sync import upload_to_divingfish, upload_to_lxns
 from nonebot.adapters.onebot.v11.event import MessageEvent
 from src.utils.helpers.remi_service_helper import RemiServiceHelper, UserBindType
 
@@ -30,6 +39,8 @@ from src.plugins.maicn.commands.cmds.helpers import (
     get_user_bind_info_or_finish,
     validate_bind_source,
     get_divingfish_credentials,
+    get_remi_uuid_or_finish,
+    single_flight,
 )
 from src.plugins.maicn.messages import Messages
 from src.plugins.permission_manager import require_permission
@@ -39,10 +50,12 @@ config = get_plugin_config(Config)
 
 @maicn_matcher.assign("update")
 @require_permission("maicn", "update")
+@single_flight("update")
 async def _(event: MessageEvent, alc_result: AlcQuery = AlcQuery("update", 0)):
     r: SubcommandResult = alc_result.result
     user_qq = event.get_user_id()
     update_source = r.args.get("source") or None
+    full_sync = "full" in r.options
     remi_helper = RemiServiceHelper(config.remi_service_base_url)
 
     # 使用辅助函数获取用户绑定信息
@@ -52,10 +65,12 @@ async def _(event: MessageEvent, alc_result: AlcQuery = AlcQuery("update", 0)):
     if not user_current_maimai_bind["others"]:
         await maicn_matcher.finish(Messages.HINT_NO_BIND)
 
-    source_updated = []
+    source_updated: dict[str, int] = {}
     user_score = await mai_cn_score_to_maimaipy(
         await get_maimai_user_all_score(maimai_uid)
     )
+    # 上传成绩通常意味着刚游玩过，Rating可能已变化
+    invalidate_maimai_user_preview_info(maimai_uid)
 
     if not update_source or update_source in alias_divingfish:
         df_bind = None
@@ -68,14 +83,13 @@ async def _(event: MessageEvent, alc_result: AlcQuery = AlcQuery("update", 0)):
                 username, password = await get_divingfish_credentials(
                     user_current_maimai_bind
                 )
-                await maimai_py_client.updates(
-                    identifier=PlayerIdentifier(
-                        username=username, credentials=password
-                    ),
-                    scores=user_score,
-                    provider=divingfish_provider,
+                source_updated["水鱼"] = await upload_to_divingfish(
+                    maimai_uid,
+                    username,
+                    password,
+                    user_score,
+                    full=full_sync,
                 )
-                source_updated.append("水鱼")
             except Exception as e:
                 logger.exception(f"更新水鱼数据失败: {e}")
                 await maicn_matcher.finish(Messages.ERROR_SHUIYU_UPDATE_FAILED)
@@ -88,10 +102,8 @@ async def _(event: MessageEvent, alc_result: AlcQuery = AlcQuery("update", 0)):
                 break
         if lx_bind:
             try:
-                await maimai_py_client.updates(
-                    identifier=PlayerIdentifier(friend_code=lx_bind["bind_content"]),
-                    scores=user_score,
-                    provider=lxns_provider,
+                lx_uploaded = await upload_to_lxns(
+                    maimai_uid, lx_bind["bind_content"], user_score, full=full_sync
                 )
             except httpx.HTTPStatusError as e:
                 if "404 Not Found" in str(e):
@@ -103,23 +115,46 @@ async def _(event: MessageEvent, alc_result: AlcQuery = AlcQuery("update", 0)):
                 logger.exception(f"更新落雪数据失败: {e}")
                 await maicn_matcher.finish(Messages.ERROR_LXNS_UPDATE_FAILED)
 
-            source_updated.append("落雪")
+            source_updated["落雪"] = lx_uploaded
 
     if source_updated:
-        await maicn_matcher.finish(
-            Messages.format_score_update_success(",".join(source_updated))
-        )
+        await maicn_matcher.finish(Messages.format_score_update_success(source_updated))
     else:
         await maicn_matcher.finish(Messages.ERROR_NO_UPDATE_SOURCE)
 
 
+@maicn_matcher.assign("autosync")
+@require_permission("maicn", "autosync")
+async def _(event: MessageEvent, alc_result: AlcQuery = AlcQuery("autosync", 0)):
+    """开启或关闭成绩自动同步"""
+    r: SubcommandResult = alc_result.result
+    user_qq = event.get_user_id()
+    enabled = r.args["switch"] == "on"
+    remi_helper = RemiServiceHelper(config.remi_service_base_url)
+    remi_uuid = await get_remi_uuid_or_finish(user_qq, remi_helper)
+
+    try:
+        await set_auto_sync(user_qq, remi_uuid, enabled)
+    except Exception as e:
+        logger.exception(f"设置自动同步失败: {e}")
+        await maicn_matcher.finish(Messages.ERROR_AUTO_SYNC_FAILED)
+
+    if not enabled:
+        await maicn_matcher.finish(Messages.SUCCESS_AUTO_SYNC_DISABLED)
+    if not config.maicn_auto_sync_enabled:
+        await maicn_matcher.finish(Messages.HINT_AUTO_SYNC_DISABLED)
+    await maicn_matcher.finish(Messages.SUCCESS_AUTO_SYNC_ENABLED)
+
+
 @maicn_matcher.assign("b50")
 @require_permission("maicn", "b50")
+@single_flight("b50")
 async def _(event: MessageEvent, alc_result: AlcQuery = AlcQuery("b50", 0)):
     """处理b50命令"""
     r: SubcommandResult = alc_result.result
     user_qq = event.get_user_id()
     source = r.args.get("source") or "落雪"
+    preview = "preview" in r.options
 
     try:
         # 获取用户绑定信息
@@ -132,28 +167,36 @@ async def _(event: MessageEvent, alc_result: AlcQuery = AlcQuery("b50", 0)):
         mai_uid = int(user_current_maimai_bind["maimai"]["bind_content"])
         player_preview = await get_maimai_user_preview_info(mai_uid)
 
-        # 选择数据源
-        provider = lxns_provider if source in alias_luoxue else divingfish_provider
-
-        # 获取绑定的查分器用户名
-        bind_name = await validate_bind_source(user_current_maimai_bind, source)
-
-        # 使用maimai_py获取B50数据
-        if source in alias_luoxue:
-            # 落雪查分器使用friend_code
-            player_identifier = PlayerIdentifier(friend_code=bind_name)
-        else:
-            # 水鱼查分器使用账号密码
-            username, password = await get_divingfish_credentials(
-                user_current_maimai_bind
-            )
-            player_identifier = PlayerIdentifier(
-                username=username, credentials=password
+        if source in alias_local:
+            # 直接从街机获取成绩并在本地计算B50，不经过查分器
+            player_scores = compute_local_bests(
+                await mai_cn_score_to_maimaipy(await get_maimai_user_all_score(mai_uid))
             )
+            source_key = "local"
+        else:
+            # 选择数据源
+            provider = lxns_provider if source in alias_luoxue else divingfish_provider
+
+            # 获取绑定的查分器用户名
+            bind_name = await validate_bind_source(user_current_maimai_bind, source)
+
+            # 使用maimai_py获取B50数据
+            if source in alias_luoxue:
+                # 落雪查分器使用friend_code
+                player_identifier = PlayerIdentifier(friend_code=bind_name)
+            else:
+                # 水鱼查分器使用账号密码
+                username, password = await get_divingfish_credentials(
+                    user_current_maimai_bind
+                )
+                player_identifier = PlayerIdentifier(
+                    username=username, credentials=password
+                )
 
-        player_scores = await maimai_py_client.scores(
-            player_identifier, provider=provider
-        )
+            player_scores = await maimai_py_client.scores(
+                player_identifier, provider=provider
+            )
+            source_key = "lxns" if source in alias_luoxue else "divingfish"
 
         if not player_scores:
             await maicn_matcher.finish(Messages.ERROR_SCORE_DATA_FETCH_FAILED)
@@ -162,8 +205,8 @@ async def _(event: MessageEvent, alc_result: AlcQuery = AlcQuery("b50", 0)):
         b35_scores = player_scores.scores_b35
         b15_scores = player_scores.scores_b15
 
-        # 生成图片
-        generator = B50ImageGenerator()
+        # 生成图片（使用预加载资源的共享生成器）
+        generator = get_b50_generator(preview)
 
         # 转换数据格式
         b35_data = [generator._convert_score_to_dict(score) for score in b35_scores]
@@ -175,10 +218,33 @@ async def _(event: MessageEvent, alc_result: AlcQuery = AlcQuery("b50", 0)):
             "rating": player_scores.rating,
         }
 
-        image_bytes = generator.generate_b50_image(player_data, b35_data, b15_data)
-
-        # 发送图片
-        message = UniMessage.image(raw=image_bytes)
+        # 同一玩家不同数据源的B50分别保留画布，用于增量重绘
+        player_key = f"{user_qq}:{source_key}"
+
+        # 在渲染池中生成图片，避免阻塞事件循环
+        try:
+            image_bytes = await b50_render_pool.render(
+                player_data,
+                b35_data,
+                b15_data,
+                player_key=player_key,
+                preview=preview,
+            )
+        except RenderPoolBusy:
+            await maicn_matcher.finish(Messages.ERROR_B50_BUSY)
+        except asyncio.TimeoutError:
+            await maicn_matcher.finish(Messages.ERROR_B50_TIMEOUT)
+
+        # 发送图片，配置了图片地址时只发送URL
+        if b50_image_store is not None:
+            image_name = await asyncio.to_thread(
+                b50_image_store.put, image_bytes, generator.encode_options.suffix
+            )
+            message = UniMessage.image(url=b50_image_store.url(image_name))
+        else:
+            message = UniMessage.image(
+                raw=image_bytes, mimetype=generator.encode_options.mimetype
+            )
 
         await maicn_matcher.finish(message)
 
@@ -3,13 +3,65 @@
 提供常用的用户绑定信息获取和验证功能，减少重复代码。
 """
 
-from typing import Optional, Dict, Any
+from functools import wraps
+from typing import Optional, Dict, Any, Callable
 from nonebot import logger
-from src.utils.helpers.remi_service_helper import RemiServiceHelper, UserBindType
+from nonebot.adapters.onebot.v11.event import MessageEvent
+from src.utils.helpers.remi_service_helper import (
+    RemiServiceHelper,
+    UserBindType,
+    parse_divingfish_credentials,
+)
 from src.plugins.maicn.commands.matchers import maicn_matcher
 from src.plugins.maicn.alias import alias_luoxue, alias_divingfish
 from src.plugins.maicn.messages import Messages
 
+# 正在执行的命令，元素为(命令名, 用户QQ号)
+_running_commands: set[tuple[str, str]] = set()
+
+
+def single_flight(command: str):
+    """同一用户的命令仍在执行时，重复发送的同名命令直接提示稍候，不再重复执行
+
+    Args:
+        command: 命令名称 (如: update, b50)
+
+    Usage:
+        @maicn_matcher.assign("update")
+        @require_permission("maicn", "update")
+        @single_flight("update")
+        async def _(event: MessageEvent, ...):
+            pass
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            event = next(
+                (
+                    value
+                    for value in (*args, *kwargs.values())
+                    if isinstance(value, MessageEvent)
+                ),
+                None,
+            )
+            if event is None:
+                return await func(*args, **kwargs)
+
+            key = (command, event.get_user_id())
+            if key in _running_commands:
+                await maicn_matcher.finish(Messages.HINT_COMMAND_IN_PROGRESS)
+
+            _running_commands.add(key)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _running_commands.discard(key)
+
+        return wrapper
+
+    return decorator
+
 
 async def get_user_bind_info_or_finish(
     user_qq: str, remi_helper: RemiServiceHelper
@@ -110,29 +162,23 @@ async def get_divingfish_credentials(binds: Dict[str, Any]) -> tuple[str, str]:
     Raises:
         FinishedException: 当解析失败时直接结束对话
     """
-    df_bind = None
-    for bind in binds.get("others", []):
-        if bind["bind_type"] == UserBindType.DivingFish:
-            df_bind = bind
-            break
-
-    if not df_bind:
-        await maicn_matcher.finish(Messages.HINT_NO_SHUIYU_BIND)
+    import json
 
     try:
-        import json
-
-        bind_data = json.loads(df_bind["bind_content"])
-        username = bind_data["username"]
-        password = bind_data["password"]
-        return username, password
+        credentials = parse_divingfish_credentials(binds)
     except json.JSONDecodeError:
-        logger.error(f"水鱼绑定数据格式错误: {df_bind['bind_content']}")
+        # 绑定内容包含密码，不写入日志
+        logger.error("水鱼绑定数据格式错误")
         await maicn_matcher.finish(Messages.ERROR_SHUIYU_BIND_FORMAT)
     except KeyError as e:
         logger.error(f"水鱼绑定数据缺少必要字段: {e}")
         await maicn_matcher.finish(Messages.ERROR_SHUIYU_BIND_FORMAT)
 
+    if credentials is None:
+        await maicn_matcher.finish(Messages.HINT_NO_SHUIYU_BIND)
+
+    return credentials
+
 
 async def get_remi_uuid_or_finish(user_qq: str, remi_helper: RemiServiceHelper) -> str:
     """获取用户UUID，失败时直接结束对话
@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from typing import Literal
+
+from pydantic import BaseModel, field_validator
 
 
 class Config(BaseModel):
@@ -20,3 +22,83 @@ class Config(BaseModel):
     proxy_port: int
     proxy_username: str
     proxy_password: str
+
+    # 舞萌街机接口的连接池与超时（秒）
+    maimai_arcade_max_connections: int = 10
+    maimai_arcade_keepalive_expiry: float = 60.0
+    maimai_arcade_timeout: float = 15.0
+    maimai_arcade_connect_timeout: float = 5.0
+    # 街机接口限流：每秒请求数（为0时不限速）、突发上限、同时进行的请求数，
+    # 完整成绩拉取另有并发上限，为轻量请求保留名额
+    maimai_arcade_rate_limit: float = 5.0
+    maimai_arcade_burst: int = 10
+    maimai_arcade_max_in_flight: int = 8
+    maimai_arcade_bulk_max_in_flight: int = 4
+    maimai_arcade_background_max_in_flight: int = 2
+    # 玩家预览信息缓存，TTL为0时只合并并发请求
+    maimai_preview_cache_ttl: int = 300
+    maimai_preview_cache_size: int = 1024
+
+    # 插件数据目录
+    maicn_data_path: str = "data/maicn"
+    # 歌曲定数索引的自动更新间隔（小时），为0时只在没有快照时获取
+    maicn_song_index_refresh_hours: float = 24
+    # 本地计算B50时B15对应的版本号（如 25000），为0时使用maimai.py的当前版本
+    maicn_current_version: int = 0
+    # 成绩后台自动同步（只同步通过 /maicn autosync on 开启的用户）
+    maicn_auto_sync_enabled: bool = False
+    # 同步时段（0-23点，不含结束时刻），结束小于开始时跨过零点，两者相等时全天运行
+    maicn_auto_sync_start_hour: int = 3
+    maicn_auto_sync_end_hour: int = 7
+    # 同一用户两次同步的最小间隔（小时）
+    maicn_auto_sync_interval_hours: float = 20
+    maicn_auto_sync_concurrency: int = 2
+    maicn_auto_sync_batch_size: int = 20
+    # 每个用户开始同步前的随机等待上限（秒）
+    maicn_auto_sync_jitter: float = 10.0
+    # 一批中有用户失败时的暂停时间（秒），连续出错时翻倍直到上限
+    maicn_auto_sync_backoff: float = 60.0
+    maicn_auto_sync_max_backoff: float = 1800.0
+    # 连续失败达到该次数的用户不再自动同步，重新开启后恢复
+    maicn_auto_sync_max_failures: int = 5
+
+    # B50图片生成
+    b50_cover_cache_size: int = 512
+    b50_cover_prebuild: bool = True
+    # 监视资源目录，文件变化时自动重新加载
+    b50_asset_watch: bool = True
+    b50_text_cache_size: int = 4096
+    b50_card_cache_size: int = 256
+    b50_font_cache_size: int = 64
+    # 启动时预先加载的字体字号，键为字体类型（hr / torus）
+    b50_font_prewarm_sizes: dict[str, list[int]] = {
+        "hr": [28, 14, 13],
+        "torus": [30, 14, 13],
+    }
+    # 每个渲染进程保留最近画布的玩家数，用于增量重绘，为0时关闭
+    b50_canvas_store_size: int = 8
+    # 预览模式（/maicn b50 --preview）的布局缩放比例
+    b50_preview_scale: float = 0.5
+    # 输出编码：png / jpeg / webp，不区分大小写
+    b50_image_format: Literal["png", "jpeg", "webp"] = "png"
+    b50_image_quality: int = 90
+    b50_png_compress_level: int = 6
+    # 去除透明通道后再编码，可减小PNG体积，但会改变现有输出的外观
+    b50_flatten_alpha: bool = False
+    # 成品图片缓存，TTL为0时关闭
+    b50_result_cache_ttl: int = 600
+    b50_result_cache_memory_mb: int = 64
+    b50_result_cache_disk_mb: int = 256
+    # bot的HTTP服务对OneBot实现可访问的地址（如 http://127.0.0.1:8080），
+    # 设置后B50图片以URL发送，为空时直接以字节发送
+    b50_image_base_url: str = ""
+    b50_image_store_ttl: int = 3600
+    # 渲染进程数，为0时在后台线程中渲染
+    b50_render_workers: int = 2
+    b50_render_queue_size: int = 8
+    b50_render_timeout: float = 30.0
+
+    @field_validator("b50_image_format", mode="before")
+    @classmethod
+    def _lower_image_format(cls, value):
+        return value.lower() if isinstance(value, str) else value
@@ -1,3 +1,18 @@
-from .b50_image import B50ImageGenerator
+from .b50_image import (
+    B50ImageGenerator,
+    EncodeOptions,
+    asset_manifest,
+    get_b50_generator,
+    reload_b50_generator,
+)
+from .render_pool import (
+    B50Job,
+    B50RenderPool,
+    RenderPoolBusy,
+    b50_render_pool,
+    b50_result_cache,
+    reload_b50_assets,
+)
+from .image_store import IMAGE_MEDIA_TYPES, IMAGE_ROUTE, b50_image_store
 from .lxns import *
 from .maimai_cn import *
@@ -0,0 +1,100 @@
+"""静态资源清单
+
+启动时扫描一次资源目录，记录所有可用文件及其修改时间。渲染过程中判断文件是否存在时
+只查询内存中的清单，不再产生文件系统调用。资源目录变化后需要调用 refresh 重新扫描。
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Iterable
+
+from nonebot import logger
+
+
+class AssetManifest:
+    """资源目录下可用文件的内存清单"""
+
+    def __init__(self, root: Path):
+        self.root = root
+        # 键为相对于root的目录（POSIX格式，根目录为"."），值为该目录下文件名到修改时间的映射
+        self._files: dict[str, dict[str, float]] | None = None
+        self._lock = threading.RLock()
+
+    def refresh(self) -> int:
+        """重新扫描资源目录，返回文件总数"""
+        files: dict[str, dict[str, float]] = {}
+        if self.root.is_dir():
+            for dirpath, _, filenames in os.walk(self.root):
+                relative = Path(dirpath).relative_to(self.root).as_posix()
+                mtimes = {}
+                for name in filenames:
+                    try:
+                        mtimes[name] = os.stat(os.path.join(dirpath, name)).st_mtime
+                    except FileNotFoundError:
+                        continue
+                files[relative] = mtimes
+
+        # 整体替换，读取方不会看到扫描到一半的清单
+        self._files = files
+        total = sum(len(names) for names in files.values())
+        logger.info(f"资源清单已刷新，共 {total} 个文件")
+        return total
+
+    def _ensure_scanned(self) -> dict[str, dict[str, float]]:
+        files = self._files
+        if files is None:
+            with self._lock:
+                if self._files is None:
+                    self.refresh()
+                files = self._files
+        return files
+
+    def _split(self, path: Path) -> tuple[str, str] | None:
+        try:
+            relative = path.relative_to(self.root)
+        except ValueError:
+            return None
+        return relative.parent.as_posix(), relative.name
+
+    def exists(self, path: Path) -> bool:
+        """判断文件是否存在，资源目录之外的路径直接查询文件系统"""
+        parts = self._split(path)
+        if parts is None:
+            return path.exists()
+        directory, name = parts
+        return name in self._ensure_scanned().get(directory, ())
+
+    def mtime(self, path: Path) -> float | None:
+        """获取扫描时记录的文件修改时间，文件不存在时返回None"""
+        parts = self._split(path)
+        if parts is None:
+            try:
+                return path.stat().st_mtime
+            except FileNotFoundError:
+                return None
+        directory, name = parts
+        return self._ensure_scanned().get(directory, {}).get(name)
+
+    def add(self, path: Path) -> None:
+        """登记新写入资源目录的文件"""
+        self.add_many([path])
+
+    def add_many(self, paths: Iterable[Path]) -> None:
+        """批量登记新写入资源目录的文件，整批只替换一次清单"""
+        updates: dict[str, dict[str, float]] = {}
+        for path in paths:
+            parts = self._split(path)
+            if parts is None:
+                continue
+            directory, name = parts
+            updates.setdefault(directory, {})[name] = path.stat().st_mtime
+        if not updates:
+            return
+
+        with self._lock:
+            # 复制后整体替换，读取方不会看到更新到一半的清单
+            files = dict(self._ensure_scanned())
+            for directory, mtimes in updates.items():
+                files[directory] = {**files.get(directory, {}), **mtimes}
+            self._files = files
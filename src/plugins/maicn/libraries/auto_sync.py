@@ -0,0 +1,297 @@
+"""成绩后台自动同步
+
+在配置的低峰时段内，分批遍历开启了自动同步的用户，按与 /maicn update 相同的流程
+拉取街机成绩并上传到已绑定的查分器。每个用户成功同步后记录同步时间，
+进程重启或时段结束后再次运行时会跳过本轮已同步的用户，从中断处继续。
+"""
+
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any
+
+from nonebot import get_plugin_config, logger, require
+from sqlalchemy import select, update
+
+require("nonebot_plugin_orm")
+
+from nonebot_plugin_orm import get_session
+
+from src.plugins.maicn.config import Config
+from src.plugins.maicn.libraries.maimai_cn import (
+    ArcadeLane,
+    get_maimai_user_all_score,
+    invalidate_maimai_user_preview_info,
+    mai_cn_score_to_maimaipy,
+)
+from src.plugins.maicn.libraries.score_sync import upload_to_divingfish, upload_to_lxns
+from src.plugins.maicn.models import AutoSyncUser
+from src.utils.helpers.remi_service_helper import (
+    RemiServiceHelper,
+    UserBindType,
+    parse_divingfish_credentials,
+)
+
+config = get_plugin_config(Config)
+
+
+def in_sync_window(now: datetime, start_hour: int, end_hour: int) -> bool:
+    """判断当前时间是否在同步时段内，结束时间小于开始时间时表示跨过零点"""
+    if start_hour == end_hour:
+        return True
+    if start_hour < end_hour:
+        return start_hour <= now.hour < end_hour
+    return now.hour >= start_hour or now.hour < end_hour
+
+
+def seconds_until_window(now: datetime, start_hour: int) -> float:
+    """距离下一次同步时段开始的秒数"""
+    start = now.replace(hour=start_hour, minute=0, second=0, microsecond=0)
+    if start <= now:
+        start += timedelta(days=1)
+    return (start - now).total_seconds()
+
+
+async def set_auto_sync(qq: str, remi_uuid: str, enabled: bool) -> None:
+    """开启或关闭用户的自动同步，重新开启时清空连续失败次数"""
+    async with get_session() as session:
+        user = await session.scalar(select(AutoSyncUser).where(AutoSyncUser.qq == qq))
+        if user is None:
+            if not enabled:
+                return
+            session.add(AutoSyncUser(qq=qq, remi_uuid=remi_uuid, enabled=True))
+        else:
+            user.remi_uuid = remi_uuid
+            user.enabled = enabled
+            if enabled:
+                user.consecutive_failures = 0
+        await session.commit()
+
+
+class AutoSyncScheduler:
+    """成绩后台同步调度器
+
+    每批读取若干个到期用户，以有限并发同步，每个用户开始前随机等待一段时间以分散请求。
+    一批中出现失败时按指数退避暂停，整批成功后恢复。
+    """
+
+    def __init__(self, remi_helper: RemiServiceHelper):
+        self.remi_helper = remi_helper
+        self.running = False
+        self.current_run: dict[str, Any] | None = None
+        self.last_run: dict[str, Any] | None = None
+        self._backoff = 0.0
+
+    @staticmethod
+    def _new_run() -> dict[str, Any]:
+        return {
+            "started_at": time.time(),
+            "finished_at": None,
+            "completed": False,
+            "users": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "skipped": 0,
+            "uploaded": 0,
+        }
+
+    def stats(self) -> dict[str, Any]:
+        """当前或最近一次运行的统计，包含耗时与每分钟同步用户数"""
+        run = self.current_run or self.last_run
+        if run is None:
+            return {"running": self.running, "run": None, "backoff": self._backoff}
+
+        elapsed = (run["finished_at"] or time.time()) - run["started_at"]
+        return {
+            "running": self.current_run is not None,
+            "run": {
+                **run,
+                "elapsed": elapsed,
+                "users_per_minute": run["users"] / elapsed * 60 if elapsed else 0.0,
+            },
+            "backoff": self._backoff,
+        }
+
+    async def sync_user(self, remi_uuid: str) -> int | None:
+        """同步单个用户的成绩，返回上传的成绩数，没有可同步的查分器时返回None"""
+        bind_info = await self.remi_helper.get_current_maimai_bind_info(remi_uuid)
+        if not bind_info or not bind_info["others"]:
+            return None
+
+        mai_uid = bind_info["maimai"]["bind_content"]
+        scores = await mai_cn_score_to_maimaipy(
+            await get_maimai_user_all_score(mai_uid, ArcadeLane.BACKGROUND)
+        )
+        invalidate_maimai_user_preview_info(mai_uid)
+
+        # 一个查分器失败不影响另一个查分器的上传
+        uploaded = 0
+        errors = []
+        try:
+            credentials = parse_divingfish_credentials(bind_info)
+            if credentials is not None:
+                username, password = credentials
+                uploaded += await upload_to_divingfish(
+                    mai_uid, username, password, scores
+                )
+        except Exception as e:
+            errors.append(e)
+
+        for bind in bind_info["others"]:
+            if bind["bind_type"] != UserBindType.Luoxue:
+                continue
+            try:
+                uploaded += await upload_to_lxns(mai_uid, bind["bind_content"], scores)
+            except Exception as e:
+                errors.append(e)
+            break
+
+        if errors:
+            raise errors[0]
+        return uploaded
+
+    async def _due_users(self, after_id: int, limit: int) -> list[AutoSyncUser]:
+        """按ID顺序读取本轮尚未同步的用户"""
+        synced_after = datetime.now() - timedelta(
+            hours=config.maicn_auto_sync_interval_hours
+        )
+        async with get_session() as session:
+            result = await session.scalars(
+                select(AutoSyncUser)
+                .where(
+                    AutoSyncUser.id > after_id,
+                    AutoSyncUser.enabled.is_(True),
+                    AutoSyncUser.consecutive_failures
+                    < config.maicn_auto_sync_max_failures,
+                    (AutoSyncUser.last_synced_at.is_(None))
+                    | (AutoSyncUser.last_synced_at < synced_after),
+                )
+                .order_by(AutoSyncUser.id)
+                .limit(limit)
+            )
+            return list(result)
+
+    async def _record(self, user_id: int, succeeded: bool) -> None:
+        values = (
+            {"last_synced_at": datetime.now(), "consecutive_failures": 0}
+            if succeeded
+            else {"consecutive_failures": AutoSyncUser.consecutive_failures + 1}
+        )
+        try:
+            async with get_session() as session:
+                await session.execute(
+                    update(AutoSyncUser)
+                    .where(AutoSyncUser.id == user_id)
+                    .values(**values)
+                )
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"记录自动同步结果失败: {e}")
+
+    async def _sync_one(
+        self, user: AutoSyncUser, semaphore: asyncio.Semaphore, run: dict[str, Any]
+    ) -> bool:
+        """同步一个用户并记录结果，返回是否失败"""
+        async with semaphore:
+            await asyncio.sleep(random.uniform(0, config.maicn_auto_sync_jitter))
+            try:
+                uploaded = await self.sync_user(user.remi_uuid)
+            except Exception as e:
+                logger.warning(f"自动同步用户 {user.qq} 的成绩失败: {e}")
+                run["failed"] += 1
+                await self._record(user.id, succeeded=False)
+                return True
+
+        if uploaded is None:
+            run["skipped"] += 1
+        else:
+            run["succeeded"] += 1
+            run["uploaded"] += uploaded
+        await self._record(user.id, succeeded=True)
+        return False
+
+    def _increase_backoff(self) -> float:
+        """将退避时间翻倍（首次为配置的初始值），返回新的退避时间"""
+        self._backoff = min(
+            config.maicn_auto_sync_max_backoff,
+            max(config.maicn_auto_sync_backoff, self._backoff * 2),
+        )
+        return self._backoff
+
+    async def run_once(self, until: float | None = None) -> dict[str, Any]:
+        """同步所有到期用户，until为停止时间（time.time()），到达后在批次之间停止"""
+        run = self.current_run = self._new_run()
+        semaphore = asyncio.Semaphore(max(1, config.maicn_auto_sync_concurrency))
+        cursor = 0
+        try:
+            while until is None or time.time() < until:
+                users = await self._due_users(
+                    cursor, max(1, config.maicn_auto_sync_batch_size)
+                )
+                if not users:
+                    run["completed"] = True
+                    break
+                cursor = users[-1].id
+                run["users"] += len(users)
+
+                failures = await asyncio.gather(
+                    *(self._sync_one(user, semaphore, run) for user in users)
+                )
+                if any(failures):
+                    # 街机或查分器出错时暂停，避免在对方异常时继续施压
+                    delay = self._increase_backoff()
+                    logger.info(
+                        f"自动同步本批有 {sum(failures)} 个用户失败，暂停 {delay:.0f} 秒"
+                    )
+                    await asyncio.sleep(delay)
+                else:
+                    self._backoff = 0.0
+        finally:
+            run["finished_at"] = time.time()
+            self.last_run = run
+            self.current_run = None
+        return run
+
+    async def run_forever(self) -> None:
+        """在每天的同步时段内运行一轮同步"""
+        start_hour = config.maicn_auto_sync_start_hour
+        end_hour = config.maicn_auto_sync_end_hour
+        self.running = True
+        try:
+            while True:
+                now = datetime.now()
+                if not in_sync_window(now, start_hour, end_hour):
+                    await asyncio.sleep(seconds_until_window(now, start_hour))
+                    continue
+
+                until = None
+                if start_hour != end_hour:
+                    until = time.time() + seconds_until_window(now, end_hour)
+                try:
+                    run = await self.run_once(until)
+                except Exception as e:
+                    # 读取用户列表等失败时在本时段内稍后重试，已同步的用户会被跳过
+                    delay = self._increase_backoff()
+                    logger.exception(f"自动同步运行失败，{delay:.0f} 秒后重试: {e}")
+                    await asyncio.sleep(delay)
+                    continue
+
+                self._backoff = 0.0
+                logger.info(
+                    f"自动同步完成: 用户 {run['users']} 成功 {run['succeeded']} "
+                    f"失败 {run['failed']} 跳过 {run['skipped']} "
+                    f"上传 {run['uploaded']} 条成绩"
+                )
+
+                # 本轮结束后等到下一个时段，未完成的用户在下一时段继续
+                await asyncio.sleep(
+                    seconds_until_window(datetime.now(), start_hour)
+                    if start_hour != end_hour
+                    else config.maicn_auto_sync_interval_hours * 3600
+                )
+        finally:
+            self.running = False
+
+
+auto_sync_scheduler = AutoSyncScheduler(RemiServiceHelper(config.remi_service_base_url))
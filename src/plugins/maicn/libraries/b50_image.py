@@ -1,17 +1,135 @@
+import hashlib
+import json
+import time
+from dataclasses import asdict, dataclass
 from io import BytesIO
 from pathlib import Path
 from typing import Any
 
-from nonebot import logger
+from nonebot import get_plugin_config, logger
 from maimai_py import SongType
 from PIL import Image, ImageDraw, ImageFont
 
+from src.plugins.maicn.config import Config
+from src.plugins.maicn.libraries.asset_manifest import AssetManifest
+from src.plugins.maicn.libraries.cache import LRUCache
+from src.plugins.maicn.libraries.cover_archive import CoverArchive
+
+config = get_plugin_config(Config)
+
+
+@dataclass(frozen=True)
+class EncodeOptions:
+    """B50图片输出编码参数"""
+
+    format: str = "png"  # png / jpeg / webp
+    quality: int = 90  # jpeg与webp的质量
+    png_compress_level: int = 6
+    flatten_alpha: bool = False  # 是否去除透明通道后再编码
+
+    @property
+    def mimetype(self) -> str:
+        return {"jpeg": "image/jpeg", "webp": "image/webp"}.get(
+            self.format, "image/png"
+        )
+
+    @property
+    def suffix(self) -> str:
+        return {"jpeg": ".jpg", "webp": ".webp"}.get(self.format, ".png")
+
+
+# 输出编码对比报告中测试的参数组合
+ENCODER_REPORT_CANDIDATES = [
+    EncodeOptions("png", png_compress_level=1),
+    EncodeOptions("png", png_compress_level=6),
+    EncodeOptions("png", png_compress_level=1, flatten_alpha=True),
+    EncodeOptions("png", png_compress_level=6, flatten_alpha=True),
+    EncodeOptions("jpeg", quality=80),
+    EncodeOptions("jpeg", quality=90),
+    EncodeOptions("webp", quality=80),
+    EncodeOptions("webp", quality=90),
+]
+
+
+@dataclass
+class RenderedCanvas:
+    """玩家最近一次渲染的画布，以及绘制时的头部与卡片标识"""
+
+    canvas: Image.Image
+    header_key: tuple
+    b35_keys: list[tuple]
+    b15_keys: list[tuple]
+
+
+# 缓存中标记"封面不存在"的哨兵值
+_MISSING = object()
+
+# 文本截断结果缓存，键为(文本, 字体标识, 最大宽度)
+_truncate_cache: LRUCache[tuple, str] = LRUCache(config.b50_text_cache_size)
+
+# 字体实例缓存，键为(字体类型, 字号)，所有生成器共享
+_font_cache: LRUCache[tuple[str, int], ImageFont.FreeTypeFont] = LRUCache(
+    config.b50_font_cache_size
+)
+
+# 复用的文本测量画布
+_measure_draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+
+
+def _normalize_value(value):
+    """枚举使用名称，保证跨进程稳定"""
+    return getattr(value, "name", value)
+
+
+def _font_identity(font: ImageFont.ImageFont) -> tuple:
+    """返回字体的标识，同一字体文件和字号的实例视为相同"""
+    path = getattr(font, "path", None)
+    if path:
+        return (str(path), font.size)
+    return ("id", id(font))
+
+
+def _text_width(text: str, font: ImageFont.ImageFont) -> int:
+    bbox = _measure_draw.textbbox((0, 0), text, font=font)
+    return bbox[2] - bbox[0]
+
+
+def _measure_truncated_text(
+    text: str, max_width: int, font: ImageFont.ImageFont
+) -> str:
+    """按像素宽度截断文本，超出时以省略号结尾"""
+    # 如果文本宽度小于等于最大宽度，直接返回
+    if _text_width(text, font) <= max_width:
+        return text
+
+    # 可用于文本的宽度
+    available_width = max_width - _text_width("...", font)
+
+    # 二分查找最佳截断位置
+    left, right = 0, len(text)
+    best_length = 0
+
+    while left <= right:
+        mid = (left + right) // 2
+
+        if _text_width(text[:mid], font) <= available_width:
+            best_length = mid
+            left = mid + 1
+        else:
+            right = mid - 1
+
+    return f"{text[:best_length]}..." if best_length > 0 else "..."
+
 
 class B50ImageGenerator:
     # 静态资源路径
     STATIC_PATH = Path("resources/yuzu/static")
     MAI_PIC_PATH = STATIC_PATH / "mai" / "pic"
     MAI_COVER_PATH = STATIC_PATH / "mai" / "cover"
+    # 预缩放到卡片尺寸的封面目录
+    MAI_COVER_RESIZED_PATH = STATIC_PATH / "mai" / "cover_75x75"
+    # 预缩放封面的打包文件，由 scripts/pack_covers.py 生成
+    MAI_COVER_ARCHIVE_PATH = STATIC_PATH / "mai" / "cover_75x75.pack"
     FONT_HR_PATH = STATIC_PATH / "ResourceHanRoundedCN-Bold.ttf"
     FONT_TORUS_PATH = STATIC_PATH / "Torus SemiBold.otf"
 
@@ -30,19 +148,102 @@ class B50ImageGenerator:
     CARD_SIZE = (270, 114)
     COVER_SIZE = (75, 75)
     CANVAS_SIZE = (1400, 1600)
+    LOGO_SIZE = (249, 120)
+    # 卡片网格：B35/B15起始纵坐标与卡位间距
+    B35_START_Y = 235
+    B15_START_Y = 1085
+    CARD_PITCH = (276, 114)
+    # 头部区域（logo、玩家名称与Rating）的下边界
+    HEADER_HEIGHT = 235
+
+    # 徽章图片（文件名前缀、名称列表、绘制尺寸）
+    BADGE_GROUPS = [
+        (
+            "UI_TTR_Rank_",
+            [
+                "SSSp",
+                "SSS",
+                "SSp",
+                "SS",
+                "Sp",
+                "S",
+                "AAA",
+                "AA",
+                "A",
+                "BBB",
+                "BB",
+                "B",
+                "C",
+                "D",
+            ],
+            (63, 28),
+        ),
+        (
+            "UI_CHR_PlayBonus_",
+            ["FC", "FCp", "AP", "APp", "Sync", "FS", "FSp", "FSD", "FSDp"],
+            (34, 34),
+        ),
+        ("", ["SD", "DX", "UTAGE"], (37, 14)),
+    ]
 
-    def __init__(self):
+    def __init__(
+        self,
+        cover_cache_size: int = 512,
+        card_cache_size: int = 256,
+        encode_options: EncodeOptions | None = None,
+        canvas_store_size: int = 0,
+        manifest: AssetManifest | None = None,
+        scale: float = 1.0,
+    ):
+        self.encode_options = encode_options or EncodeOptions()
+        # 布局缩放比例，所有坐标、尺寸与字号都按1倍布局换算
+        self.scale = scale
+        # 可用资源文件清单，判断文件是否存在时不访问文件系统
+        self.manifest = manifest or asset_manifest
+        # 最近一次渲染的画布，用于生成编码对比报告
+        self._last_canvas: Image.Image | None = None
         self.background_image: Image.Image | None = None
+        self.logo_image: Image.Image | None = None
         self.fonts = {}
         self.difficulty_backgrounds = []
+        # 已缩放到绘制尺寸的徽章图片，键为不含扩展名的文件名
+        self.badges: dict[str, Image.Image] = {}
+        self.cover_archive: CoverArchive | None = None
+        # 已缩放好的封面，键为标准化后的歌曲ID，值为None表示封面不存在
+        self._cover_cache: LRUCache[int, Image.Image | None] = LRUCache(
+            cover_cache_size
+        )
+        # 卡片静态层，键为(歌曲ID, 难度, 谱面类型)
+        self._card_cache: LRUCache[tuple, Image.Image] = LRUCache(card_cache_size)
+        # 各玩家最近一次渲染的画布与卡片列表，用于增量重绘，为0时关闭
+        self._canvas_store: LRUCache[str, RenderedCanvas] | None = (
+            LRUCache(canvas_store_size) if canvas_store_size > 0 else None
+        )
         self._initialize_resources()
+        self._slot_size = self._compute_slot_size()
+
+    def _px(self, value: int) -> int:
+        """将1倍布局下的像素值换算到当前缩放比例"""
+        return round(value * self.scale)
+
+    def _scaled(self, size: tuple[int, int]) -> tuple[int, int]:
+        return (self._px(size[0]), self._px(size[1]))
+
+    def _fit_scale(self, img: Image.Image) -> Image.Image:
+        """将按1倍布局制作的图片缩放到当前比例"""
+        if self.scale == 1:
+            return img
+        return img.resize(self._scaled(img.size), Image.Resampling.LANCZOS)
 
     def _initialize_resources(self):
         """初始化所有静态资源"""
         try:
             self._load_background_image()
+            self._load_logo_image()
             self._load_fonts()
             self._load_difficulty_backgrounds()
+            self._load_badges()
+            self._load_cover_archive()
         except Exception as e:
             logger.error(f"初始化资源失败: {e}")
             self._create_fallback_resources()
@@ -50,52 +251,81 @@ class B50ImageGenerator:
     def _load_background_image(self):
         """加载背景图片"""
         bg_path = self.MAI_PIC_PATH / "b50_bg.png"
-        if bg_path.exists():
-            self.background_image = Image.open(bg_path).convert("RGBA")
+        if self.manifest.exists(bg_path):
+            self.background_image = self._fit_scale(Image.open(bg_path).convert("RGBA"))
         else:
             self.background_image = Image.new(
-                "RGBA", self.CANVAS_SIZE, (255, 255, 255, 255)
+                "RGBA", self._scaled(self.CANVAS_SIZE), (255, 255, 255, 255)
             )
 
+    def _load_logo_image(self):
+        """加载并缩放logo图片"""
+        logo_path = self.MAI_PIC_PATH / "logo.png"
+        if self.manifest.exists(logo_path):
+            self.logo_image = (
+                Image.open(logo_path)
+                .convert("RGBA")
+                .resize(self._scaled(self.LOGO_SIZE))
+            )
+        else:
+            self.logo_image = None
+
     def _load_fonts(self):
         """加载字体文件"""
         # 加载基础字体文件
         self.font_files = {}
 
-        if self.FONT_HR_PATH.exists():
+        if self.manifest.exists(self.FONT_HR_PATH):
             self.font_files["hr"] = str(self.FONT_HR_PATH)
         else:
             self.font_files["hr"] = None
 
-        if self.FONT_TORUS_PATH.exists():
+        if self.manifest.exists(self.FONT_TORUS_PATH):
             self.font_files["torus"] = str(self.FONT_TORUS_PATH)
         else:
             self.font_files["torus"] = None
 
         # 创建常用字体实例
         self.fonts = {
-            "hr_large": self._create_font("hr", 28),
-            "hr_medium": self._create_font("hr", 14),
-            "hr_small": self._create_font("hr", 13),
-            "torus_large": self._create_font("torus", 30),
-            "torus_medium": self._create_font("torus", 14),
-            "torus_small": self._create_font("torus", 13),
+            "hr_large": self._create_font("hr", self._px(28)),
+            "hr_medium": self._create_font("hr", self._px(14)),
+            "hr_small": self._create_font("hr", self._px(13)),
+            "torus_large": self._create_font("torus", self._px(30)),
+            "torus_medium": self._create_font("torus", self._px(14)),
+            "torus_small": self._create_font("torus", self._px(13)),
         }
 
     def _create_font(self, font_type: str, size: int) -> ImageFont.ImageFont:
-        """创建指定类型和大小的字体"""
+        """获取指定类型和大小的字体，同一字体只解析一次"""
+        font = _font_cache.get((font_type, size))
+        if font is not None:
+            return font
+
         font_path = self.font_files.get(font_type)
         if font_path:
             try:
-                return ImageFont.truetype(font_path, size)
+                font = ImageFont.truetype(font_path, size)
             except Exception as e:
                 logger.warning(f"加载字体失败 {font_path}: {e}")
+            else:
+                _font_cache.put((font_type, size), font)
+                return font
         return ImageFont.load_default()
 
     def get_font(self, font_type: str, size: int) -> ImageFont.ImageFont:
-        """获取指定类型和大小的字体（动态创建）"""
+        """获取指定类型和大小的字体"""
         return self._create_font(font_type, size)
 
+    def prewarm_fonts(self, sizes: dict[str, list[int]]) -> None:
+        """预先加载指定的字体字号
+
+        Args:
+            sizes: 字体类型到字号列表的映射，如 {"hr": [28, 14]}
+        """
+        for font_type, font_sizes in sizes.items():
+            for size in font_sizes:
+                self._create_font(font_type, size)
+
     def _load_difficulty_backgrounds(self):
         """加载难度背景图片"""
         difficulty_files = [
@@ -108,8 +338,10 @@ class B50ImageGenerator:
 
         for i, filename in enumerate(difficulty_files):
             bg_path = self.MAI_PIC_PATH / filename
-            if bg_path.exists():
-                self.difficulty_backgrounds.append(Image.open(bg_path).convert("RGBA"))
+            if self.manifest.exists(bg_path):
+                self.difficulty_backgrounds.append(
+                    self._fit_scale(Image.open(bg_path).convert("RGBA"))
+                )
             else:
                 # 创建默认背景
                 color = (
@@ -117,14 +349,50 @@ class B50ImageGenerator:
                     if i < len(self.DIFFICULTY_COLORS)
                     else self.DIFFICULTY_COLORS[3]
                 )
-                default_bg = Image.new("RGBA", self.CARD_SIZE, color)
+                default_bg = Image.new("RGBA", self._scaled(self.CARD_SIZE), color)
                 self.difficulty_backgrounds.append(default_bg)
 
+    def _load_badges(self):
+        """加载评级、单人/多人评价及谱面类型图标，并缩放到绘制尺寸"""
+        self.badges = {}
+        for prefix, names, size in self.BADGE_GROUPS:
+            for name in names:
+                badge_name = f"{prefix}{name}"
+                badge_path = self.MAI_PIC_PATH / f"{badge_name}.png"
+                if not self.manifest.exists(badge_path):
+                    continue
+                try:
+                    badge = Image.open(badge_path).convert("RGBA")
+                    self.badges[badge_name] = badge.resize(
+                        self._scaled(size), Image.Resampling.LANCZOS
+                    )
+                except Exception as e:
+                    logger.warning(f"加载徽章图片失败 {badge_path}: {e}")
+
+    def _load_cover_archive(self):
+        """映射封面打包文件，文件不存在或尺寸不符时不使用"""
+        self.cover_archive = None
+        if not self.manifest.exists(self.MAI_COVER_ARCHIVE_PATH):
+            return
+        try:
+            archive = CoverArchive(self.MAI_COVER_ARCHIVE_PATH)
+        except Exception as e:
+            logger.warning(f"加载封面打包文件失败: {e}")
+            return
+        if archive.size != self.COVER_SIZE:
+            logger.warning(
+                f"封面打包文件尺寸 {archive.size} 与封面尺寸 {self.COVER_SIZE} 不符，已忽略"
+            )
+            return
+        self.cover_archive = archive
+        logger.info(f"已映射封面打包文件，共 {len(archive)} 张封面")
+
     def _create_fallback_resources(self):
         """创建备用资源"""
         self.background_image = Image.new(
-            "RGBA", self.CANVAS_SIZE, (255, 255, 255, 255)
+            "RGBA", self._scaled(self.CANVAS_SIZE), (255, 255, 255, 255)
         )
+        self.logo_image = None
 
         # 创建默认字体文件映射
         self.font_files = {"hr": None, "torus": None}
@@ -143,9 +411,28 @@ class B50ImageGenerator:
         # 创建默认难度背景
         self.difficulty_backgrounds = []
         for color in self.DIFFICULTY_COLORS:
-            default_bg = Image.new("RGBA", self.CARD_SIZE, color)
+            default_bg = Image.new("RGBA", self._scaled(self.CARD_SIZE), color)
             self.difficulty_backgrounds.append(default_bg)
 
+        self.badges = {}
+
+    def _compute_slot_size(self) -> tuple[int, int]:
+        """单个卡位可能被绘制的区域大小"""
+        card_width, card_height = self._scaled(self.CARD_SIZE)
+        return (
+            max([card_width, *(bg.width for bg in self.difficulty_backgrounds)]),
+            max([card_height, *(bg.height for bg in self.difficulty_backgrounds)]),
+        )
+
+    @property
+    def supports_incremental(self) -> bool:
+        """卡片不超出网格间距时，各卡位互不重叠，可以单独重绘"""
+        return (
+            self._canvas_store is not None
+            and self._slot_size[0] <= self._px(self.CARD_PITCH[0])
+            and self._slot_size[1] <= self._px(self.CARD_PITCH[1])
+        )
+
     def _get_difficulty_background(self, level_index: int) -> Image.Image:
         """获取难度背景图片"""
         if 0 <= level_index < len(self.difficulty_backgrounds):
@@ -154,63 +441,74 @@ class B50ImageGenerator:
         return (
             self.difficulty_backgrounds[3]
             if len(self.difficulty_backgrounds) > 3
-            else Image.new("RGBA", self.CARD_SIZE, self.DIFFICULTY_COLORS[3])
+            else Image.new(
+                "RGBA", self._scaled(self.CARD_SIZE), self.DIFFICULTY_COLORS[3]
+            )
         )
 
     def _truncate_text(
         self, text: str, max_width: int, font: ImageFont.ImageFont = None
     ) -> str:
-        """按像素宽度截断文本"""
+        """按像素宽度截断文本，结果在进程内共享缓存"""
         if not font:
             font = self.fonts.get("hr_medium", ImageFont.load_default())
 
-        # 创建临时图像用于测量文本宽度
-        temp_img = Image.new("RGB", (1, 1))
-        temp_draw = ImageDraw.Draw(temp_img)
-
-        # 如果文本宽度小于等于最大宽度，直接返回
-        bbox = temp_draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-
-        if text_width <= max_width:
-            return text
-
-        # 计算省略号的宽度
-        ellipsis_bbox = temp_draw.textbbox((0, 0), "...", font=font)
-        ellipsis_width = ellipsis_bbox[2] - ellipsis_bbox[0]
-
-        # 可用于文本的宽度
-        available_width = max_width - ellipsis_width
+        cache_key = (text, _font_identity(font), max_width)
+        truncated = _truncate_cache.get(cache_key)
+        if truncated is None:
+            truncated = _measure_truncated_text(text, max_width, font)
+            _truncate_cache.put(cache_key, truncated)
+        return truncated
 
-        # 二分查找最佳截断位置
-        left, right = 0, len(text)
-        best_length = 0
-
-        while left <= right:
-            mid = (left + right) // 2
-            test_text = text[:mid]
-
-            test_bbox = temp_draw.textbbox((0, 0), test_text, font=font)
-            test_width = test_bbox[2] - test_bbox[0]
-
-            if test_width <= available_width:
-                best_length = mid
-                left = mid + 1
-            else:
-                right = mid - 1
+    def _get_song_cover(self, song_id: int) -> Image.Image | None:
+        """获取歌曲封面图片（已缩放到封面尺寸）"""
+        # 处理ID：对10000取余，确保与maimai.py的ID一致
+        normalized_id = song_id % 10000 if song_id >= 10000 else song_id
+
+        cover = self._cover_cache.get(normalized_id, _MISSING)
+        if cover is _MISSING:
+            cover = self._load_song_cover(song_id, normalized_id)
+            if cover is not None and self.scale != 1:
+                cover = cover.resize(
+                    self._scaled(self.COVER_SIZE), Image.Resampling.LANCZOS
+                )
+            self._cover_cache.put(normalized_id, cover)
+        return cover
 
-        return f"{text[:best_length]}..." if best_length > 0 else "..."
+    def _load_song_cover(self, song_id: int, normalized_id: int) -> Image.Image | None:
+        """加载歌曲封面，依次查找打包文件、预缩放目录与原始封面目录
 
-    def _get_song_cover(self, song_id: int) -> Image.Image | None:
-        """获取歌曲封面图片"""
+        原始封面比打包文件或预缩放文件新时（封面被替换后尚未重新打包或预缩放）使用原始封面。
+        """
         try:
-            # 处理ID：对10000取余，确保与maimai.py的ID一致
-            normalized_id = song_id % 10000 if song_id >= 10000 else song_id
+            if self.cover_archive is not None:
+                archive_mtime = self.manifest.mtime(self.MAI_COVER_ARCHIVE_PATH)
+                for cover_id in [song_id, normalized_id]:
+                    cover = self.cover_archive.get(cover_id)
+                    if cover is None:
+                        continue
+                    cover_mtime = self.manifest.mtime(
+                        self.MAI_COVER_PATH / f"{cover_id}.png"
+                    )
+                    if (
+                        cover_mtime is None
+                        or archive_mtime is None
+                        or archive_mtime >= cover_mtime
+                    ):
+                        return cover
+                    break
 
-            # 尝试加载封面图片
             for cover_id in [song_id, normalized_id]:
+                resized_path = self.MAI_COVER_RESIZED_PATH / f"{cover_id}.png"
                 cover_path = self.MAI_COVER_PATH / f"{cover_id}.png"
-                if cover_path.exists():
+                resized_mtime = self.manifest.mtime(resized_path)
+                cover_mtime = self.manifest.mtime(cover_path)
+                if resized_mtime is not None and (
+                    cover_mtime is None or resized_mtime >= cover_mtime
+                ):
+                    return Image.open(resized_path).convert("RGBA")
+
+                if cover_mtime is not None:
                     cover = Image.open(cover_path).convert("RGBA")
                     return cover.resize(self.COVER_SIZE, Image.Resampling.LANCZOS)
 
@@ -221,6 +519,53 @@ class B50ImageGenerator:
             logger.error(f"加载歌曲封面失败 (ID: {song_id}): {e}")
             return None
 
+    def build_resized_covers(self) -> int:
+        """将原始封面预缩放到封面尺寸并写入预缩放目录
+
+        已存在且不旧于原图的文件会被跳过。
+
+        Returns:
+            本次新生成的封面数量
+        """
+        if not self.MAI_COVER_PATH.exists():
+            return 0
+
+        self.MAI_COVER_RESIZED_PATH.mkdir(parents=True, exist_ok=True)
+        built: list[Path] = []
+        try:
+            for cover_path in self.MAI_COVER_PATH.glob("*.png"):
+                target_path = self.MAI_COVER_RESIZED_PATH / cover_path.name
+                try:
+                    if (
+                        target_path.exists()
+                        and target_path.stat().st_mtime >= cover_path.stat().st_mtime
+                    ):
+                        continue
+                    cover = Image.open(cover_path).convert("RGBA")
+                    cover = cover.resize(self.COVER_SIZE, Image.Resampling.LANCZOS)
+                    cover.save(target_path, format="PNG", compress_level=1)
+                    built.append(target_path)
+                except Exception as e:
+                    logger.warning(f"预缩放封面失败 {cover_path}: {e}")
+        finally:
+            # 生成完成后一次性登记到资源清单，中途出错时也登记已生成的文件
+            self.manifest.add_many(built)
+        return len(built)
+
+    def cache_stats(self) -> dict[str, dict[str, int]]:
+        """返回各渲染缓存的统计信息"""
+        return {
+            "cover": self._cover_cache.stats(),
+            "title": _truncate_cache.stats(),
+            "font": _font_cache.stats(),
+            "card": self._card_cache.stats(),
+            **(
+                {"canvas": self._canvas_store.stats()}
+                if self._canvas_store is not None
+                else {}
+            ),
+        }
+
     def _convert_score_to_dict(self, score) -> dict[str, Any]:
         """将maimai_py的Score对象转换为字典格式"""
         # 将 LevelIndex 枚举转换为整数
@@ -287,7 +632,7 @@ class B50ImageGenerator:
             song_id_int = int(song_id)
             cover = self._get_song_cover(song_id_int)
 
-            cover_x, cover_y = x + 12, y + 12
+            cover_x, cover_y = x + self._px(12), y + self._px(12)
 
             if cover:
                 img.alpha_composite(cover, (cover_x, cover_y))
@@ -298,19 +643,19 @@ class B50ImageGenerator:
                     [
                         (cover_x, cover_y),
                         (
-                            cover_x + self.COVER_SIZE[0] - 12,
-                            cover_y + self.COVER_SIZE[1] - 12,
+                            cover_x + self._px(self.COVER_SIZE[0] - 12),
+                            cover_y + self._px(self.COVER_SIZE[1] - 12),
                         ),
                     ],
                     fill=placeholder_color,
                     outline=id_color,
-                    width=2,
+                    width=max(1, self._px(2)),
                 )
         except (ValueError, TypeError):
             logger.warning(f"无效的歌曲ID: {song_id}")
 
-    def _get_rank_image_path(self, achievement: float) -> Path | None:
-        """根据达成率获取评级图片路径"""
+    def _get_rank_image(self, achievement: float) -> Image.Image | None:
+        """根据达成率获取评级图片"""
         try:
             if achievement >= 100.5:
                 rank_name = "SSSp"
@@ -341,14 +686,13 @@ class B50ImageGenerator:
             else:
                 rank_name = "D"
 
-            rank_path = self.MAI_PIC_PATH / f"UI_TTR_Rank_{rank_name}.png"
-            return rank_path if rank_path.exists() else None
+            return self.badges.get(f"UI_TTR_Rank_{rank_name}")
         except Exception as e:
-            logger.error(f"获取评级图片路径失败: {e}")
+            logger.error(f"获取评级图片失败: {e}")
             return None
 
-    def _get_combo_status_image_path(self, combo_status: str | None) -> Path | None:
-        """根据单人评价状态获取图片路径"""
+    def _get_combo_status_image(self, combo_status: str | None) -> Image.Image | None:
+        """根据单人评价状态获取图片"""
         if not combo_status:
             return None
 
@@ -364,15 +708,14 @@ class B50ImageGenerator:
 
             bonus_name = combo_mapping.get(status_str)
             if bonus_name:
-                bonus_path = self.MAI_PIC_PATH / f"UI_CHR_PlayBonus_{bonus_name}.png"
-                return bonus_path if bonus_path.exists() else None
+                return self.badges.get(f"UI_CHR_PlayBonus_{bonus_name}")
             return None
         except Exception as e:
-            logger.error(f"获取单人评价图片路径失败: {e}")
+            logger.error(f"获取单人评价图片失败: {e}")
             return None
 
-    def _get_sync_status_image_path(self, sync_status: str | None) -> Path | None:
-        """根据多人评价状态获取图片路径"""
+    def _get_sync_status_image(self, sync_status: str | None) -> Image.Image | None:
+        """根据多人评价状态获取图片"""
         if not sync_status:
             return None
 
@@ -394,53 +737,126 @@ class B50ImageGenerator:
 
             bonus_name = sync_mapping.get(status_str)
             if bonus_name:
-                bonus_path = self.MAI_PIC_PATH / f"UI_CHR_PlayBonus_{bonus_name}.png"
-                return bonus_path if bonus_path.exists() else None
+                return self.badges.get(f"UI_CHR_PlayBonus_{bonus_name}")
             return None
         except Exception as e:
-            logger.error(f"获取多人评价图片路径失败: {e}")
+            logger.error(f"获取多人评价图片失败: {e}")
             return None
 
+    def _get_song_type_image(self, song_type) -> Image.Image | None:
+        """根据谱面类型获取SD/DX图标"""
+        if not song_type:
+            return None
+
+        # 根据歌曲类型选择对应的图片
+        if hasattr(song_type, "name"):
+            type_name = song_type.name  # 如果是枚举类型
+        else:
+            type_name = str(song_type)  # 如果是字符串类型
+
+        # 映射枚举名称到图片文件名
+        type_mapping = {
+            "STANDARD": "SD",
+            "DX": "DX",
+            "UTAGE": "UTAGE",  # 如果有宴会场模式的图片
+        }
+
+        image_name = type_mapping.get(type_name)
+        return self.badges.get(image_name) if image_name else None
+
+    def _get_card_base(self, score_data: dict[str, Any]) -> Image.Image:
+        """获取成绩卡片中与玩家无关的静态部分"""
+        cache_key = (
+            score_data.get("song_id"),
+            score_data.get("level_index", 3),
+            score_data.get("song_type"),
+        )
+        card_base = self._card_cache.get(cache_key)
+        if card_base is None:
+            card_base = self._build_card_base(score_data)
+            self._card_cache.put(cache_key, card_base)
+        return card_base
+
+    def _build_card_base(self, score_data: dict[str, Any]) -> Image.Image:
+        """绘制卡片静态层：难度背景、封面、标题、谱面类型与歌曲ID"""
+        level_index = score_data.get("level_index", 3)
+        song_id = score_data.get("song_id")
+
+        card_background = self._get_difficulty_background(level_index)
+        card_base = Image.new(
+            "RGBA",
+            (
+                max(card_background.width, self._px(self.CARD_SIZE[0])),
+                max(card_background.height, self._px(self.CARD_SIZE[1])),
+            ),
+            (0, 0, 0, 0),
+        )
+        card_base.alpha_composite(card_background)
+
+        draw = ImageDraw.Draw(card_base)
+        text_color, id_color = self._get_text_colors(level_index)
+
+        # 绘制歌曲封面或占位符
+        self._draw_song_cover_or_placeholder(
+            card_base, draw, song_id, 0, 0, text_color, id_color
+        )
+
+        # 绘制歌曲标题
+        title = self._truncate_text(
+            score_data.get("title", "Unknown"), self._px(150), self.fonts["hr_medium"]
+        )
+        draw.text(
+            self._scaled((96, 14)),
+            title,
+            fill=text_color,
+            font=self.fonts["hr_medium"],
+            anchor="lm",
+        )
+
+        # 绘制歌曲类型图标（SD/DX）
+        type_img = self._get_song_type_image(score_data.get("song_type"))
+        if type_img:
+            card_base.alpha_composite(type_img, self._scaled((50, 90)))
+
+        # 绘制歌曲ID
+        if song_id:
+            # 判断是否为DX铺面，如果是则ID+10000
+            display_id = song_id
+            song_type = score_data.get("song_type")
+            if song_type == SongType.DX:
+                display_id = song_id + 10000
+
+            draw.text(
+                self._scaled((10, 96)),
+                str(display_id),
+                fill=id_color,
+                font=self.fonts["torus_small"],
+                anchor="lm",
+            )
+
+        return card_base
+
     def _draw_score_card(
         self, img: Image.Image, score_data: dict[str, Any], x: int, y: int
     ):
         """绘制单个成绩卡片"""
         try:
             level_index = score_data.get("level_index", 3)
-            song_id = score_data.get("song_id")
 
-            # 获取难度背景并粘贴
-            card_background = self._get_difficulty_background(level_index)
-            img.alpha_composite(card_background, (x, y))
+            # 粘贴缓存的静态层，之后只绘制与成绩相关的部分
+            img.alpha_composite(self._get_card_base(score_data), (x, y))
 
             draw = ImageDraw.Draw(img)
-            text_color, id_color = self._get_text_colors(level_index)
-
-            # 绘制歌曲封面或占位符
-            self._draw_song_cover_or_placeholder(
-                img, draw, song_id, x, y, text_color, id_color
-            )
+            text_color, _ = self._get_text_colors(level_index)
 
             # 文本绘制起始位置
-            text_x = x + 96  # 封面右侧
-
-            # 绘制歌曲标题
-            title = self._truncate_text(
-                score_data.get("title", "Unknown"), 150, self.fonts["hr_medium"]
-            )
-            draw.text(
-                (text_x, y + 14),
-                title,
-                fill=text_color,
-                font=self.fonts["hr_medium"],
-                anchor="lm",
-            )
+            text_x = x + self._px(96)  # 封面右侧
 
             # 绘制成绩
             achievement = score_data.get("achievement", 0)
             achievement_text = f"{achievement:.4f}%"
             draw.text(
-                (text_x, y + 38),
+                (text_x, y + self._px(38)),
                 achievement_text,
                 fill=text_color,
                 font=self.fonts["torus_large"],
@@ -452,7 +868,7 @@ class B50ImageGenerator:
             rating = score_data.get("rating", 0)
             ds_ra_text = f"{level_value} -> {rating}"
             draw.text(
-                (text_x, y + 66),
+                (text_x, y + self._px(66)),
                 ds_ra_text,
                 fill=text_color,
                 font=self.fonts["torus_medium"],
@@ -460,85 +876,19 @@ class B50ImageGenerator:
             )
 
             # 绘制评级图片
-            rank_path = self._get_rank_image_path(achievement)
-            if rank_path and rank_path.exists():
-                try:
-                    rank_img = Image.open(rank_path)
-                    # 调整评级图片大小（可根据需要调整）
-                    rank_img = rank_img.resize((63, 28), Image.Resampling.LANCZOS)
-                    img.alpha_composite(rank_img, (x + 90, y + 80))
-                except Exception as e:
-                    logger.warning(f"绘制评级图片失败: {e}")
+            rank_img = self._get_rank_image(achievement)
+            if rank_img:
+                img.alpha_composite(rank_img, (x + self._px(90), y + self._px(80)))
 
             # 绘制单人评价图标
-            combo_status = score_data.get("combo_status")
-            combo_path = self._get_combo_status_image_path(combo_status)
-            if combo_path and combo_path.exists():
-                try:
-                    combo_img = Image.open(combo_path)
-                    # 调整单人评价图片大小
-                    combo_img = combo_img.resize((34, 34), Image.Resampling.LANCZOS)
-                    img.alpha_composite(combo_img, (x + 152, y + 76))
-                except Exception as e:
-                    logger.warning(f"绘制单人评价图片失败: {e}")
+            combo_img = self._get_combo_status_image(score_data.get("combo_status"))
+            if combo_img:
+                img.alpha_composite(combo_img, (x + self._px(152), y + self._px(76)))
 
             # 绘制多人评价图标
-            sync_status = score_data.get("sync_status")
-            sync_path = self._get_sync_status_image_path(sync_status)
-            if sync_path and sync_path.exists():
-                try:
-                    sync_img = Image.open(sync_path)
-                    # 调整多人评价图片大小
-                    sync_img = sync_img.resize((34, 34), Image.Resampling.LANCZOS)
-                    img.alpha_composite(sync_img, (x + 184, y + 76))
-                except Exception as e:
-                    logger.warning(f"绘制多人评价图片失败: {e}")
-
-            # 绘制歌曲类型图标（SD/DX）
-            song_type = score_data.get("song_type")
-            if song_type:
-                try:
-                    # 根据歌曲类型选择对应的图片
-                    if hasattr(song_type, "name"):
-                        type_name = song_type.name  # 如果是枚举类型
-                    else:
-                        type_name = str(song_type)  # 如果是字符串类型
-
-                    # 映射枚举名称到图片文件名
-                    type_mapping = {
-                        "STANDARD": "SD",
-                        "DX": "DX",
-                        "UTAGE": "UTAGE",  # 如果有宴会场模式的图片
-                    }
-
-                    image_name = type_mapping.get(type_name)
-                    if image_name:
-                        type_path = self.MAI_PIC_PATH / f"{image_name}.png"
-                        if type_path.exists():
-                            type_img = Image.open(type_path)
-                            # 调整歌曲类型图片大小为 37x14
-                            type_img = type_img.resize(
-                                (37, 14), Image.Resampling.LANCZOS
-                            )
-                            img.alpha_composite(type_img, (x + 50, y + 90))
-                except Exception as e:
-                    logger.warning(f"绘制歌曲类型图片失败: {e}")
-
-            # 绘制歌曲ID
-            if song_id:
-                # 判断是否为DX铺面，如果是则ID+10000
-                display_id = song_id
-                song_type = score_data.get("song_type")
-                if song_type == SongType.DX:
-                    display_id = song_id + 10000
-
-                draw.text(
-                    (x + 10, y + 96),
-                    str(display_id),
-                    fill=id_color,
-                    font=self.fonts["torus_small"],
-                    anchor="lm",
-                )
+            sync_img = self._get_sync_status_image(score_data.get("sync_status"))
+            if sync_img:
+                img.alpha_composite(sync_img, (x + self._px(184), y + self._px(76)))
 
         except Exception as e:
             logger.error(f"绘制成绩卡片失败: {e}")
@@ -554,15 +904,13 @@ class B50ImageGenerator:
         draw = ImageDraw.Draw(img)
 
         # 绘制logo
-        logo_path = self.MAI_PIC_PATH / "logo.png"
-        if logo_path.exists():
-            logo = Image.open(logo_path).resize((249, 120))
-            img.alpha_composite(logo, (14, 60))
+        if self.logo_image:
+            img.alpha_composite(self.logo_image, self._scaled((14, 60)))
 
         # 绘制玩家名称
         player_name = player_data.get("name", "Unknown Player")
         draw.text(
-            (445, 135),
+            self._scaled((445, 135)),
             player_name,
             fill=(0, 0, 0, 255),
             font=self.fonts["hr_large"],
@@ -575,7 +923,7 @@ class B50ImageGenerator:
         player_rating = player_data.get("rating", 0)
         rating_text = f"B35: {b35_rating} + B15: {b15_rating} = {player_rating}"
         draw.text(
-            (570, 172),
+            self._scaled((570, 172)),
             rating_text,
             fill=(0, 0, 0, 255),
             font=self.fonts["hr_medium"],
@@ -587,33 +935,180 @@ class B50ImageGenerator:
         draw = ImageDraw.Draw(img)
         footer_text = "Designed by Yuri-YuzuChaN & BlueDeer233. Generated by RemiBot"
         draw.text(
-            (700, 1570),
+            self._scaled((700, 1570)),
             footer_text,
             fill=(124, 129, 255, 255),
             font=self.fonts["hr_small"],
             anchor="mm",
         )
 
-    def generate_b50_image(
+    # 卡片中参与指纹计算的字段
+    FINGERPRINT_FIELDS = (
+        "song_id",
+        "level_index",
+        "achievement",
+        "combo_status",
+        "sync_status",
+        "song_type",
+        "level",
+        "rating",
+        "title",
+    )
+
+    def fingerprint(
         self,
         player_data: dict[str, Any],
         b35_scores: list[dict[str, Any]],
         b15_scores: list[dict[str, Any]],
+    ) -> str:
+        """计算渲染输入的摘要，相同摘要的输出图片完全一致"""
+
+        def card_tuples(scores):
+            return [list(self._card_key(score)) for score in scores]
+
+        payload = json.dumps(
+            [
+                player_data.get("name"),
+                player_data.get("rating"),
+                card_tuples(b35_scores),
+                card_tuples(b15_scores),
+                asdict(self.encode_options),
+                self.scale,
+            ],
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _card_key(self, score_data: dict[str, Any]) -> tuple:
+        """卡片的内容标识，相同标识的卡片绘制结果一致"""
+        return tuple(
+            _normalize_value(score_data.get(field)) for field in self.FINGERPRINT_FIELDS
+        )
+
+    def _header_key(
+        self,
+        player_data: dict[str, Any],
+        b35_scores: list[dict[str, Any]],
+        b15_scores: list[dict[str, Any]],
+    ) -> tuple:
+        """头部的内容标识"""
+        return (
+            player_data.get("name"),
+            player_data.get("rating"),
+            sum(score.get("rating", 0) for score in b35_scores),
+            sum(score.get("rating", 0) for score in b15_scores),
+        )
+
+    def _restore_background(self, img: Image.Image, box: tuple[int, int, int, int]):
+        """将画布的指定区域恢复为背景图"""
+        img.paste(self.background_image.crop(box), box[:2])
+
+    def _redraw_changed_cards(
+        self,
+        img: Image.Image,
+        scores: list[dict[str, Any]],
+        keys: list[tuple],
+        previous_keys: list[tuple],
+        is_b35: bool,
+    ) -> int:
+        """只重绘内容变化的卡位，返回重绘的卡位数"""
+        redrawn = 0
+        for index in range(max(len(keys), len(previous_keys))):
+            key = keys[index] if index < len(keys) else None
+            if index < len(previous_keys) and previous_keys[index] == key:
+                continue
+
+            x, y = self._card_position(index, is_b35)
+            self._restore_background(
+                img, (x, y, x + self._slot_size[0], y + self._slot_size[1])
+            )
+            if key is not None:
+                self._draw_score_card(img, scores[index], x, y)
+            redrawn += 1
+        return redrawn
+
+    def render_b50_image(
+        self,
+        player_data: dict[str, Any],
+        b35_scores: list[dict[str, Any]],
+        b15_scores: list[dict[str, Any]],
+        timings: dict[str, float] | None = None,
+        player_key: str | None = None,
     ) -> bytes:
-        """生成B50图片"""
-        try:
+        """生成B50图片，失败时抛出异常
+
+        Args:
+            timings: 传入字典时写入各阶段耗时（秒），用于性能测试
+            player_key: 玩家标识，提供时复用该玩家上一次的画布，只重绘变化的卡位和头部
+        """
+        stage_start = time.perf_counter()
+
+        def mark(stage: str):
+            nonlocal stage_start
+            now = time.perf_counter()
+            if timings is not None:
+                timings[stage] = now - stage_start
+            stage_start = now
+
+        use_store = player_key is not None and self.supports_incremental
+        header_key = self._header_key(player_data, b35_scores, b15_scores)
+        b35_keys = [self._card_key(score) for score in b35_scores]
+        b15_keys = [self._card_key(score) for score in b15_scores]
+
+        previous = None
+        if use_store:
+            # 取出后再修改画布，绘制中途失败时下次会完整重绘
+            previous = self._canvas_store.get(player_key)
+            self._canvas_store.pop(player_key)
+
+        if previous is None:
             img = self.background_image.copy()
 
             # 绘制各个部分
             self._draw_header(img, player_data, b35_scores, b15_scores)
+            mark("header")
             self._draw_scores(img, b35_scores, is_b35=True)
             self._draw_scores(img, b15_scores, is_b35=False)
+            mark("cards")
             self._draw_footer(img)
+            mark("footer")
+        else:
+            img = previous.canvas
+
+            if previous.header_key != header_key:
+                self._restore_background(
+                    img, (0, 0, img.width, self._px(self.HEADER_HEIGHT))
+                )
+                self._draw_header(img, player_data, b35_scores, b15_scores)
+            mark("header")
+            self._redraw_changed_cards(
+                img, b35_scores, b35_keys, previous.b35_keys, is_b35=True
+            )
+            self._redraw_changed_cards(
+                img, b15_scores, b15_keys, previous.b15_keys, is_b35=False
+            )
+            mark("cards")
+
+        self._last_canvas = img
+        if use_store:
+            self._canvas_store.put(
+                player_key, RenderedCanvas(img, header_key, b35_keys, b15_keys)
+            )
+
+        image_bytes = self.encode_image(img)
+        mark("encode")
+        return image_bytes
 
-            # 转换为字节
-            img_byte_arr = BytesIO()
-            img.save(img_byte_arr, format="PNG")
-            return img_byte_arr.getvalue()
+    def generate_b50_image(
+        self,
+        player_data: dict[str, Any],
+        b35_scores: list[dict[str, Any]],
+        b15_scores: list[dict[str, Any]],
+    ) -> bytes:
+        """生成B50图片，失败时返回错误提示图片"""
+        try:
+            return self.render_b50_image(player_data, b35_scores, b15_scores)
 
         except Exception as e:
             logger.error(f"生成B50图片失败: {e}")
@@ -630,22 +1125,144 @@ class B50ImageGenerator:
             font=self.fonts["hr_medium"],
         )
 
+        return self.encode_image(error_img)
+
+    def encode_image(
+        self, img: Image.Image, options: EncodeOptions | None = None
+    ) -> bytes:
+        """按输出配置将图片编码为字节"""
+        options = options or self.encode_options
+
+        # JPEG不支持透明通道，必须先去除
+        if img.mode == "RGBA" and (options.flatten_alpha or options.format == "jpeg"):
+            flattened = Image.new("RGB", img.size, (255, 255, 255))
+            flattened.paste(img, mask=img.getchannel("A"))
+            img = flattened
+
         img_byte_arr = BytesIO()
-        error_img.save(img_byte_arr, format="PNG")
+        if options.format == "jpeg":
+            img.save(img_byte_arr, format="JPEG", quality=options.quality)
+        elif options.format == "webp":
+            img.save(img_byte_arr, format="WEBP", quality=options.quality)
+        else:
+            img.save(
+                img_byte_arr,
+                format="PNG",
+                compress_level=options.png_compress_level,
+            )
         return img_byte_arr.getvalue()
 
+    def encoder_report(
+        self, candidates: list[EncodeOptions] | None = None
+    ) -> list[dict[str, Any]]:
+        """对最近一次渲染的画布（没有时使用背景图）测试各编码参数的体积与耗时"""
+        img = self._last_canvas or self.background_image
+        report = []
+        for options in candidates or ENCODER_REPORT_CANDIDATES:
+            start = time.perf_counter()
+            size = len(self.encode_image(img, options))
+            report.append(
+                {
+                    "options": options,
+                    "size": size,
+                    "elapsed_ms": (time.perf_counter() - start) * 1000,
+                    "current": options == self.encode_options,
+                }
+            )
+        return report
+
     def _draw_scores(
         self, img: Image.Image, scores: list[dict[str, Any]], is_b35: bool
     ):
         """绘制成绩列表"""
-        start_y = 235 if is_b35 else 1085
-        row_height = 114
-
         for index, score in enumerate(scores):
-            row = index // 5
-            col = index % 5
+            x, y = self._card_position(index, is_b35)
+            self._draw_score_card(img, score, x, y)
 
-            x = 16 + col * 276
-            y = start_y + row * row_height
+    def _card_position(self, index: int, is_b35: bool) -> tuple[int, int]:
+        """第index个卡位的左上角坐标"""
+        start_y = self.B35_START_Y if is_b35 else self.B15_START_Y
+        row, col = divmod(index, 5)
+        return (
+            self._px(16 + col * self.CARD_PITCH[0]),
+            self._px(start_y + row * self.CARD_PITCH[1]),
+        )
 
-            self._draw_score_card(img, score, x, y)
+
+# 静态资源目录的文件清单，所有生成器共享
+asset_manifest = AssetManifest(B50ImageGenerator.STATIC_PATH)
+
+# 进程内共享的生成器实例，键为是否为预览模式，静态资源只在首次使用或重新加载时解码
+_shared_generators: dict[bool, B50ImageGenerator] = {}
+
+
+def create_b50_generator(preview: bool = False) -> B50ImageGenerator:
+    """按插件配置创建新的生成器，不替换共享实例"""
+    generator = B50ImageGenerator(
+        cover_cache_size=config.b50_cover_cache_size,
+        card_cache_size=config.b50_card_cache_size,
+        canvas_store_size=config.b50_canvas_store_size,
+        encode_options=EncodeOptions(
+            format=config.b50_image_format,
+            quality=config.b50_image_quality,
+            png_compress_level=config.b50_png_compress_level,
+            flatten_alpha=config.b50_flatten_alpha,
+        ),
+        scale=config.b50_preview_scale if preview else 1.0,
+    )
+    generator.prewarm_fonts(config.b50_font_prewarm_sizes)
+    return generator
+
+
+def clear_shared_caches() -> None:
+    """清空进程级共享的渲染缓存"""
+    _truncate_cache.clear()
+    _font_cache.clear()
+
+
+def get_b50_generator(preview: bool = False) -> B50ImageGenerator:
+    """获取共享的B50图片生成器，首次调用时加载全部静态资源
+
+    Args:
+        preview: 是否获取低分辨率预览图的生成器
+    """
+    generator = _shared_generators.get(preview)
+    if generator is None:
+        generator = _shared_generators[preview] = create_b50_generator(preview)
+    return generator
+
+
+def process_cache_stats() -> dict[str, dict[str, int]]:
+    """汇总当前进程中各共享生成器的缓存统计，进程级共享的缓存只计一次
+
+    尚未创建生成器时返回空统计，不会为了查询统计而加载静态资源。
+    """
+    merged: dict[str, dict[str, int]] = {}
+    for generator in _shared_generators.values():
+        for name, item in generator.cache_stats().items():
+            if name in merged and name in ("title", "font"):
+                continue
+            target = merged.setdefault(name, {})
+            for key, value in item.items():
+                target[key] = target.get(key, 0) + value
+    return merged
+
+
+def reload_b50_generator() -> B50ImageGenerator:
+    """重新加载静态资源并替换已创建的共享生成器
+
+    新实例加载完成后才会替换旧实例，正在进行的渲染不受影响。
+
+    Returns:
+        完整尺寸的生成器
+    """
+    asset_manifest.refresh()
+    # 字体文件可能已被替换，需要重新解析字体并重新测量文本
+    clear_shared_caches()
+    reloaded = {
+        preview: create_b50_generator(preview)
+        for preview in {False, *_shared_generators}
+    }
+    _shared_generators.update(reloaded)
+    logger.info("B50图片资源已重新加载")
+    return reloaded[False]
@@ -0,0 +1,338 @@
+"""通用缓存工具
+
+提供B50渲染与接口调用共用的有界缓存实现。
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Generic, Hashable, TypeVar
+
+from nonebot import logger
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """线程安全的有界LRU缓存，记录命中与未命中次数"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = max(0, maxsize)
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K, default: Any = None) -> V | Any:
+        """获取缓存值，命中时将其移动到队尾"""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: K, default: Any = None) -> V | Any:
+        """移除并返回缓存值"""
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        """清空缓存并重置统计"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        """返回缓存统计信息"""
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class AsyncTTLCache(Generic[K, V]):
+    """异步接口结果的TTL缓存，同一个键的并发请求合并为一次调用
+
+    只在事件循环线程中使用，不需要加锁。
+    """
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = max(0, maxsize)
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        # 值为(过期时间, 结果)
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._inflight: dict[K, asyncio.Task[V]] = {}
+
+    async def get_or_load(self, key: K, loader: Callable[[], Awaitable[V]]) -> V:
+        """获取未过期的缓存值，否则调用loader加载
+
+        同一个键已有进行中的加载时等待其结果，不再重复调用。
+        加载在独立任务中进行，某个调用方被取消不影响其他等待者。
+        """
+        entry = self._data.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self._data[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._on_loaded(key, t))
+        return await asyncio.shield(task)
+
+    def _on_loaded(self, key: K, task: asyncio.Task[V]) -> None:
+        # 加载期间键被移除（invalidate）时不再写入结果
+        if self._inflight.get(key) is not task:
+            return
+        del self._inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, task.result())
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        """移除缓存值，进行中的加载结果也不再写入缓存"""
+        self._data.pop(key, None)
+        self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存并重置统计"""
+        self._data.clear()
+        self._inflight.clear()
+        self.hits = self.misses = self.coalesced = 0
+
+    def stats(self) -> dict[str, int]:
+        """返回缓存统计信息"""
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
+
+
+class TTLBytesCache:
+    """内存+磁盘两级字节缓存
+
+    两级都按TTL过期，并分别按总字节数淘汰最久未使用（磁盘为最早写入）的条目。
+    directory为None时只使用内存。
+    """
+
+    def __init__(
+        self,
+        directory: Path | None,
+        ttl: float,
+        memory_max_bytes: int,
+        disk_max_bytes: int,
+    ):
+        self.directory = directory
+        self.ttl = ttl
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: int | None = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.bin"
+
+    def get(self, key: str) -> bytes | None:
+        """获取缓存内容，内存未命中时尝试从磁盘读取"""
+        now = time.time()
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                expires_at, data = item
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return data
+                self._memory_bytes -= len(self._memory.pop(key)[1])
+
+        item = self._read_disk(key, now)
+        with self._lock:
+            if item is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        # 沿用磁盘条目的过期时间，避免读回内存后存活时间超过TTL
+        data, expires_at = item
+        self._put_memory(key, data, expires_at)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """写入内存与磁盘"""
+        self._put_memory(key, data, time.time() + self.ttl)
+        self._write_disk(key, data)
+
+    def _put_memory(self, key: str, data: bytes, expires_at: float) -> None:
+        if len(data) > self.memory_max_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= len(old[1])
+            self._memory[key] = (expires_at, data)
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.memory_max_bytes:
+                _, (_, evicted) = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def _read_disk(self, key: str, now: float) -> tuple[bytes, float] | None:
+        """读取未过期的磁盘条目，返回内容与过期时间"""
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            stat = path.stat()
+            expires_at = stat.st_mtime + self.ttl
+            if expires_at <= now:
+                path.unlink(missing_ok=True)
+                self._discount_disk(stat.st_size)
+                return None
+            return path.read_bytes(), expires_at
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"读取缓存文件失败 {path}: {e}")
+            return None
+
+    def _discount_disk(self, size: int) -> None:
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes = max(0, self._disk_bytes - size)
+
+    def _write_disk(self, key: str, data: bytes) -> None:
+        if self.directory is None or len(data) > self.disk_max_bytes:
+            return
+        path = self._path(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # 覆盖已有条目时先扣除旧文件的大小
+            try:
+                old_size = path.stat().st_size
+            except FileNotFoundError:
+                old_size = 0
+            # 先写临时文件再替换，避免读到写了一半的文件
+            # 临时文件名不重复，同一个键并发写入时不会互相覆盖
+            tmp_path = self.directory / f"{key}.{uuid.uuid4().hex}.tmp"
+            tmp_path.write_bytes(data)
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"写入缓存文件失败: {e}")
+            return
+
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += len(data) - old_size
+            over_limit = (
+                self._disk_bytes is None or self._disk_bytes > self.disk_max_bytes
+            )
+        if over_limit:
+            self.cleanup()
+
+    def cleanup(self) -> int:
+        """清理过期与超出容量的磁盘缓存
+
+        Returns:
+            删除的文件数量
+        """
+        if self.directory is None or not self.directory.exists():
+            return 0
+
+        now = time.time()
+        removed = 0
+        files = []
+        for path in self.directory.glob("*.bin"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime + self.ttl <= now:
+                path.unlink(missing_ok=True)
+                removed += 1
+            else:
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        files.sort()
+        for _, size, path in files:
+            if total <= self.disk_max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+
+        with self._lock:
+            self._disk_bytes = total
+        return removed
+
+    def clear(self) -> None:
+        """清空内存与磁盘缓存"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            self.hits = self.disk_hits = self.misses = 0
+        if self.directory is not None and self.directory.exists():
+            for path in self.directory.glob("*.bin"):
+                path.unlink(missing_ok=True)
+            with self._lock:
+                self._disk_bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """返回缓存统计信息"""
+        return {
+            "size": len(self._memory),
+            "hits": self.hits + self.disk_hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "memory_bytes": self._memory_bytes,
+            "disk_bytes": self._disk_bytes or 0,
+        }
@@ -0,0 +1,109 @@
+"""封面打包文件
+
+将封面目录中的PNG预缩放后，以未压缩的RGBA像素打包到单个文件中。
+读取时通过mmap映射整个文件，封面直接引用映射内存，不需要打开文件或解码PNG；
+多个渲染进程映射同一文件时共享操作系统的页缓存。
+
+文件格式（小端序）:
+    文件头  magic(8s) 宽(H) 高(H) 封面数(I)
+    索引    封面数 x [歌曲ID(I) 偏移量(Q)]，按歌曲ID升序
+    数据    每张封面 宽*高*4 字节的RGBA像素，数据区起始位置按页大小对齐
+"""
+
+import mmap
+import struct
+from pathlib import Path
+
+from PIL import Image
+
+ARCHIVE_MAGIC = b"MAICOVR1"
+HEADER = struct.Struct("<8sHHI")
+INDEX_ENTRY = struct.Struct("<IQ")
+# 数据区起始位置的对齐单位
+ALIGNMENT = mmap.PAGESIZE
+
+
+def pack_cover_archive(
+    source_dir: Path, target_path: Path, size: tuple[int, int]
+) -> int:
+    """将目录中以歌曲ID命名的PNG封面打包为封面文件
+
+    Args:
+        source_dir: 原始封面目录
+        target_path: 输出文件路径
+        size: 封面缩放尺寸
+
+    Returns:
+        打包的封面数量
+    """
+    cover_paths = sorted(
+        (int(path.stem), path)
+        for path in source_dir.glob("*.png")
+        if path.stem.isdigit()
+    )
+    tile_size = size[0] * size[1] * 4
+
+    index_end = HEADER.size + INDEX_ENTRY.size * len(cover_paths)
+    data_start = -(-index_end // ALIGNMENT) * ALIGNMENT
+
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = target_path.with_suffix(target_path.suffix + ".tmp")
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(ARCHIVE_MAGIC, size[0], size[1], len(cover_paths)))
+        for i, (song_id, _) in enumerate(cover_paths):
+            f.write(INDEX_ENTRY.pack(song_id, data_start + i * tile_size))
+
+        f.seek(data_start)
+        for _, cover_path in cover_paths:
+            cover = Image.open(cover_path).convert("RGBA")
+            if cover.size != size:
+                cover = cover.resize(size, Image.Resampling.LANCZOS)
+            f.write(cover.tobytes("raw", "RGBA"))
+
+    # 先写临时文件再替换，正在映射旧文件的进程不受影响
+    temp_path.replace(target_path)
+    return len(cover_paths)
+
+
+class CoverArchive:
+    """只读的封面打包文件"""
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, width, height, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != ARCHIVE_MAGIC:
+            raise ValueError(f"不是有效的封面打包文件: {path}")
+
+        self.size = (width, height)
+        self._tile_size = width * height * 4
+        self._offsets: dict[int, int] = {}
+        for i in range(count):
+            song_id, offset = INDEX_ENTRY.unpack_from(
+                self._mmap, HEADER.size + i * INDEX_ENTRY.size
+            )
+            self._offsets[song_id] = offset
+
+        self._view = memoryview(self._mmap)
+
+    def __contains__(self, song_id: int) -> bool:
+        return song_id in self._offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def get(self, song_id: int) -> Image.Image | None:
+        """获取封面，返回的图片直接引用映射内存，为只读"""
+        offset = self._offsets.get(song_id)
+        if offset is None:
+            return None
+        return Image.frombuffer(
+            "RGBA",
+            self.size,
+            self._view[offset : offset + self._tile_size],
+            "raw",
+            "RGBA",
+            0,
+            1,
+        )
@@ -0,0 +1,109 @@
+"""按内容寻址的图片存储
+
+生成的图片以内容的sha256命名保存到本地目录，由bot自身的HTTP服务提供访问，
+消息中只需携带图片URL。相同图片重复发送时复用同一个文件和URL。
+"""
+
+import hashlib
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+
+from nonebot import get_driver, get_plugin_config, logger
+from nonebot.drivers import ASGIMixin
+
+from src.plugins.maicn.config import Config
+
+config = get_plugin_config(Config)
+
+# 图片访问路由的路径前缀
+IMAGE_ROUTE = "/maicn/images"
+
+IMAGE_MEDIA_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".webp": "image/webp",
+}
+
+_NAME_PATTERN = re.compile(r"^[0-9a-f]{64}\.(png|jpg|webp)$")
+
+
+class ImageStore:
+    """以内容摘要命名图片文件的本地存储，文件超过TTL未被使用后删除"""
+
+    def __init__(self, directory: Path, ttl: float, base_url: str):
+        self.directory = directory
+        self.ttl = ttl
+        self.base_url = base_url.rstrip("/")
+
+    def put(self, data: bytes, suffix: str) -> str:
+        """保存图片并返回文件名，已存在时只刷新过期时间"""
+        name = f"{hashlib.sha256(data).hexdigest()}{suffix}"
+        path = self.directory / name
+        try:
+            os.utime(path)
+            return name
+        except FileNotFoundError:
+            pass
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # 先写临时文件再替换，避免读到写了一半的文件
+        tmp_path = self.directory / f"{name}.{uuid.uuid4().hex}.tmp"
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+        return name
+
+    def url(self, name: str) -> str:
+        return f"{self.base_url}{IMAGE_ROUTE}/{name}"
+
+    def path(self, name: str) -> Path | None:
+        """获取未过期图片的路径，文件名不合法或图片不存在时返回None"""
+        if not _NAME_PATTERN.match(name):
+            return None
+        path = self.directory / name
+        try:
+            if path.stat().st_mtime + self.ttl <= time.time():
+                return None
+        except FileNotFoundError:
+            return None
+        return path
+
+    def cleanup(self) -> int:
+        """删除过期图片，返回删除的文件数量"""
+        if not self.directory.exists():
+            return 0
+
+        now = time.time()
+        removed = 0
+        for path in self.directory.iterdir():
+            try:
+                if path.stat().st_mtime + self.ttl <= now:
+                    path.unlink(missing_ok=True)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.warning(f"清理图片文件失败 {path}: {e}")
+        return removed
+
+
+def _create_image_store() -> ImageStore | None:
+    """配置了图片地址且驱动器提供HTTP服务时创建图片存储"""
+    if not config.b50_image_base_url:
+        return None
+    driver = get_driver()
+    if not isinstance(driver, ASGIMixin):
+        logger.warning(
+            f"当前驱动器 {driver.type} 不支持HTTP服务，B50图片将直接以字节发送"
+        )
+        return None
+    return ImageStore(
+        directory=Path(config.maicn_data_path) / "images",
+        ttl=config.b50_image_store_ttl,
+        base_url=config.b50_image_base_url,
+    )
+
+
+b50_image_store = _create_image_store()
@@ -0,0 +1,75 @@
+"""本地计算B50
+
+直接使用街机成绩与歌曲定数索引计算B35/B15，不经过查分器。
+谱面版本不低于当前版本的成绩计入B15，其余计入B35，排序规则与maimai.py一致。
+"""
+
+import heapq
+from dataclasses import fields
+
+from maimai_py import SongType
+from maimai_py.enums import current_version
+from maimai_py.models import PlayerBests, ScoreExtend
+from maimai_py.models import Score as MaimaiPyScore
+from nonebot import get_plugin_config
+
+from src.plugins.maicn.config import Config
+from src.plugins.maicn.libraries.song_index import ChartInfo, SongInfo, song_index
+
+config = get_plugin_config(Config)
+
+
+def _sort_key(item: tuple[MaimaiPyScore, SongInfo, ChartInfo]) -> tuple:
+    score = item[0]
+    return score.dx_rating or 0, score.dx_score or 0, score.achievements or 0
+
+
+def _extend(item: tuple[MaimaiPyScore, SongInfo, ChartInfo]) -> ScoreExtend:
+    score, song, chart = item
+    return ScoreExtend(
+        **{field.name: getattr(score, field.name) for field in fields(score)},
+        title=song.title,
+        level_value=chart.level_value,
+        level_dx_score=None,
+    )
+
+
+def compute_local_bests(scores: list[MaimaiPyScore]) -> PlayerBests:
+    """从完整成绩列表中选出B35与B15
+
+    Args:
+        scores: mai_cn_score_to_maimaipy 转换后的成绩
+
+    Returns:
+        与查分器返回格式相同的B50数据，谱面的等级总分（level_dx_score）为空
+    """
+    version = config.maicn_current_version or current_version.value
+    old_charts: list[tuple[MaimaiPyScore, SongInfo, ChartInfo]] = []
+    new_charts: list[tuple[MaimaiPyScore, SongInfo, ChartInfo]] = []
+
+    for score in scores:
+        # 宴会场谱面不计入Rating
+        if score.type == SongType.UTAGE:
+            continue
+        song = song_index.get(score.id)
+        if song is None:
+            continue
+        chart = song.charts.get(score.type, {}).get(score.level_index.value)
+        if chart is None:
+            continue
+        (new_charts if chart.version >= version else old_charts).append(
+            (score, song, chart)
+        )
+
+    # 只需要前若干名，用堆选取代替整体排序，也只为入选的成绩补充歌曲信息
+    scores_b35 = [_extend(item) for item in heapq.nlargest(35, old_charts, _sort_key)]
+    scores_b15 = [_extend(item) for item in heapq.nlargest(15, new_charts, _sort_key)]
+    rating_b35 = sum(score.dx_rating or 0 for score in scores_b35)
+    rating_b15 = sum(score.dx_rating or 0 for score in scores_b15)
+    return PlayerBests(
+        rating=rating_b35 + rating_b15,
+        rating_b35=rating_b35,
+        rating_b15=rating_b15,
+        scores_b35=scores_b35,
+        scores_b15=scores_b15,
+    )
@@ -1,21 +1,20 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+
 import httpx
-from maimai_py import (
-    DivingFishProvider,
-    FCType,
-    FSType,
-    LevelIndex,
-    LXNSProvider,
-    MaimaiClient,
-    RateType,
-    SongType,
-)
+from maimai_py import DivingFishProvider, LXNSProvider, MaimaiClient
 from maimai_py.models import Score as MaimaiPyScore
-from maimai_py.utils import ScoreCoefficient
 from nonebot import get_plugin_config
 from wahlap_mai_ass_expander import MaiSimClient
 from wahlap_mai_ass_expander.model import Score as MaiCNScore
 
 from src.plugins.maicn.config import Config
+from src.plugins.maicn.libraries.cache import AsyncTTLCache
+from src.plugins.maicn.libraries.score_convert import convert_maicn_scores
+from src.plugins.maicn.libraries.song_index import song_index
 
 config = get_plugin_config(Config)
 
@@ -26,91 +25,283 @@ divingfish_provider = DivingFishProvider(
 lxns_provider = LXNSProvider(developer_token=config.lxns_developer_token)
 
 
+async def refresh_song_index() -> int:
+    """从落雪获取最新曲目列表并更新歌曲索引与快照，返回歌曲数量"""
+    songs = await lxns_provider.get_songs(maimai_py_client)
+    song_index.update(songs)
+    await asyncio.to_thread(song_index.save_snapshot)
+    return len(song_index)
+
+
+async def ensure_song_index():
+    """歌曲索引为空（首次启动且没有快照）时立即获取"""
+    if not song_index:
+        await refresh_song_index()
+
+
 async def mai_cn_score_to_maimaipy(
     maicn_scores: list[MaiCNScore],
 ) -> list[MaimaiPyScore]:
     """
     将maimaicn的成绩格式转换为maimai.py用格式
     """
-    songs_info = await maimai_py_client.songs(provider=lxns_provider)
-    scores = []
-
-    for i in maicn_scores:
-        music_id = i["musicId"]
-        level = i["level"]
-        achievement = i["achievement"]
-        combo_status = i["comboStatus"]
-        sync_status = i["syncStatus"]
-        deluxscore_max = i["deluxscoreMax"]
-        i["scoreRank"]
-        play_count = i["playCount"]
-
-        song_info = await songs_info.by_id(
-            music_id % 10000 if music_id < 100000 else music_id
-        )
-        if song_info is None:
-            continue
-        song_type = (
-            SongType.UTAGE
-            if music_id > 100000
-            else SongType.STANDARD
-            if music_id < 10000
-            else SongType.DX
+    await ensure_song_index()
+    return convert_maicn_scores(maicn_scores)
+
+
+class _CountingTransport(httpx.AsyncHTTPTransport):
+    """统计请求数与新建连接数的传输层"""
+
+    def __init__(self, stats: dict[str, int], **kwargs):
+        super().__init__(**kwargs)
+        self._stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._stats["requests"] += 1
+        request.extensions = {**request.extensions, "trace": self._trace}
+        try:
+            return await super().handle_async_request(request)
+        except httpx.TransportError:
+            self._stats["errors"] += 1
+            raise
+
+    async def _trace(self, event_name: str, info: dict):
+        # 经过代理时事件名前缀不同，只匹配后缀
+        if event_name.endswith("connect_tcp.complete"):
+            self._stats["connections"] += 1
+
+
+class ArcadeClient:
+    """进程内共享的舞萌街机客户端，所有请求复用同一个httpx连接池"""
+
+    def __init__(self):
+        self._httpx_client: httpx.AsyncClient | None = None
+        self._client: MaiSimClient | None = None
+        self._stats = {"requests": 0, "connections": 0, "errors": 0}
+
+    def open(self) -> MaiSimClient:
+        """创建客户端，已创建时直接返回"""
+        if self._client is not None:
+            return self._client
+
+        proxy = None
+        if config.proxy_host:
+            proxy = f"http://{config.proxy_username}:{config.proxy_password}@{config.proxy_host}:{config.proxy_port}"
+
+        self._httpx_client = httpx.AsyncClient(
+            transport=_CountingTransport(
+                self._stats,
+                proxy=proxy,
+                limits=httpx.Limits(
+                    max_connections=config.maimai_arcade_max_connections,
+                    max_keepalive_connections=config.maimai_arcade_max_connections,
+                    keepalive_expiry=config.maimai_arcade_keepalive_expiry,
+                ),
+            ),
+            timeout=httpx.Timeout(
+                config.maimai_arcade_timeout,
+                connect=config.maimai_arcade_connect_timeout,
+            ),
         )
-        # 添加边界检查，防止 IndexError
-        level_index_list = list(LevelIndex)
-        if level < 0 or level >= len(level_index_list):
-            # 如果 level 超出范围，跳过这个成绩
-            continue
-        song_level_index = level_index_list[level]
-
-        scores.append(
-            MaimaiPyScore(
-                id=music_id % 10000 if music_id < 100000 else music_id,
-                level=song_info.get_difficulty(song_type, song_level_index).level,
-                level_index=song_level_index,
-                achievements=achievement / 10000,
-                fc=[None, FCType.FC, FCType.FCP, FCType.AP, FCType.APP][combo_status],
-                fs=[None, FSType.FS, FSType.FSP, FSType.FSD, FSType.FSDP, FSType.SYNC][
-                    sync_status
-                ],
-                dx_score=deluxscore_max,
-                dx_rating=ScoreCoefficient(achievement / 10000).ra(level),
-                play_count=play_count,
-                rate=RateType._from_achievement(achievement / 10000),
-                type=song_type,
-            )
+        self._client = MaiSimClient(
+            chip_id=config.maimai_arcade_chip_id,
+            aes_key=config.maimai_arcade_aes_key,
+            aes_iv=config.maimai_arcade_aes_iv,
+            obfuscate_param=config.maimai_arcade_obfuscate_param,
+            httpx_client=self._httpx_client,
         )
-    return scores
+        return self._client
+
+    async def aclose(self):
+        """关闭连接池，之后再次使用时重新创建"""
+        httpx_client = self._httpx_client
+        self._httpx_client = None
+        self._client = None
+        if httpx_client is not None:
+            await httpx_client.aclose()
+
+    def stats(self) -> dict[str, int]:
+        """请求数、新建连接数、复用连接的请求数与传输错误数"""
+        return {
+            **self._stats,
+            "reused": max(0, self._stats["requests"] - self._stats["connections"]),
+        }
+
+
+arcade_client = ArcadeClient()
+
+
+class ArcadeLane(IntEnum):
+    """街机接口调用的优先级通道，数值越小越优先"""
 
+    # 二维码登录、玩家预览信息等轻量请求
+    INTERACTIVE = 0
+    # 完整成绩拉取
+    BULK = 1
+    # 后台定时同步
+    BACKGROUND = 2
 
-def mai_client_constructor():
-    httpx_client = None
 
-    if config.proxy_host:
-        httpx_client = httpx.AsyncClient(
-            proxy=f"http://{config.proxy_username}:{config.proxy_password}@{config.proxy_host}:{config.proxy_port}",
+class ArcadeGovernor:
+    """街机接口调用的全局限流器
+
+    用令牌桶限制请求速率，并限制同时进行的请求数。空闲名额按通道优先级分配，
+    批量通道另有单独的并发上限，保证轻量请求不会排在大量成绩拉取之后。
+    只在事件循环线程中使用。
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        max_in_flight: int,
+        lane_limits: dict[ArcadeLane, int] | None = None,
+    ):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_in_flight = max(1, max_in_flight)
+        self.lane_limits = lane_limits or {}
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._in_flight = {lane: 0 for lane in ArcadeLane}
+        self._queues: dict[ArcadeLane, deque[asyncio.Future]] = {
+            lane: deque() for lane in ArcadeLane
+        }
+        self._timer: asyncio.TimerHandle | None = None
+        self._calls = {lane: 0 for lane in ArcadeLane}
+        self._wait_total = {lane: 0.0 for lane in ArcadeLane}
+        self._wait_max = {lane: 0.0 for lane in ArcadeLane}
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._refilled_at) * self.rate
         )
+        self._refilled_at = now
 
-    return MaiSimClient(
-        chip_id=config.maimai_arcade_chip_id,
-        aes_key=config.maimai_arcade_aes_key,
-        aes_iv=config.maimai_arcade_aes_iv,
-        obfuscate_param=config.maimai_arcade_obfuscate_param,
-        httpx_client=httpx_client,
-    )
+    def _has_capacity(self, lane: ArcadeLane) -> bool:
+        if sum(self._in_flight.values()) >= self.max_in_flight:
+            return False
+        return self._in_flight[lane] < self.lane_limits.get(lane, self.max_in_flight)
+
+    def _dispatch(self):
+        """按优先级将空闲名额与令牌分配给等待中的调用"""
+        if self.rate > 0:
+            self._refill()
+
+        for lane in ArcadeLane:
+            queue = self._queues[lane]
+            while queue and self._has_capacity(lane):
+                future = queue[0]
+                if future.done():
+                    # 等待中被取消的调用
+                    queue.popleft()
+                    continue
+                if self.rate > 0:
+                    if self._tokens < 1:
+                        # 令牌不足时低优先级通道也不能越过，等下一个令牌
+                        self._schedule((1 - self._tokens) / self.rate)
+                        return
+                    self._tokens -= 1
+                queue.popleft()
+                self._in_flight[lane] += 1
+                future.set_result(None)
+
+    def _schedule(self, delay: float):
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+
+    def _on_timer(self):
+        self._timer = None
+        self._dispatch()
+
+    def _release(self, lane: ArcadeLane):
+        self._in_flight[lane] -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, lane: ArcadeLane):
+        """在限流允许后执行一次街机接口调用"""
+        start = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        self._queues[lane].append(future)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # 名额已分配但调用方被取消时归还名额
+            if future.done() and not future.cancelled():
+                self._release(lane)
+            raise
+
+        waited = time.monotonic() - start
+        self._calls[lane] += 1
+        self._wait_total[lane] += waited
+        self._wait_max[lane] = max(self._wait_max[lane], waited)
+        try:
+            yield
+        finally:
+            self._release(lane)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """各通道的排队数、进行中请求数、调用次数与等待时间（毫秒）"""
+        return {
+            lane.name.lower(): {
+                "queued": sum(not f.done() for f in self._queues[lane]),
+                "in_flight": self._in_flight[lane],
+                "calls": self._calls[lane],
+                "wait_avg_ms": (
+                    self._wait_total[lane] / self._calls[lane] * 1000
+                    if self._calls[lane]
+                    else 0.0
+                ),
+                "wait_max_ms": self._wait_max[lane] * 1000,
+            }
+            for lane in ArcadeLane
+        }
+
+
+arcade_governor = ArcadeGovernor(
+    rate=config.maimai_arcade_rate_limit,
+    burst=config.maimai_arcade_burst,
+    max_in_flight=config.maimai_arcade_max_in_flight,
+    lane_limits={
+        ArcadeLane.BULK: config.maimai_arcade_bulk_max_in_flight,
+        ArcadeLane.BACKGROUND: config.maimai_arcade_background_max_in_flight,
+    },
+)
+
+# 玩家预览信息（名称、Rating等）缓存，键为maimai用户ID
+preview_info_cache: AsyncTTLCache[int, dict] = AsyncTTLCache(
+    ttl=config.maimai_preview_cache_ttl, maxsize=config.maimai_preview_cache_size
+)
 
 
 async def get_maimai_uid(qr_code: str):
-    resp = await mai_client_constructor().qr_scan(qr_code)
+    async with arcade_governor.slot(ArcadeLane.INTERACTIVE):
+        resp = await arcade_client.open().qr_scan(qr_code)
     return resp["userID"]
 
 
-async def get_maimai_user_all_score(user_id: int):
-    resp = await mai_client_constructor().get_user_full_music_detail(user_id)
+async def get_maimai_user_all_score(user_id: int, lane: ArcadeLane = ArcadeLane.BULK):
+    async with arcade_governor.slot(lane):
+        resp = await arcade_client.open().get_user_full_music_detail(user_id)
     return resp
 
 
+async def _fetch_maimai_user_preview_info(user_id: int):
+    async with arcade_governor.slot(ArcadeLane.INTERACTIVE):
+        return await arcade_client.open().get_user_preview_info(user_id)
+
+
 async def get_maimai_user_preview_info(user_id: int):
-    resp = await mai_client_constructor().get_user_preview_info(user_id)
+    user_id = int(user_id)
+    resp = await preview_info_cache.get_or_load(
+        user_id, lambda: _fetch_maimai_user_preview_info(user_id)
+    )
     return resp
+
+
+def invalidate_maimai_user_preview_info(user_id: int):
+    """玩家数据可能已变化时移除预览信息缓存"""
+    preview_info_cache.invalidate(int(user_id))
@@ -0,0 +1,359 @@
+"""B50渲染进程池
+
+PIL渲染与PNG编码都是同步的CPU密集操作，放到独立的工作进程中执行，
+避免阻塞NoneBot的事件循环。
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterable
+
+from nonebot import get_plugin_config, logger
+
+from src.plugins.maicn.config import Config
+from src.plugins.maicn.libraries.b50_image import (
+    get_b50_generator,
+    process_cache_stats,
+    reload_b50_generator,
+)
+from src.plugins.maicn.libraries.cache import TTLBytesCache
+from src.utils.helpers.standalone_helper import init_worker, spawn_without_main
+
+config = get_plugin_config(Config)
+
+
+B50Job = tuple[dict[str, Any], list[dict[str, Any]], list[dict[str, Any]]]
+
+
+class RenderPoolBusy(Exception):
+    """渲染队列已满"""
+
+
+def _init_worker():
+    """工作进程初始化，在子进程中加载静态资源
+
+    由 init_worker 在独立模式下调用，子进程只导入渲染用到的模块，不加载插件。
+    """
+    get_b50_generator()
+
+
+def _render_in_worker(
+    player_data: dict[str, Any],
+    b35_scores: list[dict[str, Any]],
+    b15_scores: list[dict[str, Any]],
+    player_key: str | None = None,
+    preview: bool = False,
+) -> tuple[bytes, int, dict[str, dict[str, int]]]:
+    """渲染图片，并附带当前进程的缓存统计"""
+    generator = get_b50_generator(preview)
+    image_bytes = generator.render_b50_image(
+        player_data, b35_scores, b15_scores, player_key=player_key
+    )
+    return image_bytes, os.getpid(), process_cache_stats()
+
+
+def _encoder_report_in_worker() -> list[dict[str, Any]]:
+    return get_b50_generator().encoder_report()
+
+
+class B50RenderPool:
+    """带有界队列与超时控制的B50渲染池
+
+    workers为0时退化为单个后台线程渲染。
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        queue_size: int,
+        timeout: float,
+        result_cache: TTLBytesCache | None = None,
+    ):
+        self.workers = max(0, workers)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+        # 以渲染输入摘要为键的成品图片缓存
+        self.result_cache = result_cache
+        self._executor: Executor | None = None
+        # 各工作进程最近上报的缓存统计，键为进程ID
+        self._worker_stats: dict[int, dict[str, dict[str, int]]] = {}
+        # 已提交但尚未完成的渲染任务数（包括超时后仍在执行的任务）
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        """同时允许存在的最大任务数"""
+        return max(1, self.workers) + self.queue_size
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def start(self):
+        """创建执行器并启动工作进程"""
+        if self._executor is not None:
+            return
+
+        if self.workers > 0:
+            # 父进程中有事件循环与后台线程，fork时其他线程可能正持有日志或缓存的锁，
+            # 子进程继承后会死锁，因此使用spawn启动。子进程不重新执行 bot.py，
+            # 以父进程解析好的插件配置独立初始化，只导入渲染相关的模块
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=(config.model_dump(), f"{__name__}:_init_worker"),
+            )
+            # 提交空任务让工作进程立即启动，而不是等到第一次渲染时才加载资源；
+            # 进程池按需创建子进程，提交workers个任务后全部子进程都已创建
+            with spawn_without_main():
+                for _ in range(self.workers):
+                    self._executor.submit(os.getpid)
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="b50-render"
+            )
+        logger.info(f"B50渲染池已启动 (workers={self.workers})")
+
+    def shutdown(self):
+        """关闭执行器，已提交的任务会继续执行完毕"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        self._worker_stats.clear()
+
+    def restart(self):
+        """重建执行器，使工作进程重新加载静态资源"""
+        self.shutdown()
+        self.start()
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    async def _lookup_cache(
+        self,
+        player_data: dict[str, Any],
+        b35_scores: list[dict[str, Any]],
+        b15_scores: list[dict[str, Any]],
+        preview: bool = False,
+    ) -> tuple[str | None, bytes | None]:
+        """查询成品图片缓存，返回缓存键与命中的图片"""
+        if self.result_cache is None:
+            return None, None
+        cache_key = get_b50_generator(preview).fingerprint(
+            player_data, b35_scores, b15_scores
+        )
+        cached = await asyncio.to_thread(self.result_cache.get, cache_key)
+        return cache_key, cached
+
+    async def _execute(
+        self,
+        player_data: dict[str, Any],
+        b35_scores: list[dict[str, Any]],
+        b15_scores: list[dict[str, Any]],
+        cache_key: str | None,
+        counted: bool,
+        player_key: str | None = None,
+        preview: bool = False,
+    ) -> bytes:
+        """提交任务到执行器并等待结果
+
+        Args:
+            counted: 是否计入有界队列，完成后释放占用的名额
+            player_key: 玩家标识，用于工作进程中的增量重绘
+            preview: 是否渲染低分辨率预览图
+        """
+        if self._executor is None:
+            self.start()
+
+        try:
+            future = self._executor.submit(
+                _render_in_worker,
+                player_data,
+                b35_scores,
+                b15_scores,
+                player_key,
+                preview,
+            )
+        except Exception:
+            if counted:
+                self._release(None)
+            raise
+        if counted:
+            future.add_done_callback(self._release)
+
+        try:
+            image_bytes, pid, stats = await asyncio.wait_for(
+                asyncio.wrap_future(future), self.timeout
+            )
+        except BrokenProcessPool:
+            logger.error("B50渲染进程异常退出，正在重建渲染池")
+            self.restart()
+            raise
+
+        self._worker_stats[pid] = stats
+        if cache_key is not None:
+            await asyncio.to_thread(self.result_cache.put, cache_key, image_bytes)
+        return image_bytes
+
+    async def render(
+        self,
+        player_data: dict[str, Any],
+        b35_scores: list[dict[str, Any]],
+        b15_scores: list[dict[str, Any]],
+        player_key: str | None = None,
+        preview: bool = False,
+    ) -> bytes:
+        """提交渲染任务并等待结果，输入未变化时直接返回缓存的图片
+
+        Args:
+            player_key: 玩家标识，提供时工作进程会尽量只重绘变化的部分
+            preview: 是否渲染低分辨率预览图
+
+        Raises:
+            RenderPoolBusy: 排队任务已达上限
+            TimeoutError: 渲染超时
+        """
+        cache_key, cached = await self._lookup_cache(
+            player_data, b35_scores, b15_scores, preview
+        )
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            if self._pending >= self.capacity:
+                raise RenderPoolBusy()
+            self._pending += 1
+
+        return await self._execute(
+            player_data,
+            b35_scores,
+            b15_scores,
+            cache_key,
+            counted=True,
+            player_key=player_key,
+            preview=preview,
+        )
+
+    async def _render_batch_job(self, job: B50Job, preview: bool) -> bytes:
+        cache_key, cached = await self._lookup_cache(*job, preview)
+        if cached is not None:
+            return cached
+        return await self._execute(*job, cache_key, counted=False, preview=preview)
+
+    async def render_batch(
+        self,
+        jobs: Iterable[B50Job],
+        concurrency: int | None = None,
+        preview: bool = False,
+    ) -> AsyncIterator[tuple[int, bytes | Exception]]:
+        """批量渲染多名玩家的B50，按完成顺序逐个返回结果
+
+        任务从jobs中按需取出，同时执行的任务数不超过concurrency（默认为工作进程数），
+        因此无论排队多少玩家，内存占用都保持有界。批量任务不占用聊天命令的排队名额，
+        聊天命令最多只需等待concurrency个批量任务完成。
+
+        Args:
+            jobs: (player_data, b35_scores, b15_scores) 的可迭代对象，可以是生成器
+            concurrency: 同时执行的任务数
+            preview: 是否渲染低分辨率预览图
+
+        Yields:
+            (任务序号, 图片字节或渲染时抛出的异常)
+        """
+        concurrency = max(1, concurrency or self.workers)
+        pending_jobs = enumerate(jobs)
+        running: dict[asyncio.Task, int] = {}
+
+        def fill():
+            while len(running) < concurrency:
+                try:
+                    index, job = next(pending_jobs)
+                except StopIteration:
+                    return
+                task = asyncio.create_task(self._render_batch_job(job, preview))
+                running[task] = index
+
+        try:
+            fill()
+            while running:
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    index = running.pop(task)
+                    if task.exception() is not None:
+                        yield index, task.exception()
+                    else:
+                        yield index, task.result()
+                fill()
+        finally:
+            # 调用方提前停止迭代时取消剩余任务
+            for task in running:
+                task.cancel()
+
+    def cache_stats(self) -> dict[str, dict[str, int]]:
+        """汇总各工作进程的渲染缓存统计与成品图片缓存统计"""
+        sources = list(self._worker_stats.values()) or [process_cache_stats()]
+        merged: dict[str, dict[str, int]] = {}
+        for stats in sources:
+            for name, item in stats.items():
+                target = merged.setdefault(name, {})
+                for key, value in item.items():
+                    target[key] = target.get(key, 0) + value
+
+        if self.result_cache is not None:
+            merged["result"] = self.result_cache.stats()
+        return merged
+
+    async def encoder_report(self) -> list[dict[str, Any]]:
+        """在工作进程中对其最近渲染的画布生成编码对比报告"""
+        if self._executor is None:
+            self.start()
+        future = self._executor.submit(_encoder_report_in_worker)
+        return await asyncio.wrap_future(future)
+
+
+b50_result_cache = (
+    TTLBytesCache(
+        directory=(
+            Path(config.maicn_data_path) / "b50_cache"
+            if config.b50_result_cache_disk_mb > 0
+            else None
+        ),
+        ttl=config.b50_result_cache_ttl,
+        memory_max_bytes=config.b50_result_cache_memory_mb * 1024 * 1024,
+        disk_max_bytes=config.b50_result_cache_disk_mb * 1024 * 1024,
+    )
+    if config.b50_result_cache_ttl > 0
+    else None
+)
+
+b50_render_pool = B50RenderPool(
+    workers=config.b50_render_workers,
+    queue_size=config.b50_render_queue_size,
+    timeout=config.b50_render_timeout,
+    result_cache=b50_result_cache,
+)
+
+
+async def reload_b50_assets():
+    """重新扫描并加载静态资源，重建渲染池并清空成品图片缓存"""
+    generator = await asyncio.to_thread(reload_b50_generator)
+    # 重新预缩放被替换的原始封面，工作进程启动后直接使用新的预缩放文件
+    if config.b50_cover_prebuild and generator.cover_archive is None:
+        built = await asyncio.to_thread(generator.build_resized_covers)
+        if built:
+            logger.info(f"已重新预缩放 {built} 张封面")
+    # 重建渲染池，让工作进程重新加载资源
+    b50_render_pool.restart()
+    # 资源变化后已缓存的成品图片不再有效
+    if b50_result_cache is not None:
+        await asyncio.to_thread(b50_result_cache.clear)
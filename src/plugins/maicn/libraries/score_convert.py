@@ -0,0 +1,118 @@
+"""街机成绩转换
+
+将 get_user_full_music_detail 返回的街机成绩转换为maimai.py的成绩格式。
+只依赖内存中的歌曲索引，不访问网络，也不依赖街机接口客户端。
+"""
+
+from bisect import bisect_right
+from typing import TYPE_CHECKING
+
+from maimai_py import FCType, FSType, LevelIndex, RateType, SongType
+from maimai_py.models import Score as MaimaiPyScore
+from maimai_py.utils.coefficient import SCORE_COEFFICIENT_TABLE
+
+from src.plugins.maicn.libraries.song_index import ChartInfo, song_index
+
+if TYPE_CHECKING:
+    from wahlap_mai_ass_expander.model import Score as MaiCNScore
+
+# 街机数据中的单人/多人评价序号
+COMBO_STATUS = [None, FCType.FC, FCType.FCP, FCType.AP, FCType.APP]
+SYNC_STATUS = [None, FSType.FS, FSType.FSP, FSType.FSD, FSType.FSDP, FSType.SYNC]
+LEVEL_INDEXES = list(LevelIndex)
+
+# 达成率区间的下限与对应系数，与maimai.py的ScoreCoefficient一致
+SCORE_THRESHOLDS = [row[0] for row in SCORE_COEFFICIENT_TABLE]
+SCORE_COEFFICIENTS = [row[1] for row in SCORE_COEFFICIENT_TABLE]
+# 评级区间的下限，RATE_TYPES比RATE_THRESHOLDS多一个最低评级D
+RATE_THRESHOLDS = [50, 60, 70, 75, 80, 90, 94, 97, 98, 99, 99.5, 100, 100.5]
+RATE_TYPES = [
+    RateType.D,
+    RateType.C,
+    RateType.B,
+    RateType.BB,
+    RateType.BBB,
+    RateType.A,
+    RateType.AA,
+    RateType.AAA,
+    RateType.S,
+    RateType.SP,
+    RateType.SS,
+    RateType.SSP,
+    RateType.SSS,
+    RateType.SSSP,
+]
+
+
+def convert_maicn_scores(maicn_scores: list["MaiCNScore"]) -> list[MaimaiPyScore]:
+    """将街机成绩转换为maimai.py的成绩，歌曲索引中找不到的谱面会被跳过
+
+    Rating按谱面定数计算。
+    """
+    # 第一遍只筛选有效成绩并按列取出原始数据
+    song_ids: list[int] = []
+    song_types: list[SongType] = []
+    levels: list[int] = []
+    charts: list[ChartInfo] = []
+    raw_achievements: list[int] = []
+    combo_statuses: list[int] = []
+    sync_statuses: list[int] = []
+    dx_scores: list[int] = []
+    play_counts: list[int] = []
+
+    for i in maicn_scores:
+        music_id = i["musicId"]
+        level = i["level"]
+
+        song_id = music_id % 10000 if music_id < 100000 else music_id
+        song_type = (
+            SongType.UTAGE
+            if music_id > 100000
+            else SongType.STANDARD if music_id < 10000 else SongType.DX
+        )
+        # 添加边界检查，防止 IndexError
+        if level < 0 or level >= len(LEVEL_INDEXES):
+            # 如果 level 超出范围，跳过这个成绩
+            continue
+
+        chart = song_index.get_chart(song_id, song_type, level)
+        if chart is None:
+            continue
+
+        song_ids.append(song_id)
+        song_types.append(song_type)
+        levels.append(level)
+        charts.append(chart)
+        raw_achievements.append(i["achievement"])
+        combo_statuses.append(i["comboStatus"])
+        sync_statuses.append(i["syncStatus"])
+        dx_scores.append(i["deluxscoreMax"])
+        play_counts.append(i["playCount"])
+
+    # 按列计算达成率、Rating与评级，区间查找用二分代替逐行构造ScoreCoefficient
+    achievements = [achievement / 10000 for achievement in raw_achievements]
+    coefficients = [
+        SCORE_COEFFICIENTS[bisect_right(SCORE_THRESHOLDS, a) - 1] for a in achievements
+    ]
+    dx_ratings = [
+        int(c * chart.level_value * min(100.5, a) / 100)
+        for c, chart, a in zip(coefficients, charts, achievements)
+    ]
+    rates = [RATE_TYPES[bisect_right(RATE_THRESHOLDS, a)] for a in achievements]
+
+    return [
+        MaimaiPyScore(
+            id=song_ids[n],
+            level=charts[n].level,
+            level_index=LEVEL_INDEXES[levels[n]],
+            achievements=achievements[n],
+            fc=COMBO_STATUS[combo_statuses[n]],
+            fs=SYNC_STATUS[sync_statuses[n]],
+            dx_score=dx_scores[n],
+            dx_rating=dx_ratings[n],
+            play_count=play_counts[n],
+            rate=rates[n],
+            type=song_types[n],
+        )
+        for n in range(len(song_ids))
+    ]
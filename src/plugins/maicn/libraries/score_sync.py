@@ -0,0 +1,204 @@
+"""成绩增量上传
+
+记录每个舞萌账号最近一次上传到各查分器的成绩，更新时只上传新增或变化的谱面成绩。
+街机返回的是每个谱面的最佳成绩，与快照不同即说明成绩有所提升。
+快照以查分器账号（水鱼用户名、落雪好友码）的摘要区分，不保存账号本身。
+"""
+
+import hashlib
+
+from maimai_py import PlayerIdentifier
+from maimai_py.models import Score as MaimaiPyScore
+from nonebot import logger, require
+from sqlalchemy import delete, select
+
+require("nonebot_plugin_orm")
+
+from nonebot_plugin_orm import get_session
+
+from src.plugins.maicn.libraries.maimai_cn import (
+    divingfish_provider,
+    lxns_provider,
+    maimai_py_client,
+)
+from src.plugins.maicn.models import UploadedScore
+
+# (歌曲ID, 谱面类型, 难度序号)
+ScoreKey = tuple[int, str, int]
+# (达成率（万分之一）, DX分数, 全连评价, 同步评价)
+ScoreValues = tuple[int, int, str | None, str | None]
+
+
+def _account_key(account: str) -> str:
+    return hashlib.sha256(str(account).encode()).hexdigest()
+
+
+def _score_key(score: MaimaiPyScore) -> ScoreKey:
+    return score.id, score.type.value, score.level_index.value
+
+
+def _score_values(score: MaimaiPyScore) -> ScoreValues:
+    return (
+        round(score.achievements * 10000),
+        score.dx_score,
+        score.fc.name if score.fc is not None else None,
+        score.fs.name if score.fs is not None else None,
+    )
+
+
+def _row_values(row: UploadedScore) -> ScoreValues:
+    return row.achievement, row.dx_score, row.fc, row.fs
+
+
+async def _load_rows(
+    session, mai_uid: int, provider: str, account: str
+) -> dict[ScoreKey, UploadedScore]:
+    result = await session.execute(
+        select(UploadedScore).where(
+            UploadedScore.mai_uid == mai_uid,
+            UploadedScore.provider == provider,
+            UploadedScore.account == account,
+        )
+    )
+    return {
+        (row.song_id, row.song_type, row.level_index): row for row in result.scalars()
+    }
+
+
+async def pending_scores(
+    mai_uid: int,
+    provider: str,
+    account: str,
+    scores: list[MaimaiPyScore],
+    full: bool = False,
+) -> list[MaimaiPyScore]:
+    """筛选出与上次上传相比新增或变化的成绩，全量上传或读取快照失败时返回全部成绩
+
+    Args:
+        account: 查分器账号（水鱼用户名或落雪好友码）
+    """
+    if full:
+        return scores
+    try:
+        async with get_session() as session:
+            rows = await _load_rows(
+                session, int(mai_uid), provider, _account_key(account)
+            )
+    except Exception as e:
+        logger.warning(f"读取成绩上传快照失败，改为全量上传: {e}")
+        return scores
+
+    changed = []
+    for score in scores:
+        row = rows.get(_score_key(score))
+        if row is None or _row_values(row) != _score_values(score):
+            changed.append(score)
+    return changed
+
+
+async def save_uploaded_scores(
+    mai_uid: int,
+    provider: str,
+    account: str,
+    scores: list[MaimaiPyScore],
+    full: bool = False,
+) -> None:
+    """记录已上传的成绩，失败时只记录日志，下次更新会重新上传这些成绩
+
+    Args:
+        account: 查分器账号（水鱼用户名或落雪好友码）
+        scores: 本次上传的成绩
+        full: 是否为全量上传，为True时删除快照中不在本次成绩里的谱面
+    """
+    try:
+        await _save_rows(int(mai_uid), provider, _account_key(account), scores, full)
+    except Exception as e:
+        logger.warning(f"保存成绩上传快照失败: {e}")
+
+
+async def _save_rows(
+    mai_uid: int,
+    provider: str,
+    account: str,
+    scores: list[MaimaiPyScore],
+    full: bool,
+) -> None:
+    async with get_session() as session:
+        rows = await _load_rows(session, mai_uid, provider, account)
+
+        uploaded_keys = set()
+        for score in scores:
+            key = _score_key(score)
+            if key in uploaded_keys:
+                continue
+            uploaded_keys.add(key)
+            achievement, dx_score, fc, fs = _score_values(score)
+            row = rows.get(key)
+            if row is None:
+                session.add(
+                    UploadedScore(
+                        mai_uid=mai_uid,
+                        provider=provider,
+                        account=account,
+                        song_id=key[0],
+                        song_type=key[1],
+                        level_index=key[2],
+                        achievement=achievement,
+                        dx_score=dx_score,
+                        fc=fc,
+                        fs=fs,
+                    )
+                )
+            elif _row_values(row) != (achievement, dx_score, fc, fs):
+                row.achievement = achievement
+                row.dx_score = dx_score
+                row.fc = fc
+                row.fs = fs
+
+        if full:
+            stale_ids = [
+                row.id for key, row in rows.items() if key not in uploaded_keys
+            ]
+            if stale_ids:
+                await session.execute(
+                    delete(UploadedScore).where(UploadedScore.id.in_(stale_ids))
+                )
+
+        await session.commit()
+
+
+async def upload_to_divingfish(
+    mai_uid: int,
+    username: str,
+    password: str,
+    scores: list[MaimaiPyScore],
+    full: bool = False,
+) -> int:
+    """上传成绩到水鱼查分器，只上传新增或提升的成绩，返回上传的成绩数"""
+    pending = await pending_scores(mai_uid, "divingfish", username, scores, full=full)
+    if pending:
+        await maimai_py_client.updates(
+            identifier=PlayerIdentifier(username=username, credentials=password),
+            scores=pending,
+            provider=divingfish_provider,
+        )
+        await save_uploaded_scores(mai_uid, "divingfish", username, pending, full=full)
+    return len(pending)
+
+
+async def upload_to_lxns(
+    mai_uid: int,
+    friend_code: str,
+    scores: list[MaimaiPyScore],
+    full: bool = False,
+) -> int:
+    """上传成绩到落雪查分器，只上传新增或提升的成绩，返回上传的成绩数"""
+    pending = await pending_scores(mai_uid, "lxns", friend_code, scores, full=full)
+    if pending:
+        await maimai_py_client.updates(
+            identifier=PlayerIdentifier(friend_code=friend_code),
+            scores=pending,
+            provider=lxns_provider,
+        )
+        await save_uploaded_scores(mai_uid, "lxns", friend_code, pending, full=full)
+    return len(pending)
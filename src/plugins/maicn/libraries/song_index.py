@@ -0,0 +1,140 @@
+"""歌曲定数索引
+
+将maimai.py的曲目列表整理为以歌曲ID为键的字典，记录每个谱面类型、每个难度的等级、定数与版本，
+并保存为本地快照文件。成绩转换时只查询内存中的字典，不访问网络。
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from maimai_py import SongType
+from maimai_py.models import Song
+from nonebot import get_plugin_config, logger
+
+from src.plugins.maicn.config import Config
+
+config = get_plugin_config(Config)
+
+# 快照文件格式版本，格式变化时旧快照会被忽略
+SNAPSHOT_FORMAT = 1
+
+
+class ChartInfo(NamedTuple):
+    """单个谱面的等级信息"""
+
+    level: str
+    level_value: float
+    version: int
+
+
+class SongInfo(NamedTuple):
+    """歌曲信息，charts的键为谱面类型，值为难度序号到谱面信息的映射"""
+
+    title: str
+    version: int
+    charts: dict[SongType, dict[int, ChartInfo]]
+
+
+class SongIndex:
+    """进程内共享的歌曲定数索引"""
+
+    def __init__(self, snapshot_path: Path):
+        self.snapshot_path = snapshot_path
+        self.updated_at = 0.0
+        self._songs: dict[int, SongInfo] = {}
+
+    def __len__(self) -> int:
+        return len(self._songs)
+
+    def get(self, song_id: int) -> SongInfo | None:
+        return self._songs.get(song_id)
+
+    def get_chart(
+        self, song_id: int, song_type: SongType, level_index: int
+    ) -> ChartInfo | None:
+        """查询谱面信息，宴会场谱面不区分难度"""
+        song = self._songs.get(song_id)
+        if song is None:
+            return None
+        charts = song.charts.get(song_type)
+        if not charts:
+            return None
+        if song_type == SongType.UTAGE:
+            return next(iter(charts.values()))
+        return charts.get(level_index)
+
+    def update(self, songs: list[Song], updated_at: float | None = None) -> None:
+        """用maimai.py的曲目列表替换索引内容"""
+        index: dict[int, SongInfo] = {}
+        for song in songs:
+            charts: dict[SongType, dict[int, ChartInfo]] = {}
+            for difficulty in song.get_difficulties():
+                type_charts = charts.setdefault(difficulty.type, {})
+                type_charts[difficulty.level_index.value] = ChartInfo(
+                    difficulty.level, difficulty.level_value, difficulty.version
+                )
+            index[song.id] = SongInfo(song.title, song.version, charts)
+
+        # 整体替换，查询方不会看到更新到一半的索引
+        self._songs = index
+        self.updated_at = updated_at or time.time()
+
+    def load_snapshot(self) -> bool:
+        """从快照文件加载索引，文件不存在或格式不符时返回False"""
+        try:
+            data = json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取歌曲索引快照失败: {e}")
+            return False
+        if data.get("format") != SNAPSHOT_FORMAT:
+            return False
+
+        index: dict[int, SongInfo] = {}
+        for song_id, (title, version, charts) in data["songs"].items():
+            index[int(song_id)] = SongInfo(
+                title,
+                version,
+                {
+                    SongType(song_type): {
+                        int(level_index): ChartInfo(*chart)
+                        for level_index, chart in type_charts.items()
+                    }
+                    for song_type, type_charts in charts.items()
+                },
+            )
+        self._songs = index
+        self.updated_at = data["updated_at"]
+        return True
+
+    def save_snapshot(self) -> None:
+        """将索引写入快照文件"""
+        data = {
+            "format": SNAPSHOT_FORMAT,
+            "updated_at": self.updated_at,
+            "songs": {
+                song_id: [
+                    song.title,
+                    song.version,
+                    {
+                        song_type.value: {
+                            level_index: list(chart)
+                            for level_index, chart in type_charts.items()
+                        }
+                        for song_type, type_charts in song.charts.items()
+                    },
+                ]
+                for song_id, song in self._songs.items()
+            },
+        }
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        # 先写临时文件再替换，避免读到写了一半的快照
+        tmp_path = self.snapshot_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        tmp_path.replace(self.snapshot_path)
+
+
+song_index = SongIndex(Path(config.maicn_data_path) / "song_index.json")
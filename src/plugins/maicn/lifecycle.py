@@ -0,0 +1,140 @@
+"""插件生命周期钩子
+
+在bot启动时预加载资源，避免首个请求承担初始化开销。
+"""
+
+import asyncio
+import time
+from pathlib import Path
+
+from nonebot import get_driver, get_plugin_config, logger
+
+from src.plugins.maicn.config import Config
+from src.plugins.maicn.libraries import (
+    arcade_client,
+    asset_manifest,
+    b50_render_pool,
+    b50_image_store,
+    b50_result_cache,
+    get_b50_generator,
+    refresh_song_index,
+    reload_b50_assets,
+    song_index,
+)
+from src.plugins.maicn.libraries.auto_sync import auto_sync_scheduler
+
+config = get_plugin_config(Config)
+driver = get_driver()
+
+# 持有后台任务的引用，防止被垃圾回收
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _run_in_background(coro) -> None:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+# 通知资源目录监视任务退出
+_asset_watch_stop = asyncio.Event()
+
+
+async def _watch_assets():
+    """资源目录变化时重新扫描清单并重新加载资源"""
+    try:
+        from watchfiles import awatch
+    except ImportError:
+        logger.warning("未安装watchfiles，资源目录变化需要手动执行 /maicn admin reload")
+        return
+
+    resized_dir = get_b50_generator().MAI_COVER_RESIZED_PATH.resolve()
+
+    def watch_filter(_change, path: str) -> bool:
+        # 预缩放封面由插件自身写入，并已登记到清单中
+        return not Path(path).resolve().is_relative_to(resized_dir)
+
+    async for changes in awatch(
+        asset_manifest.root, watch_filter=watch_filter, stop_event=_asset_watch_stop
+    ):
+        logger.info(f"检测到 {len(changes)} 个资源文件变化，正在重新加载")
+        try:
+            await reload_b50_assets()
+        except Exception as e:
+            logger.exception(f"重新加载B50图片资源失败: {e}")
+
+
+async def _cleanup_image_store():
+    """定期删除过期的图片文件"""
+    while True:
+        removed = await asyncio.to_thread(b50_image_store.cleanup)
+        if removed:
+            logger.info(f"已清理 {removed} 张过期的B50图片")
+        await asyncio.sleep(max(60, b50_image_store.ttl / 2))
+
+
+async def _refresh_song_index_periodically():
+    """按配置的间隔更新歌曲定数索引，没有快照时立即获取"""
+    interval = config.maicn_song_index_refresh_hours * 3600
+    while True:
+        if not song_index or (
+            interval > 0 and time.time() - song_index.updated_at >= interval
+        ):
+            try:
+                count = await refresh_song_index()
+                logger.info(f"歌曲定数索引已更新，共 {count} 首歌曲")
+            except Exception as e:
+                logger.warning(f"更新歌曲定数索引失败，10分钟后重试: {e}")
+                await asyncio.sleep(600)
+                continue
+
+        if interval <= 0:
+            return
+        await asyncio.sleep(max(60, song_index.updated_at + interval - time.time()))
+
+
+async def _prebuild_covers():
+    generator = get_b50_generator()
+    built = await asyncio.to_thread(generator.build_resized_covers)
+    logger.info(f"预缩放封面完成，新生成 {built} 张")
+
+
+@driver.on_startup
+async def _():
+    await asyncio.to_thread(get_b50_generator)
+    await asyncio.to_thread(get_b50_generator, True)
+
+    if await asyncio.to_thread(song_index.load_snapshot):
+        logger.success(f"歌曲定数索引快照加载完成，共 {len(song_index)} 首歌曲")
+    _run_in_background(_refresh_song_index_periodically())
+    logger.success("B50图片资源预加载完成")
+
+    arcade_client.open()
+
+    # 工作进程在各自的初始化函数中加载资源
+    b50_render_pool.start()
+
+    # 已有封面打包文件时不再需要预缩放目录
+    if config.b50_cover_prebuild and get_b50_generator().cover_archive is None:
+        _run_in_background(_prebuild_covers())
+
+    if b50_result_cache is not None:
+        _run_in_background(asyncio.to_thread(b50_result_cache.cleanup))
+
+    if b50_image_store is not None:
+        _run_in_background(_cleanup_image_store())
+
+    if config.b50_asset_watch and asset_manifest.root.is_dir():
+        _run_in_background(_watch_assets())
+
+    if config.maicn_auto_sync_enabled:
+        _run_in_background(auto_sync_scheduler.run_forever())
+
+
+@driver.on_shutdown
+async def _():
+    _asset_watch_stop.set()
+    for task in list(_background_tasks):
+        task.cancel()
+    b50_render_pool.shutdown()
+    await arcade_client.aclose()
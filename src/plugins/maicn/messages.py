@@ -18,6 +18,11 @@ class Messages:
     SUCCESS_PROFILE_SWITCHED = "✅ 档案切换成功"
     SUCCESS_LXNS_PROFILE_CREATED = "✅ 落雪档案创建成功"
     SUCCESS_SCORES_UPDATED = "✅ 成绩数据更新完成"
+    SUCCESS_ASSETS_RELOADED = "✅ B50图片资源已重新加载"
+    SUCCESS_AUTO_SYNC_ENABLED = (
+        "✅ 已开启自动更新，机器人会在低峰时段自动更新您绑定的查分器"
+    )
+    SUCCESS_AUTO_SYNC_DISABLED = "✅ 已关闭自动更新"
 
     # 错误消息
     ERROR_QR_EXPIRED = "❌ 二维码已过期，请重新获取"
@@ -45,17 +50,25 @@ class Messages:
     ERROR_LXNS_NOT_FOUND = "❌ 落雪查分器中未找到对应档案"
     ERROR_SCORES_UPDATE_FAILED = "❌ 成绩更新失败，请稍后重试"
     ERROR_B50_GENERATION_FAILED = "❌ B50图片生成失败，请稍后重试"
+    ERROR_B50_BUSY = "⏳ 当前生成B50的人太多了，请稍后再试"
+    ERROR_B50_TIMEOUT = "❌ B50图片生成超时，请稍后重试"
     ERROR_NO_SCORES_DATA = "❌ 无法获取成绩数据，请检查绑定信息"
+    ERROR_ASSETS_RELOAD_FAILED = "❌ B50图片资源重新加载失败，请检查日志"
+    ERROR_ENCODER_REPORT_FAILED = "❌ 生成编码对比报告失败，请检查日志"
+    ERROR_SONG_INDEX_REFRESH_FAILED = "❌ 歌曲定数索引更新失败，请检查日志"
+    ERROR_AUTO_SYNC_FAILED = "❌ 自动更新设置失败，请稍后重试"
 
     # 提示消息
     HINT_NO_MAIMAI_BIND = "💡 您还没有绑定maimai账号，请先使用绑定命令"
     HINT_NO_QUERY_BIND = "💡 您还没有绑定查分器，请先绑定查分器"
     HINT_NO_LXNS_BIND = "💡 当前档案未绑定落雪查分器，请先绑定"
+    HINT_COMMAND_IN_PROGRESS = "💡 您的上一条同类命令仍在处理中，请稍候"
     HINT_NO_DIVINGFISH_BIND = "💡 您还没有绑定水鱼查分器，请先绑定"
     HINT_NO_SHUIYU_BIND = "💡 您还没有绑定水鱼查分器，请先使用绑定命令"
     HINT_NO_UPDATE_SOURCE = "💡 没有可更新的数据源，请检查绑定信息"
     HINT_LXNS_PROFILE_EXISTS = "💡 该好友码已存在落雪档案，无需重复创建"
     HINT_NO_BIND = "💡 您还没有绑定任何查分器，请先绑定查分器"
+    HINT_AUTO_SYNC_DISABLED = "💡 机器人未开启自动更新功能，设置会在开启后生效"
 
     @staticmethod
     def format_current_profile(username: str, rating: int, others_info: str) -> str:
@@ -115,9 +128,110 @@ class Messages:
         return f"✅ 创建落雪档案成功\n{player_info}"
 
     @staticmethod
-    def format_score_update_success(name: str) -> str:
-        """格式化成绩更新成功信息"""
-        return f"✅ 已成功更新{name}的数据"
+    def format_song_index_refreshed(count: int) -> str:
+        """格式化歌曲索引更新成功信息"""
+        return f"✅ 歌曲定数索引已更新，共 {count} 首歌曲"
+
+    @staticmethod
+    def format_score_update_success(uploaded: Dict[str, int]) -> str:
+        """格式化成绩更新成功信息，uploaded为各查分器本次上传的成绩数"""
+        lines = [f"✅ 已成功更新{','.join(uploaded)}的数据"]
+        for name, count in uploaded.items():
+            if count:
+                lines.append(f"• {name}: 上传 {count} 条新增或提升的成绩")
+            else:
+                lines.append(f"• {name}: 成绩没有变化")
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_cache_stats(stats: Dict[str, Dict[str, Any]]) -> str:
+        """格式化缓存统计信息"""
+        lines = ["📊 缓存统计", "━━━━━━━━━━━━━━━━"]
+        for name, item in stats.items():
+            total = item.get("hits", 0) + item.get("misses", 0)
+            hit_rate = item.get("hits", 0) / total * 100 if total else 0
+            size = str(item.get("size", 0))
+            if "maxsize" in item:
+                size += f"/{item['maxsize']}"
+            lines.append(
+                f"• {name}: {size} "
+                f"命中 {item.get('hits', 0)} 未命中 {item.get('misses', 0)} "
+                f"({hit_rate:.1f}%)"
+            )
+            extras = {
+                key: value
+                for key, value in item.items()
+                if key not in ("size", "maxsize", "hits", "misses")
+            }
+            if extras:
+                lines.append(
+                    "    " + " ".join(f"{key}={value}" for key, value in extras.items())
+                )
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_connection_stats(stats: Dict[str, int]) -> str:
+        """格式化街机接口连接统计信息"""
+        requests = stats["requests"]
+        reuse_rate = stats["reused"] / requests * 100 if requests else 0
+        return (
+            f"🔌 街机连接: 请求 {requests} 新建连接 {stats['connections']} "
+            f"复用 {stats['reused']} ({reuse_rate:.1f}%) 错误 {stats['errors']}"
+        )
+
+    @staticmethod
+    def format_governor_stats(stats: Dict[str, Dict[str, float]]) -> str:
+        """格式化街机接口限流统计信息"""
+        lines = ["🚦 街机限流"]
+        for lane, item in stats.items():
+            lines.append(
+                f"• {lane}: 排队 {item['queued']} 进行中 {item['in_flight']} "
+                f"调用 {item['calls']} 平均等待 {item['wait_avg_ms']:.0f}ms "
+                f"最长等待 {item['wait_max_ms']:.0f}ms"
+            )
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_auto_sync_stats(stats: Dict[str, Any]) -> str:
+        """格式化成绩自动同步统计信息"""
+        run = stats["run"]
+        if run is None:
+            status = "等待同步时段" if stats["running"] else "未启动"
+            return f"🔄 自动同步: {status}，尚未运行"
+
+        if stats["running"]:
+            status = "运行中"
+        else:
+            status = "已完成" if run["completed"] else "已中断，下一时段继续"
+        lines = [
+            f"🔄 自动同步: {status}",
+            f"• 用户 {run['users']} 成功 {run['succeeded']} 失败 {run['failed']} "
+            f"跳过 {run['skipped']}",
+            f"• 上传 {run['uploaded']} 条成绩 耗时 {run['elapsed']:.0f}s "
+            f"({run['users_per_minute']:.1f} 人/分钟)",
+        ]
+        if stats["backoff"]:
+            lines.append(f"• 退避中: {stats['backoff']:.0f}s")
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_encoder_report(report: list[Dict[str, Any]]) -> str:
+        """格式化输出编码对比报告"""
+        lines = ["🖼️ B50输出编码对比", "━━━━━━━━━━━━━━━━"]
+        for item in report:
+            options = item["options"]
+            if options.format == "png":
+                param = f"level={options.png_compress_level}"
+            else:
+                param = f"quality={options.quality}"
+            if options.flatten_alpha:
+                param += " 去透明"
+            current_mark = " (当前)" if item["current"] else ""
+            lines.append(
+                f"• {options.format} {param}: {item['size'] / 1024:.0f}KB "
+                f"{item['elapsed_ms']:.0f}ms{current_mark}"
+            )
+        return "\n".join(lines)
 
     @staticmethod
     def _format_bind_info(others_info: str) -> str:
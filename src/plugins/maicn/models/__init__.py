@@ -0,0 +1,10 @@
+"""数据模型模块"""
+
+from nonebot import require
+
+require("nonebot_plugin_orm")
+
+from .auto_sync_user import AutoSyncUser
+from .uploaded_score import UploadedScore
+
+__all__ = ["AutoSyncUser", "UploadedScore"]
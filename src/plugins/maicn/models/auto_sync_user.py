@@ -0,0 +1,33 @@
+"""自动同步用户模型定义"""
+
+from datetime import datetime
+from typing import Optional
+
+from nonebot_plugin_orm import Model
+from sqlalchemy import Boolean, DateTime, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+
+class AutoSyncUser(Model):
+    """开启了成绩自动同步的用户"""
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    qq: Mapped[str] = mapped_column(String(64), nullable=False, comment="用户QQ号")
+    remi_uuid: Mapped[str] = mapped_column(
+        String(64), nullable=False, comment="Remi服务用户UUID"
+    )
+    enabled: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, default=True, comment="是否开启自动同步"
+    )
+    last_synced_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, nullable=True, comment="最后成功同步时间"
+    )
+    consecutive_failures: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, comment="连续同步失败次数"
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, server_default=func.now()
+    )
+
+    __table_args__ = (Index("uk_auto_sync_user_qq", "qq", unique=True),)
@@ -0,0 +1,57 @@
+"""已上传成绩快照模型定义"""
+
+from datetime import datetime
+from typing import Optional
+
+from nonebot_plugin_orm import Model
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+
+class UploadedScore(Model):
+    """最近一次上传到查分器的成绩，用于计算增量上传"""
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    mai_uid: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, comment="舞萌用户ID"
+    )
+    provider: Mapped[str] = mapped_column(
+        String(16), nullable=False, comment="查分器（divingfish / lxns）"
+    )
+    account: Mapped[str] = mapped_column(
+        String(64), nullable=False, comment="查分器账号的SHA-256"
+    )
+    song_id: Mapped[int] = mapped_column(Integer, nullable=False, comment="歌曲ID")
+    song_type: Mapped[str] = mapped_column(
+        String(16), nullable=False, comment="谱面类型"
+    )
+    level_index: Mapped[int] = mapped_column(
+        Integer, nullable=False, comment="难度序号"
+    )
+    achievement: Mapped[int] = mapped_column(
+        Integer, nullable=False, comment="达成率（万分之一）"
+    )
+    dx_score: Mapped[int] = mapped_column(Integer, nullable=False, comment="DX分数")
+    fc: Mapped[Optional[str]] = mapped_column(
+        String(8), nullable=True, comment="全连评价"
+    )
+    fs: Mapped[Optional[str]] = mapped_column(
+        String(8), nullable=True, comment="同步评价"
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, server_default=func.now(), onupdate=func.now()
+    )
+
+    __table_args__ = (
+        Index(
+            "uk_uploaded_score_chart",
+            "mai_uid",
+            "provider",
+            "account",
+            "song_id",
+            "song_type",
+            "level_index",
+            unique=True,
+        ),
+    )
@@ -0,0 +1 @@
+"""maicn插件测试模块"""
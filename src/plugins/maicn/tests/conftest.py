@@ -0,0 +1,15 @@
+import pytest_asyncio
+from nonebot_plugin_orm import Model, get_session
+from sqlalchemy import delete
+
+from ..models import UploadedScore
+
+
+@pytest_asyncio.fixture
+async def db():
+    """按模型创建数据库表，并清空成绩上传快照"""
+    async with get_session() as session:
+        connection = await session.connection()
+        await connection.run_sync(Model.metadata.create_all)
+        await session.execute(delete(UploadedScore))
+        await session.commit()
@@ -0,0 +1,141 @@
+"""街机接口限流器测试"""
+
+import asyncio
+import time
+
+import pytest
+
+from ..libraries.maimai_cn import ArcadeGovernor, ArcadeLane
+
+
+async def hold(
+    governor: ArcadeGovernor,
+    lane: ArcadeLane,
+    name: str,
+    order: list[str],
+    release: asyncio.Event,
+):
+    """获取名额后记录顺序，并一直占用到release被设置"""
+    async with governor.slot(lane):
+        order.append(name)
+        await release.wait()
+
+
+async def settle():
+    """让等待中的任务运行到下一个等待点"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestArcadeGovernor:
+    """测试优先级、并发上限与令牌桶"""
+
+    @pytest.mark.asyncio
+    async def test_priority_under_contention(self):
+        """名额空出时按通道优先级分配，同一通道内先到先得"""
+        governor = ArcadeGovernor(rate=0, burst=1, max_in_flight=1)
+        order: list[str] = []
+        release = asyncio.Event()
+
+        first = asyncio.create_task(
+            hold(governor, ArcadeLane.BULK, "first", order, release)
+        )
+        await settle()
+        waiters = [
+            asyncio.create_task(hold(governor, lane, name, order, release))
+            for lane, name in [
+                (ArcadeLane.BACKGROUND, "background"),
+                (ArcadeLane.BULK, "bulk"),
+                (ArcadeLane.INTERACTIVE, "interactive-1"),
+                (ArcadeLane.INTERACTIVE, "interactive-2"),
+            ]
+        ]
+        await settle()
+        assert order == ["first"]
+        assert governor.stats()["interactive"]["queued"] == 2
+
+        release.set()
+        await asyncio.gather(first, *waiters)
+        assert order == [
+            "first",
+            "interactive-1",
+            "interactive-2",
+            "bulk",
+            "background",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_lane_limit_reserves_capacity(self):
+        """批量通道达到单独上限后，剩余名额留给轻量请求"""
+        governor = ArcadeGovernor(
+            rate=0,
+            burst=1,
+            max_in_flight=2,
+            lane_limits={ArcadeLane.BULK: 1},
+        )
+        order: list[str] = []
+        release = asyncio.Event()
+
+        tasks = [
+            asyncio.create_task(hold(governor, ArcadeLane.BULK, name, order, release))
+            for name in ("bulk-1", "bulk-2")
+        ]
+        await settle()
+        assert order == ["bulk-1"]
+
+        tasks.append(
+            asyncio.create_task(
+                hold(governor, ArcadeLane.INTERACTIVE, "interactive", order, release)
+            )
+        )
+        await settle()
+        assert order == ["bulk-1", "interactive"]
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert order == ["bulk-1", "interactive", "bulk-2"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_skipped(self):
+        """等待中被取消的调用不占用名额"""
+        governor = ArcadeGovernor(rate=0, burst=1, max_in_flight=1)
+        order: list[str] = []
+        release = asyncio.Event()
+
+        first = asyncio.create_task(
+            hold(governor, ArcadeLane.BULK, "first", order, release)
+        )
+        await settle()
+        cancelled = asyncio.create_task(
+            hold(governor, ArcadeLane.INTERACTIVE, "cancelled", order, release)
+        )
+        waiting = asyncio.create_task(
+            hold(governor, ArcadeLane.BULK, "waiting", order, release)
+        )
+        await settle()
+        cancelled.cancel()
+        await settle()
+
+        release.set()
+        await asyncio.gather(first, waiting)
+        assert order == ["first", "waiting"]
+        assert governor.stats()["interactive"]["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_token_bucket_rate(self):
+        """突发额度用完后按速率放行"""
+        governor = ArcadeGovernor(rate=20, burst=2, max_in_flight=10)
+
+        async def call():
+            async with governor.slot(ArcadeLane.INTERACTIVE):
+                pass
+
+        start = time.monotonic()
+        await asyncio.gather(*(call() for _ in range(4)))
+        elapsed = time.monotonic() - start
+
+        # 前2次使用突发额度，后2次各需等待1/20秒
+        assert elapsed >= 0.09
+        stats = governor.stats()["interactive"]
+        assert stats["calls"] == 4
+        assert stats["in_flight"] == 0
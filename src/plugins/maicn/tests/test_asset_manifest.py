@@ -0,0 +1,39 @@
+"""静态资源清单测试"""
+
+from ..libraries.asset_manifest import AssetManifest
+
+
+class TestAssetManifest:
+    """测试清单的扫描与登记"""
+
+    def test_add_many(self, tmp_path):
+        """批量登记多个目录中的新文件，资源目录之外的路径被忽略"""
+        (tmp_path / "cover").mkdir()
+        (tmp_path / "cover" / "1.png").write_bytes(b"1")
+        manifest = AssetManifest(tmp_path)
+        assert manifest.refresh() == 1
+
+        paths = [tmp_path / "cover" / "2.png", tmp_path / "font.ttf"]
+        for path in paths:
+            path.write_bytes(b"new")
+        outside = tmp_path.parent / "outside.png"
+        manifest.add_many([*paths, outside])
+
+        assert manifest.exists(tmp_path / "cover" / "1.png")
+        for path in paths:
+            assert manifest.exists(path)
+            assert manifest.mtime(path) == path.stat().st_mtime
+        assert "outside.png" not in manifest._files.get("..", {})
+
+    def test_readers_keep_snapshot(self, tmp_path):
+        """登记时整体替换清单，不修改读取方已取得的清单"""
+        manifest = AssetManifest(tmp_path)
+        manifest.refresh()
+        before = manifest._files
+
+        path = tmp_path / "1.png"
+        path.write_bytes(b"1")
+        manifest.add(path)
+
+        assert before == {".": {}}
+        assert manifest.exists(path)
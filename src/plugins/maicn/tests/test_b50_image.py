@@ -0,0 +1,138 @@
+"""B50图片增量重绘测试"""
+
+from io import BytesIO
+
+import pytest
+from maimai_py import SongType
+from PIL import Image
+from pydantic import ValidationError
+
+from ..config import Config
+from ..libraries.b50_image import B50ImageGenerator, EncodeOptions
+
+PLAYER = {"name": "player", "rating": 15000}
+
+
+def make_card(index: int, achievement: float = 100.5, rating: int = 300) -> dict:
+    return {
+        "song_id": 100 + index,
+        "title": f"Song {index}",
+        "level_index": index % 5,
+        "level": 13.0,
+        "achievement": achievement,
+        "rating": rating,
+        "combo_status": None,
+        "sync_status": None,
+        "song_type": SongType.DX,
+    }
+
+
+def make_generator() -> B50ImageGenerator:
+    return B50ImageGenerator(
+        canvas_store_size=4, encode_options=EncodeOptions(format="png")
+    )
+
+
+def pixels(data: bytes) -> bytes:
+    return Image.open(BytesIO(data)).tobytes()
+
+
+def full_render(player: dict, b35: list[dict], b15: list[dict]) -> bytes:
+    """不使用画布缓存完整渲染"""
+    return pixels(make_generator().render_b50_image(player, b35, b15))
+
+
+class TestIncrementalRender:
+    """测试复用上一次画布时的输出与完整渲染一致"""
+
+    @pytest.fixture
+    def generator(self, monkeypatch):
+        generator = make_generator()
+        assert generator.supports_incremental
+        generator.drawn_cards = 0
+        draw_score_card = generator._draw_score_card
+
+        def counting_draw(*args, **kwargs):
+            generator.drawn_cards += 1
+            return draw_score_card(*args, **kwargs)
+
+        monkeypatch.setattr(generator, "_draw_score_card", counting_draw)
+        return generator
+
+    def test_changed_card_redrawn(self, generator):
+        """只重绘变化的卡位"""
+        b35 = [make_card(i) for i in range(35)]
+        b15 = [make_card(i + 35) for i in range(15)]
+        generator.render_b50_image(PLAYER, b35, b15, player_key="p")
+        assert generator.drawn_cards == 50
+
+        b35[7] = make_card(7, achievement=100.8)
+        generator.drawn_cards = 0
+        output = generator.render_b50_image(PLAYER, b35, b15, player_key="p")
+        assert generator.drawn_cards == 1
+        assert generator.cache_stats()["canvas"]["hits"] == 1
+        assert pixels(output) == full_render(PLAYER, b35, b15)
+
+    def test_unchanged_render_reuses_canvas(self, generator):
+        """输入不变时不重绘任何卡位"""
+        b35 = [make_card(i) for i in range(10)]
+        first = generator.render_b50_image(PLAYER, b35, [], player_key="p")
+        generator.drawn_cards = 0
+        second = generator.render_b50_image(PLAYER, b35, [], player_key="p")
+        assert generator.drawn_cards == 0
+        assert pixels(first) == pixels(second)
+
+    def test_removed_cards_cleared(self, generator):
+        """成绩数减少时多出的卡位恢复为背景"""
+        b35 = [make_card(i) for i in range(12)]
+        b15 = [make_card(i + 35) for i in range(5)]
+        generator.render_b50_image(PLAYER, b35, b15, player_key="p")
+
+        output = generator.render_b50_image(PLAYER, b35[:8], b15[:2], player_key="p")
+        assert pixels(output) == full_render(PLAYER, b35[:8], b15[:2])
+
+    def test_header_redrawn(self, generator):
+        """玩家名称或Rating变化时重绘头部"""
+        b35 = [make_card(i) for i in range(5)]
+        generator.render_b50_image(PLAYER, b35, [], player_key="p")
+
+        player = {"name": "renamed", "rating": 15100}
+        output = generator.render_b50_image(player, b35, [], player_key="p")
+        assert pixels(output) == full_render(player, b35, [])
+
+    def test_players_separated(self, generator):
+        """不同玩家的画布互不影响"""
+        a = [make_card(i) for i in range(5)]
+        b = [make_card(i, achievement=99.0) for i in range(5)]
+        generator.render_b50_image(PLAYER, a, [], player_key="a")
+        generator.render_b50_image(PLAYER, b, [], player_key="b")
+
+        output = generator.render_b50_image(PLAYER, a, [], player_key="a")
+        assert pixels(output) == full_render(PLAYER, a, [])
+
+
+class TestEncodeConfig:
+    """测试输出编码配置的校验"""
+
+    def make_config(self, **values) -> Config:
+        required = {
+            name: field.annotation()
+            for name, field in Config.model_fields.items()
+            if field.is_required()
+        }
+        return Config(**required, **values)
+
+    def test_defaults_keep_alpha(self):
+        """默认输出PNG并保留透明通道"""
+        config = self.make_config()
+        assert config.b50_image_format == "png"
+        assert config.b50_flatten_alpha is False
+
+    def test_format_case_insensitive(self):
+        """编码名称不区分大小写"""
+        assert self.make_config(b50_image_format="WebP").b50_image_format == "webp"
+
+    def test_unknown_format_rejected(self):
+        """未知的编码名称在加载配置时报错"""
+        with pytest.raises(ValidationError):
+            self.make_config(b50_image_format="jpg")
@@ -0,0 +1,271 @@
+"""缓存工具测试"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from ..libraries import maimai_cn
+from ..libraries.cache import AsyncTTLCache, TTLBytesCache
+
+
+class Loader:
+    """记录调用次数的加载函数，release被设置前不返回"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        return {"call": self.calls}
+
+
+class TestAsyncTTLCache:
+    """测试TTL缓存与并发请求合并"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_coalesced(self):
+        """同一个键的并发请求只调用一次加载函数"""
+        cache: AsyncTTLCache[int, dict] = AsyncTTLCache(ttl=60, maxsize=10)
+        loader = Loader()
+        loader.release.clear()
+
+        tasks = [asyncio.create_task(cache.get_or_load(1, loader)) for _ in range(5)]
+        await asyncio.sleep(0)
+        loader.release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert loader.calls == 1
+        assert all(result is results[0] for result in results)
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_cached_until_expired(self):
+        """TTL内命中缓存，过期后重新加载"""
+        cache: AsyncTTLCache[int, dict] = AsyncTTLCache(ttl=0.05, maxsize=10)
+        loader = Loader()
+
+        assert await cache.get_or_load(1, loader) == {"call": 1}
+        assert await cache.get_or_load(1, loader) == {"call": 1}
+        await asyncio.sleep(0.06)
+        assert await cache.get_or_load(1, loader) == {"call": 2}
+        assert cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_zero_ttl_only_coalesces(self):
+        """TTL为0时不保存结果"""
+        cache: AsyncTTLCache[int, dict] = AsyncTTLCache(ttl=0, maxsize=10)
+        loader = Loader()
+
+        await cache.get_or_load(1, loader)
+        await cache.get_or_load(1, loader)
+        assert loader.calls == 2
+        assert len(cache._data) == 0
+
+    @pytest.mark.asyncio
+    async def test_failure_not_cached(self):
+        """加载失败时所有等待者收到异常，下次请求重新加载"""
+        cache: AsyncTTLCache[int, dict] = AsyncTTLCache(ttl=60, maxsize=10)
+        calls = 0
+
+        async def failing():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0)
+            raise RuntimeError("接口错误")
+
+        results = await asyncio.gather(
+            cache.get_or_load(1, failing),
+            cache.get_or_load(1, failing),
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, RuntimeError) for result in results)
+        with pytest.raises(RuntimeError):
+            await cache.get_or_load(1, failing)
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_load(self):
+        """某个调用方被取消时其他等待者仍能得到结果"""
+        cache: AsyncTTLCache[int, dict] = AsyncTTLCache(ttl=60, maxsize=10)
+        loader = Loader()
+        loader.release.clear()
+
+        cancelled = asyncio.create_task(cache.get_or_load(1, loader))
+        waiting = asyncio.create_task(cache.get_or_load(1, loader))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        loader.release.set()
+
+        assert await waiting == {"call": 1}
+        assert loader.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_during_load(self):
+        """加载期间被移除的键不写入旧结果，之后的请求重新加载"""
+        cache: AsyncTTLCache[int, dict] = AsyncTTLCache(ttl=60, maxsize=10)
+        loader = Loader()
+        loader.release.clear()
+
+        task = asyncio.create_task(cache.get_or_load(1, loader))
+        await asyncio.sleep(0)
+        cache.invalidate(1)
+        loader.release.set()
+        assert await task == {"call": 1}
+
+        assert await cache.get_or_load(1, loader) == {"call": 2}
+
+    @pytest.mark.asyncio
+    async def test_maxsize_evicts_oldest(self):
+        """超出容量时淘汰最久未使用的键"""
+        cache: AsyncTTLCache[int, int] = AsyncTTLCache(ttl=60, maxsize=2)
+
+        async def value(v: int):
+            return v
+
+        for key in (1, 2):
+            await cache.get_or_load(key, lambda key=key: value(key))
+        await cache.get_or_load(1, lambda: value(-1))
+        await cache.get_or_load(3, lambda: value(3))
+
+        assert 1 in cache._data
+        assert 2 not in cache._data
+        assert 3 in cache._data
+
+
+class TestPreviewInfoCache:
+    """测试玩家预览信息缓存"""
+
+    @pytest.fixture(autouse=True)
+    def fetch(self, monkeypatch):
+        maimai_cn.preview_info_cache.clear()
+        calls: list[int] = []
+
+        async def fake_fetch(user_id: int):
+            calls.append(user_id)
+            return {"userName": f"player{len(calls)}"}
+
+        monkeypatch.setattr(maimai_cn, "_fetch_maimai_user_preview_info", fake_fetch)
+        yield calls
+        maimai_cn.preview_info_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_cached_by_user_id(self, fetch):
+        """同一玩家的预览信息只请求一次，用户ID的字符串形式视为同一个键"""
+        first = await maimai_cn.get_maimai_user_preview_info(1)
+        second = await maimai_cn.get_maimai_user_preview_info("1")
+        assert first == second
+        assert fetch == [1]
+
+    @pytest.mark.asyncio
+    async def test_invalidated_after_update(self, fetch):
+        """更新成绩或绑定账号后移除缓存，下次请求获取新数据"""
+        assert await maimai_cn.get_maimai_user_preview_info(1) == {
+            "userName": "player1"
+        }
+        maimai_cn.invalidate_maimai_user_preview_info("1")
+        assert await maimai_cn.get_maimai_user_preview_info(1) == {
+            "userName": "player2"
+        }
+        assert fetch == [1, 1]
+
+
+class TestTTLBytesCache:
+    """测试两级字节缓存的过期、淘汰与磁盘用量统计"""
+
+    def test_memory_and_disk_hits(self, tmp_path):
+        """内存未命中时从磁盘读取，并重新放入内存"""
+        cache = TTLBytesCache(
+            tmp_path, ttl=60, memory_max_bytes=100, disk_max_bytes=100
+        )
+        cache.put("a", b"x" * 10)
+        assert cache.get("a") == b"x" * 10
+
+        restarted = TTLBytesCache(
+            tmp_path, ttl=60, memory_max_bytes=100, disk_max_bytes=100
+        )
+        assert restarted.get("a") == b"x" * 10
+        assert restarted.get("a") == b"x" * 10
+        assert restarted.stats()["disk_hits"] == 1
+        assert restarted.stats()["hits"] == 2
+        assert restarted.get("missing") is None
+        assert restarted.stats()["misses"] == 1
+
+    def test_disk_hit_keeps_expiry(self, tmp_path):
+        """从磁盘读回内存的条目沿用磁盘文件的过期时间，不重新计算TTL"""
+        cache = TTLBytesCache(
+            tmp_path, ttl=60, memory_max_bytes=100, disk_max_bytes=100
+        )
+        cache.put("a", b"x" * 10)
+        written = time.time() - 50
+        os.utime(tmp_path / "a.bin", (written, written))
+
+        restarted = TTLBytesCache(
+            tmp_path, ttl=60, memory_max_bytes=100, disk_max_bytes=100
+        )
+        assert restarted.get("a") == b"x" * 10
+        assert restarted._memory["a"][0] == pytest.approx(written + 60)
+        assert list(tmp_path.glob("*.tmp")) == []
+
+    def test_memory_eviction(self):
+        """内存超出字节上限时淘汰最久未使用的条目"""
+        cache = TTLBytesCache(None, ttl=60, memory_max_bytes=25, disk_max_bytes=0)
+        cache.put("a", b"a" * 10)
+        cache.put("b", b"b" * 10)
+        cache.get("a")
+        cache.put("c", b"c" * 10)
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+        assert cache.stats()["memory_bytes"] == 20
+
+    def test_expired_entries(self, tmp_path):
+        """过期的内存与磁盘条目都不再返回，磁盘文件被删除"""
+        cache = TTLBytesCache(
+            tmp_path, ttl=60, memory_max_bytes=100, disk_max_bytes=100
+        )
+        cache.put("a", b"x" * 10)
+        cache.cleanup()
+        expired = time.time() - 120
+        os.utime(tmp_path / "a.bin", (expired, expired))
+        cache._memory["a"] = (expired, b"x" * 10)
+
+        assert cache.get("a") is None
+        assert not (tmp_path / "a.bin").exists()
+        assert cache.stats()["memory_bytes"] == 0
+        assert cache.stats()["disk_bytes"] == 0
+
+    def test_overwrite_keeps_disk_bytes_exact(self, tmp_path):
+        """覆盖已有条目时磁盘用量按新旧大小之差计算"""
+        cache = TTLBytesCache(
+            tmp_path, ttl=60, memory_max_bytes=100, disk_max_bytes=1000
+        )
+        cache.put("a", b"x" * 30)
+        cache.cleanup()
+        for size in (40, 20, 40):
+            cache.put("a", b"x" * size)
+        assert cache.stats()["disk_bytes"] == 40
+
+        cache.put("b", b"y" * 50)
+        assert cache.stats()["disk_bytes"] == 90
+        assert cache.cleanup() == 0
+
+    def test_disk_limit_removes_oldest(self, tmp_path):
+        """磁盘超出字节上限时删除最早写入的文件"""
+        cache = TTLBytesCache(tmp_path, ttl=60, memory_max_bytes=0, disk_max_bytes=25)
+        for i, key in enumerate("abc"):
+            cache.put(key, key.encode() * 10)
+            written = time.time() - 10 + i
+            os.utime(tmp_path / f"{key}.bin", (written, written))
+        cache.cleanup()
+
+        assert not (tmp_path / "a.bin").exists()
+        assert cache.get("b") == b"b" * 10
+        assert cache.get("c") == b"c" * 10
+        assert cache.stats()["disk_bytes"] == 20
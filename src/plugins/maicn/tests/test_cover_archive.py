@@ -0,0 +1,126 @@
+"""封面打包文件测试"""
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from ..libraries.asset_manifest import AssetManifest
+from ..libraries.b50_image import B50ImageGenerator
+from ..libraries.cover_archive import CoverArchive, pack_cover_archive
+
+SIZE = (8, 8)
+
+
+@pytest.fixture
+def archive_path(tmp_path):
+    """打包三张纯色封面，其中一张需要缩放，另有一个不以歌曲ID命名的文件"""
+    source = tmp_path / "cover"
+    source.mkdir()
+    Image.new("RGBA", SIZE, (255, 0, 0, 255)).save(source / "11.png")
+    Image.new("RGB", SIZE, (0, 255, 0)).save(source / "2.png")
+    Image.new("RGBA", (16, 16), (0, 0, 255, 255)).save(source / "10305.png")
+    Image.new("RGBA", SIZE).save(source / "default.png")
+
+    path = tmp_path / "covers.pack"
+    assert pack_cover_archive(source, path, SIZE) == 3
+    return path
+
+
+class TestCoverArchive:
+    """测试封面的打包与读取"""
+
+    def test_lookup(self, archive_path):
+        """按歌曲ID读取封面像素"""
+        archive = CoverArchive(archive_path)
+        assert len(archive) == 3
+        assert archive.size == SIZE
+        assert archive.get(11).getpixel((0, 0)) == (255, 0, 0, 255)
+        assert archive.get(2).getpixel((7, 7)) == (0, 255, 0, 255)
+
+    def test_resized_on_pack(self, archive_path):
+        """尺寸不同的封面在打包时缩放"""
+        cover = CoverArchive(archive_path).get(10305)
+        assert cover.size == SIZE
+        assert cover.getpixel((4, 4)) == (0, 0, 255, 255)
+
+    def test_missing_cover(self, archive_path):
+        """不存在的歌曲ID返回None"""
+        archive = CoverArchive(archive_path)
+        assert 3 not in archive
+        assert archive.get(3) is None
+
+    def test_invalid_file(self, tmp_path):
+        """不是封面打包文件时抛出异常"""
+        path = tmp_path / "invalid.pack"
+        path.write_bytes(b"\0" * 64)
+        with pytest.raises(ValueError):
+            CoverArchive(path)
+
+
+def make_generator(static: Path) -> B50ImageGenerator:
+    """使用指定静态资源目录中封面的生成器"""
+
+    class Generator(B50ImageGenerator):
+        MAI_COVER_PATH = static / "cover"
+        MAI_COVER_RESIZED_PATH = static / "cover_75x75"
+        MAI_COVER_ARCHIVE_PATH = static / "cover_75x75.pack"
+
+    return Generator(manifest=AssetManifest(static))
+
+
+class TestArchiveCover:
+    """测试生成器从打包文件读取封面"""
+
+    @pytest.fixture
+    def static(self, tmp_path):
+        static = tmp_path / "static"
+        (static / "cover").mkdir(parents=True)
+        Image.new("RGBA", (100, 100), (255, 0, 0, 255)).save(static / "cover" / "1.png")
+        pack_cover_archive(
+            static / "cover",
+            static / "cover_75x75.pack",
+            B50ImageGenerator.COVER_SIZE,
+        )
+        # 打包文件晚于原始封面写入
+        packed = time.time() - 60
+        os.utime(static / "cover" / "1.png", (packed - 60, packed - 60))
+        os.utime(static / "cover_75x75.pack", (packed, packed))
+        return static
+
+    def test_archive_used(self, static):
+        """打包文件不旧于原始封面时使用打包文件中的封面"""
+        generator = make_generator(static)
+        assert generator.cover_archive is not None
+        cover = generator._load_song_cover(1, 1)
+        assert cover.getpixel((0, 0)) == (255, 0, 0, 255)
+
+    def test_replaced_cover_preferred(self, static):
+        """原始封面在打包后被替换时使用新的原始封面"""
+        Image.new("RGBA", (100, 100), (0, 255, 0, 255)).save(static / "cover" / "1.png")
+        generator = make_generator(static)
+        assert generator.cover_archive is not None
+        cover = generator._load_song_cover(1, 1)
+        assert cover.size == B50ImageGenerator.COVER_SIZE
+        assert cover.getpixel((0, 0)) == (0, 255, 0, 255)
+
+
+class TestResizedCovers:
+    """测试封面预缩放"""
+
+    def test_built_covers_registered(self, tmp_path):
+        """预缩放生成的封面登记到资源清单，已是最新的封面被跳过"""
+        static = tmp_path / "static"
+        (static / "cover").mkdir(parents=True)
+        for song_id in (1, 2):
+            Image.new("RGBA", (100, 100)).save(static / "cover" / f"{song_id}.png")
+        generator = make_generator(static)
+
+        assert generator.build_resized_covers() == 2
+        for song_id in (1, 2):
+            path = static / "cover_75x75" / f"{song_id}.png"
+            assert generator.manifest.exists(path)
+            assert Image.open(path).size == B50ImageGenerator.COVER_SIZE
+        assert generator.build_resized_covers() == 0
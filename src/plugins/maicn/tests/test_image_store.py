@@ -0,0 +1,64 @@
+"""图片存储测试"""
+
+import hashlib
+import os
+import time
+
+from ..libraries.image_store import IMAGE_ROUTE, ImageStore
+
+DATA = b"image"
+NAME = f"{hashlib.sha256(DATA).hexdigest()}.png"
+
+
+class TestImageStore:
+    """测试图片的保存、访问与清理"""
+
+    def test_put_content_addressed(self, tmp_path):
+        """以内容摘要命名，相同内容复用同一个文件"""
+        store = ImageStore(tmp_path, ttl=60, base_url="http://bot/")
+        assert store.put(DATA, ".png") == NAME
+        assert store.put(DATA, ".png") == NAME
+        assert [path.name for path in tmp_path.iterdir()] == [NAME]
+        assert store.path(NAME).read_bytes() == DATA
+        assert store.url(NAME) == f"http://bot{IMAGE_ROUTE}/{NAME}"
+
+    def test_invalid_names_rejected(self, tmp_path):
+        """文件名不是摘要加图片扩展名时不访问文件系统"""
+        store = ImageStore(tmp_path, ttl=60, base_url="http://bot")
+        store.put(DATA, ".png")
+        (tmp_path / "secret.txt").write_text("secret")
+
+        for name in [
+            "../secret.txt",
+            "secret.txt",
+            NAME.upper(),
+            NAME[:-4] + ".gif",
+            NAME[1:],
+            f"../{NAME}",
+            f"{NAME}/",
+        ]:
+            assert store.path(name) is None
+        assert store.path(NAME) is not None
+
+    def test_expired_and_cleanup(self, tmp_path):
+        """超过TTL的图片不再提供，并在清理时删除"""
+        store = ImageStore(tmp_path, ttl=60, base_url="http://bot")
+        store.put(DATA, ".png")
+        fresh = store.put(b"fresh", ".png")
+        expired = time.time() - 120
+        os.utime(tmp_path / NAME, (expired, expired))
+
+        assert store.path(NAME) is None
+        assert store.cleanup() == 1
+        assert not (tmp_path / NAME).exists()
+        assert store.path(fresh) is not None
+
+    def test_put_refreshes_expiry(self, tmp_path):
+        """重复保存时刷新过期时间"""
+        store = ImageStore(tmp_path, ttl=60, base_url="http://bot")
+        store.put(DATA, ".png")
+        expired = time.time() - 120
+        os.utime(tmp_path / NAME, (expired, expired))
+
+        store.put(DATA, ".png")
+        assert store.path(NAME) is not None
@@ -0,0 +1,177 @@
+"""本地计算B50测试"""
+
+import pytest
+from maimai_py import LevelIndex, RateType, SongType
+from maimai_py.models import (
+    Score,
+    Song,
+    SongDifficulties,
+    SongDifficulty,
+    SongDifficultyUtage,
+)
+
+from ..libraries import local_bests
+from ..libraries.local_bests import compute_local_bests
+from ..libraries.song_index import song_index
+
+CURRENT_VERSION = 25000
+
+
+def make_difficulty(
+    song_type: SongType, level_index: LevelIndex, version: int
+) -> SongDifficulty:
+    values = dict(
+        type=song_type,
+        level="13",
+        level_value=13.0,
+        level_index=level_index,
+        note_designer="",
+        version=version,
+        tap_num=0,
+        hold_num=0,
+        slide_num=0,
+        touch_num=0,
+        break_num=0,
+        curve=None,
+    )
+    if song_type == SongType.UTAGE:
+        return SongDifficultyUtage(**values, kanji="宴", description="", is_buddy=False)
+    return SongDifficulty(**values)
+
+
+def make_song(song_id: int, version: int, difficulties: list[SongDifficulty]) -> Song:
+    return Song(
+        id=song_id,
+        title=f"Song {song_id}",
+        artist="",
+        genre="",
+        bpm=150,
+        map=None,
+        version=version,
+        rights=None,
+        aliases=None,
+        disabled=False,
+        difficulties=SongDifficulties(
+            standard=[d for d in difficulties if d.type == SongType.STANDARD],
+            dx=[d for d in difficulties if d.type == SongType.DX],
+            utage=[d for d in difficulties if d.type == SongType.UTAGE],
+        ),
+    )
+
+
+def make_score(
+    song_id: int,
+    dx_rating: int,
+    song_type: SongType = SongType.DX,
+    level_index: LevelIndex = LevelIndex.MASTER,
+) -> Score:
+    return Score(
+        id=song_id,
+        level="13",
+        level_index=level_index,
+        achievements=100.0,
+        fc=None,
+        fs=None,
+        dx_score=2000,
+        dx_rating=dx_rating,
+        play_count=1,
+        rate=RateType.SSS,
+        type=song_type,
+    )
+
+
+@pytest.fixture(autouse=True)
+def songs(monkeypatch):
+    """使用测试曲目替换歌曲索引，并固定当前版本号"""
+    saved = song_index._songs, song_index.updated_at
+    song_index.update(
+        [
+            make_song(
+                1, 24000, [make_difficulty(SongType.DX, LevelIndex.MASTER, 24999)]
+            ),
+            make_song(
+                2, 25000, [make_difficulty(SongType.DX, LevelIndex.MASTER, 25000)]
+            ),
+            # 旧歌曲在当前版本追加的谱面按谱面版本计入B15
+            make_song(
+                3,
+                20000,
+                [
+                    make_difficulty(SongType.STANDARD, LevelIndex.MASTER, 20000),
+                    make_difficulty(SongType.STANDARD, LevelIndex.ReMASTER, 25000),
+                ],
+            ),
+            make_song(
+                4,
+                25000,
+                [make_difficulty(SongType.UTAGE, LevelIndex.BASIC, 25000)],
+            ),
+            *(
+                make_song(
+                    song_id,
+                    10000,
+                    [make_difficulty(SongType.DX, LevelIndex.MASTER, 10000)],
+                )
+                for song_id in range(100, 140)
+            ),
+        ]
+    )
+    monkeypatch.setattr(local_bests.config, "maicn_current_version", CURRENT_VERSION)
+    yield
+    song_index._songs, song_index.updated_at = saved
+
+
+class TestComputeLocalBests:
+    """测试B35/B15的划分与选取"""
+
+    def test_version_cutoff(self):
+        """谱面版本不低于当前版本的成绩计入B15"""
+        bests = compute_local_bests(
+            [
+                make_score(1, 300),
+                make_score(2, 310),
+                make_score(3, 200, SongType.STANDARD),
+                make_score(3, 250, SongType.STANDARD, LevelIndex.ReMASTER),
+            ]
+        )
+        assert [(s.id, s.level_index) for s in bests.scores_b35] == [
+            (1, LevelIndex.MASTER),
+            (3, LevelIndex.MASTER),
+        ]
+        assert [(s.id, s.level_index) for s in bests.scores_b15] == [
+            (2, LevelIndex.MASTER),
+            (3, LevelIndex.ReMASTER),
+        ]
+
+    def test_ratings_summed(self):
+        """总Rating为B35与B15之和"""
+        bests = compute_local_bests([make_score(1, 300), make_score(2, 310)])
+        assert bests.rating_b35 == 300
+        assert bests.rating_b15 == 310
+        assert bests.rating == 610
+
+    def test_top_scores_selected(self):
+        """只保留Rating最高的35个旧版本成绩，按Rating降序排列"""
+        scores = [make_score(song_id, song_id) for song_id in range(100, 140)]
+        bests = compute_local_bests(scores)
+        assert [s.dx_rating for s in bests.scores_b35] == list(range(139, 104, -1))
+        assert bests.scores_b15 == []
+
+    def test_extended_fields(self):
+        """入选成绩补充曲名与定数"""
+        (score,) = compute_local_bests([make_score(1, 300)]).scores_b35
+        assert score.title == "Song 1"
+        assert score.level_value == 13.0
+
+    def test_skipped_scores(self):
+        """宴会场、未知歌曲与未知谱面的成绩不计入"""
+        bests = compute_local_bests(
+            [
+                make_score(4, 500, SongType.UTAGE, LevelIndex.BASIC),
+                make_score(999, 500),
+                make_score(1, 500, SongType.STANDARD),
+            ]
+        )
+        assert bests.scores_b35 == []
+        assert bests.scores_b15 == []
+        assert bests.rating == 0
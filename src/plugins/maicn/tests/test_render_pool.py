@@ -0,0 +1,166 @@
+"""B50渲染池测试"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+
+import pytest
+
+from ..libraries import b50_image, render_pool
+from ..libraries.render_pool import B50RenderPool
+
+PLAYER = {"name": "player", "rating": 15000}
+
+
+def loaded_modules() -> tuple[bool, bool]:
+    """工作进程中是否加载了插件的命令模块与其他插件"""
+    return "src.plugins.maicn.commands" in sys.modules, any(
+        name.startswith("nonebot_plugin_") for name in sys.modules
+    )
+
+
+class TestRenderWorker:
+    """测试工作进程的启动与渲染"""
+
+    @pytest.mark.asyncio
+    async def test_worker_renders_without_plugins(self):
+        """工作进程只导入渲染模块即可完成渲染"""
+        pool = B50RenderPool(workers=1, queue_size=1, timeout=60)
+        pool.start()
+        try:
+            image_bytes = await pool.render(PLAYER, [], [])
+            assert image_bytes.startswith(b"\x89PNG")
+            (pid,) = pool._worker_stats
+            assert pid != os.getpid()
+
+            future = pool._executor.submit(loaded_modules)
+            assert future.result(timeout=60) == (False, False)
+        finally:
+            pool.shutdown()
+
+
+class TestCacheStats:
+    """测试渲染缓存统计"""
+
+    def test_no_generator_loaded(self, monkeypatch):
+        """尚未创建生成器时返回空统计，不加载静态资源"""
+        monkeypatch.setattr(b50_image, "_shared_generators", {})
+        pool = B50RenderPool(workers=0, queue_size=0, timeout=10)
+
+        assert b50_image.process_cache_stats() == {}
+        assert pool.cache_stats() == {}
+        assert b50_image._shared_generators == {}
+
+
+class FakeRenderer:
+    """替换 _render_in_worker，按player_data中的参数延迟或抛出异常，并记录最大并发数"""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self, player_data, b35_scores, b15_scores, player_key, preview):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if player_data.get("block"):
+                self.release.wait(10)
+            time.sleep(player_data.get("delay", 0))
+            if player_data.get("fail"):
+                raise ValueError(player_data["name"])
+            return player_data["name"].encode(), os.getpid(), {}
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def make_job(name: str, **options) -> tuple:
+    return {"name": name, **options}, [], []
+
+
+class TestRenderBatch:
+    """测试批量渲染的并发上限、结果顺序与取消"""
+
+    @pytest.fixture
+    def renderer(self, monkeypatch):
+        renderer = FakeRenderer()
+        monkeypatch.setattr(render_pool, "_render_in_worker", renderer)
+        yield renderer
+        renderer.release.set()
+
+    @pytest.fixture
+    def pool(self):
+        pool = B50RenderPool(workers=0, queue_size=0, timeout=10)
+        # 使用多个线程，使批量任务可以真正并发执行
+        pool._executor = ThreadPoolExecutor(max_workers=8)
+        yield pool
+        pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency(self, pool, renderer):
+        """同时执行的任务数不超过concurrency，任务按需从jobs中取出"""
+        pulled = 0
+
+        def jobs():
+            nonlocal pulled
+            for i in range(10):
+                pulled += 1
+                yield make_job(str(i), delay=0.02)
+
+        results = {}
+        async for index, result in pool.render_batch(jobs(), concurrency=3):
+            assert pulled - len(results) <= 3
+            results[index] = result
+
+        assert results == {i: str(i).encode() for i in range(10)}
+        assert renderer.max_active == 3
+
+    @pytest.mark.asyncio
+    async def test_completion_order(self, pool, renderer):
+        """结果按完成顺序返回，并附带任务序号"""
+        jobs = [
+            make_job("slow", delay=0.2),
+            make_job("fast"),
+            make_job("mid", delay=0.1),
+        ]
+        results = [item async for item in pool.render_batch(jobs, concurrency=3)]
+        assert results == [(1, b"fast"), (2, b"mid"), (0, b"slow")]
+
+    @pytest.mark.asyncio
+    async def test_exception_per_index(self, pool, renderer):
+        """单个任务的异常作为该任务的结果返回，不影响其他任务"""
+        jobs = [make_job("a"), make_job("b", fail=True), make_job("c")]
+        results = dict([item async for item in pool.render_batch(jobs, concurrency=2)])
+
+        assert results[0] == b"a"
+        assert isinstance(results[1], ValueError)
+        assert results[2] == b"c"
+
+    @pytest.mark.asyncio
+    async def test_early_stop_cancels_remaining(self, pool, renderer):
+        """调用方提前停止迭代时取消正在执行的任务，不再取出新任务"""
+        pulled = 0
+
+        def jobs():
+            nonlocal pulled
+            pulled += 1
+            yield make_job("fast")
+            while True:
+                pulled += 1
+                yield make_job("blocked", block=True)
+
+        async with aclosing(pool.render_batch(jobs(), concurrency=2)) as results:
+            async for index, result in results:
+                assert (index, result) == (0, b"fast")
+                break
+
+        await asyncio.sleep(0)
+        assert pulled == 2
+        assert asyncio.all_tasks() == {asyncio.current_task()}
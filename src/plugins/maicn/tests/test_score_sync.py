@@ -0,0 +1,137 @@
+"""成绩增量上传测试"""
+
+import pytest
+from maimai_py import FCType, LevelIndex, RateType, SongType
+from maimai_py.models import Score
+from nonebot_plugin_orm import get_session
+from sqlalchemy import select
+
+from ..libraries.score_sync import pending_scores, save_uploaded_scores
+from ..models import UploadedScore
+
+MAI_UID = 10001
+ACCOUNT = "player"
+
+
+def make_score(
+    song_id: int,
+    achievements: float = 100.0,
+    dx_score: int = 2000,
+    fc: FCType | None = None,
+    level_index: LevelIndex = LevelIndex.MASTER,
+    song_type: SongType = SongType.DX,
+) -> Score:
+    return Score(
+        id=song_id,
+        level="13",
+        level_index=level_index,
+        achievements=achievements,
+        fc=fc,
+        fs=None,
+        dx_score=dx_score,
+        dx_rating=300,
+        play_count=1,
+        rate=RateType._from_achievement(achievements),
+        type=song_type,
+    )
+
+
+async def upload(scores: list[Score], full: bool = False) -> list[Score]:
+    """模拟一次上传：筛选待上传成绩并记录快照"""
+    pending = await pending_scores(MAI_UID, "divingfish", ACCOUNT, scores, full=full)
+    await save_uploaded_scores(MAI_UID, "divingfish", ACCOUNT, pending, full=full)
+    return pending
+
+
+def keys(scores: list[Score]) -> set[tuple[int, int]]:
+    return {(score.id, score.level_index.value) for score in scores}
+
+
+@pytest.mark.usefixtures("db")
+class TestPendingScores:
+    """测试新增、提升与未变化成绩的筛选"""
+
+    @pytest.mark.asyncio
+    async def test_first_upload_returns_all(self):
+        """没有快照时上传全部成绩"""
+        scores = [make_score(1), make_score(2)]
+        assert await upload(scores) == scores
+
+    @pytest.mark.asyncio
+    async def test_unchanged_scores_skipped(self):
+        """与快照相同的成绩不再上传"""
+        scores = [make_score(1), make_score(2)]
+        await upload(scores)
+        assert await upload(scores) == []
+
+    @pytest.mark.asyncio
+    async def test_new_and_improved_scores(self):
+        """只上传新增谱面与达成率、DX分数或评价变化的谱面"""
+        await upload([make_score(1), make_score(2), make_score(3), make_score(4)])
+
+        scores = [
+            make_score(1),
+            make_score(2, achievements=100.5),
+            make_score(3, dx_score=2100),
+            make_score(4, fc=FCType.AP),
+            make_score(1, level_index=LevelIndex.EXPERT),
+            make_score(5),
+        ]
+        pending = await upload(scores)
+        assert keys(pending) == {
+            (2, LevelIndex.MASTER.value),
+            (3, LevelIndex.MASTER.value),
+            (4, LevelIndex.MASTER.value),
+            (1, LevelIndex.EXPERT.value),
+            (5, LevelIndex.MASTER.value),
+        }
+        assert await upload(scores) == []
+
+    @pytest.mark.asyncio
+    async def test_song_type_distinguished(self):
+        """同一歌曲的标准谱与DX谱分别记录"""
+        await upload([make_score(1, song_type=SongType.DX)])
+        pending = await upload([make_score(1, song_type=SongType.STANDARD)])
+        assert len(pending) == 1
+
+    @pytest.mark.asyncio
+    async def test_full_upload_first_run(self):
+        """首次全量上传返回全部成绩并建立快照"""
+        scores = [make_score(1), make_score(2)]
+        assert await upload(scores, full=True) == scores
+        assert await upload(scores) == []
+
+    @pytest.mark.asyncio
+    async def test_full_upload_ignores_snapshot(self):
+        """全量上传时不参考快照"""
+        scores = [make_score(1), make_score(2)]
+        await upload(scores)
+        assert await upload(scores, full=True) == scores
+
+    @pytest.mark.asyncio
+    async def test_full_upload_removes_stale_rows(self):
+        """全量上传后快照中只保留本次上传的谱面"""
+        await upload([make_score(1), make_score(2)])
+        await upload([make_score(1)], full=True)
+        pending = await upload([make_score(1), make_score(2)])
+        assert keys(pending) == {(2, LevelIndex.MASTER.value)}
+
+    @pytest.mark.asyncio
+    async def test_accounts_separated(self):
+        """同一舞萌账号的不同查分器账号分别记录"""
+        scores = [make_score(1)]
+        await upload(scores)
+        pending = await pending_scores(MAI_UID, "divingfish", "other", scores)
+        assert pending == scores
+        pending = await pending_scores(MAI_UID, "lxns", ACCOUNT, scores)
+        assert pending == scores
+
+    @pytest.mark.asyncio
+    async def test_account_not_stored(self):
+        """快照中不保存查分器账号本身"""
+        await upload([make_score(1)])
+        async with get_session() as session:
+            accounts = set(await session.scalars(select(UploadedScore.account)))
+        assert len(accounts) == 1
+        assert ACCOUNT not in accounts
+        assert len(accounts.pop()) == 64
@@ -0,0 +1,103 @@
+"""命令防重复执行测试"""
+
+import asyncio
+
+import pytest
+from nonebot.adapters.onebot.v11.event import MessageEvent
+from nonebot.exception import FinishedException
+
+from ..commands.cmds import helpers
+from ..commands.cmds.helpers import single_flight
+from ..messages import Messages
+
+
+def make_event(user_id: int) -> MessageEvent:
+    return MessageEvent.model_construct(user_id=user_id)
+
+
+class Handler:
+    """记录执行次数的命令处理函数，release被设置前不返回"""
+
+    def __init__(self, error: Exception | None = None):
+        self.calls = 0
+        self.error = error
+        self.release = asyncio.Event()
+
+    async def __call__(self, event: MessageEvent):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return event.get_user_id()
+
+
+class TestSingleFlight:
+    """测试同一用户的同名命令不会重复执行"""
+
+    @pytest.fixture(autouse=True)
+    def replies(self, monkeypatch):
+        """记录提示消息，不实际发送"""
+        replies: list[str] = []
+
+        async def finish(message):
+            replies.append(message)
+            raise FinishedException()
+
+        monkeypatch.setattr(helpers.maicn_matcher, "finish", finish)
+        yield replies
+        assert not helpers._running_commands
+
+    @pytest.mark.asyncio
+    async def test_duplicate_rejected(self, replies):
+        """执行期间重复发送的命令只提示稍候，结束后可以再次执行"""
+        handler = Handler()
+        command = single_flight("b50")(handler)
+
+        first = asyncio.create_task(command(make_event(1)))
+        await asyncio.sleep(0)
+        with pytest.raises(FinishedException):
+            await command(make_event(1))
+        assert replies == [Messages.HINT_COMMAND_IN_PROGRESS]
+
+        handler.release.set()
+        assert await first == "1"
+        assert await command(make_event(1)) == "1"
+        assert handler.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_independently(self, replies):
+        """不同用户或不同命令互不影响"""
+        handler = Handler()
+        b50 = single_flight("b50")(handler)
+        update = single_flight("update")(handler)
+
+        tasks = [
+            asyncio.create_task(b50(make_event(1))),
+            asyncio.create_task(b50(make_event(2))),
+            asyncio.create_task(update(make_event(1))),
+        ]
+        await asyncio.sleep(0)
+        assert handler.calls == 3
+
+        handler.release.set()
+        assert await asyncio.gather(*tasks) == ["1", "2", "1"]
+        assert replies == []
+
+    @pytest.mark.asyncio
+    async def test_exception_clears_entry(self, replies):
+        """命令抛出异常后移除执行记录，下一次命令正常执行"""
+        handler = Handler(RuntimeError("失败"))
+        command = single_flight("update")(handler)
+
+        first = asyncio.create_task(command(make_event(1)))
+        await asyncio.sleep(0)
+        with pytest.raises(FinishedException):
+            await command(make_event(1))
+
+        handler.release.set()
+        with pytest.raises(RuntimeError):
+            await first
+
+        handler.error = None
+        assert await command(make_event(1)) == "1"
+        assert handler.calls == 2
@@ -0,0 +1,38 @@
+"""插件HTTP路由
+
+在bot自身的FastAPI应用上提供已生成图片的访问，供OneBot实现通过URL下载图片。
+"""
+
+from fastapi import HTTPException
+from fastapi.responses import FileResponse
+from nonebot import get_driver
+
+from src.plugins.maicn.libraries import (
+    IMAGE_MEDIA_TYPES,
+    IMAGE_ROUTE,
+    b50_image_store,
+)
+
+driver = get_driver()
+
+
+async def get_image(name: str):
+    """获取已生成的图片，文件名为内容摘要，内容不会变化"""
+    path = b50_image_store.path(name)
+    if path is None:
+        raise HTTPException(status_code=404)
+
+    return FileResponse(
+        path,
+        media_type=IMAGE_MEDIA_TYPES[path.suffix],
+        headers={
+            "Cache-Control": f"public, max-age={int(b50_image_store.ttl)}, immutable"
+        },
+    )
+
+
+# 图片存储只在驱动器提供HTTP服务时创建
+if b50_image_store is not None:
+    driver.server_app.add_api_route(
+        f"{IMAGE_ROUTE}/{{name}}", get_image, methods=["GET"]
+    )
@@ -1,3 +1,4 @@
+import json
 from enum import StrEnum
 from typing import TypedDict
 
@@ -45,6 +46,28 @@ class MaimaiBindInfo(TypedDict):
     others: list[V1MaimaiGetCurrentMaimaiBindResponseSingle]
 
 
+def parse_divingfish_credentials(binds: MaimaiBindInfo) -> tuple[str, str] | None:
+    """
+    从maimai绑定信息中解析水鱼查分器的账号密码
+
+    Args:
+        binds: get_current_maimai_bind_info 返回的绑定信息
+
+    Returns:
+        (username, password) 元组，没有绑定水鱼查分器时返回None
+
+    Raises:
+        json.JSONDecodeError: 绑定内容不是JSON
+        KeyError: 绑定内容缺少账号或密码
+    """
+    for bind in binds.get("others", []):
+        if bind["bind_type"] == UserBindType.DivingFish:
+            bind_data = json.loads(bind["bind_content"])
+            return bind_data["username"], bind_data["password"]
+
+    return None
+
+
 class RemiServiceHelper:
     def __init__(self, base_url: str):
         self._client = AsyncClient(base_url=base_url)
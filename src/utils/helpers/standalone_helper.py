@@ -0,0 +1,101 @@
+"""不加载插件时使用插件模块
+
+插件包在导入时会注册命令，需要完整的bot配置与街机接口等依赖。
+脚本与渲染工作进程只用到其中的部分模块：这里预先登记不执行 __init__ 的空包，
+之后导入子模块时不会加载插件本身，也不会加载其他插件。
+"""
+
+import importlib
+import sys
+import types
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Sequence
+
+import nonebot
+from nonebot.log import default_filter, default_format, logger, logger_id
+
+ROOT = Path(__file__).resolve().parents[3]
+
+# 默认跳过 __init__ 的包，按从外到内的顺序
+MAICN_PACKAGES = ("src.plugins.maicn", "src.plugins.maicn.libraries")
+MAICN_CONFIG = "src.plugins.maicn.config:Config"
+
+
+def _import_attr(path: str) -> Any:
+    """按“模块路径:属性名”导入对象"""
+    module_name, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def register_bare_packages(packages: Sequence[str]) -> None:
+    """登记不执行 __init__ 的空包，已导入的包保持不变"""
+    for name in packages:
+        if name in sys.modules:
+            continue
+        package = types.ModuleType(name)
+        package.__path__ = [str(ROOT.joinpath(*name.split(".")))]
+        sys.modules[name] = package
+
+
+def log_to_stderr() -> None:
+    """将NoneBot日志改为输出到标准错误，标准输出只保留脚本的结果"""
+    logger.remove(logger_id)
+    logger.add(
+        sys.stderr,
+        level=0,
+        diagnose=False,
+        filter=default_filter,
+        format=default_format,
+    )
+
+
+def init_standalone(
+    packages: Sequence[str] = MAICN_PACKAGES,
+    config_model: str = MAICN_CONFIG,
+    **config: Any,
+) -> None:
+    """初始化NoneBot但不加载任何插件
+
+    Args:
+        packages: 需要跳过 __init__ 的包
+        config_model: 插件配置类（模块路径:类名），config中未给出的必填项以占位值填充
+        config: 传给 nonebot.init 的配置，覆盖 .env 中的同名配置
+    """
+    register_bare_packages(packages)
+    model = _import_attr(config_model)
+    placeholders = {
+        name: field.annotation()
+        for name, field in model.model_fields.items()
+        if field.is_required()
+    }
+    nonebot.init(**{"driver": "~none", **placeholders, **config})
+
+
+def init_worker(config: dict[str, Any], initializer: str) -> None:
+    """进程池工作进程的初始化函数
+
+    以独立模式初始化NoneBot后调用插件中的初始化函数。
+
+    Args:
+        config: 插件配置，通常为父进程中已解析的配置
+        initializer: 插件中的初始化函数（模块路径:函数名）
+    """
+    init_standalone(**config)
+    _import_attr(initializer)()
+
+
+@contextmanager
+def spawn_without_main() -> Iterator[None]:
+    """在此期间以spawn启动的子进程不重新执行主模块
+
+    spawn启动的子进程默认会重新导入主模块（如 bot.py），其中的 nonebot.init 与插件加载
+    会在每个子进程中再执行一遍。子进程只运行进程池任务时用不到主模块，
+    启动子进程期间临时替换为空模块即可跳过。只应在事件循环线程中启动子进程时使用。
+    """
+    main_module = sys.modules["__main__"]
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main_module